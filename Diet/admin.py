@@ -1,10 +1,37 @@
 from django.contrib import admin
-from .models import Diet
+
+from core.autocomplete import PrefixAutocompleteMixin
+from core.changelist import AutocompleteListFilter, ScalableChangeListMixin
+from .models import Diet, DietStatus
+
+
+class DietStatusFilter(admin.SimpleListFilter):
+    """Filtra pelo status de hoje com condições sobre start_date/end_date, sem carregar as dietas."""
+    title = 'Status'
+    parameter_name = 'status'
+
+    def lookups(self, request, model_admin):
+        return [(status.value, status.label) for status in DietStatus if status != DietStatus.PENDING]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.with_status_code(self.value())
+
 
 @admin.register(Diet)
-class DietAdmin(admin.ModelAdmin):
-    list_display = ('name', 'user', 'start_date', 'end_date', 'status')
-    list_filter = ('user', 'start_date')
-    search_fields = ('name', 'user__username', 'nutritionist_name', 'goal')
+class DietAdmin(ScalableChangeListMixin, PrefixAutocompleteMixin, admin.ModelAdmin):
+    list_display = ('name', 'user', 'start_date', 'end_date', 'status_display')
+    list_filter = (DietStatusFilter, ('user', AutocompleteListFilter), 'start_date')
+    list_select_related = ('user',)
+    search_fields = ('name', 'user__username', 'nutritionist_name', 'goal', 'attachment_text')
     readonly_fields = ('status',)
     autocomplete_fields = ('user',)
+    autocomplete_prefix_field = 'name'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_status()
+
+    @admin.display(description='Status', ordering='current_status')
+    def status_display(self, obj):
+        return DietStatus(obj.current_status).label
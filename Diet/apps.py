@@ -5,3 +5,6 @@ class DietConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Diet'
     verbose_name = 'Plano Alimentar'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,38 @@
+"""
+Extração em segundo plano do texto de Diet.attachment.
+
+O texto é extraído uma única vez por arquivo: como o armazenamento é
+endereçado por conteúdo, dietas com o mesmo anexo têm o mesmo nome de
+arquivo e reaproveitam o texto já extraído.
+"""
+from functools import partial
+
+from django.db import transaction
+
+from core import background
+from .extraction import extract_text
+from .models import Diet
+
+
+def _store_text(pk, name, text):
+    Diet.objects.filter(pk=pk, attachment=name).update(attachment_text=text, attachment_text_source=name)
+
+
+def _extract(pk, name, path):
+    cached = (
+        Diet.objects
+        .filter(attachment=name, attachment_text_source=name)
+        .exclude(pk=pk)
+        .values_list('attachment_text', flat=True)
+        .first()
+    )
+    if cached is not None:
+        _store_text(pk, name, cached)
+    else:
+        background.submit(extract_text, path, on_done=partial(_store_text, pk, name))
+
+
+def schedule_text_extraction(diet):
+    """Agenda a extração para depois do commit, se o texto ainda não for do anexo atual."""
+    if diet.attachment and diet.attachment_text_source != diet.attachment.name:
+        transaction.on_commit(partial(_extract, diet.pk, diet.attachment.name, diet.attachment.path))
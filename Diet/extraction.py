@@ -0,0 +1,44 @@
+"""
+Extração do texto dos anexos das dietas.
+
+Roda nos processos de core.background, sem Django. PDFs usam o pypdf e
+imagens o pytesseract, ambos opcionais: sem a biblioteca, o anexo fica
+sem texto.
+"""
+import os
+
+TEXT_EXTENSIONS = {'.txt', '.md', '.csv'}
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.tif', '.tiff'}
+
+
+def _pdf_text(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return ''
+    reader = PdfReader(path)
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+def _image_text(path):
+    try:
+        import pytesseract
+        from PIL import Image
+    except ImportError:
+        return ''
+    with Image.open(path) as image:
+        return pytesseract.image_to_string(image, lang='por')
+
+
+def extract_text(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        text = _pdf_text(path)
+    elif extension in IMAGE_EXTENSIONS:
+        text = _image_text(path)
+    elif extension in TEXT_EXTENSIONS:
+        with open(path, encoding='utf-8', errors='replace') as source:
+            text = source.read()
+    else:
+        text = ''
+    return ' '.join(text.split())
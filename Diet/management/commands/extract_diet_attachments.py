@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from Diet.attachments import schedule_text_extraction
+from Diet.models import Diet
+
+
+class Command(BaseCommand):
+    help = "Agenda a extração de texto dos anexos de dieta que ainda não foram processados."
+
+    def handle(self, *args, **options):
+        diets = Diet.objects.exclude(attachment='').exclude(attachment__isnull=True).exclude(
+            attachment_text_source=F('attachment')
+        )
+        count = 0
+        for diet in diets.iterator():
+            schedule_text_extraction(diet)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} anexos agendados para extração."))
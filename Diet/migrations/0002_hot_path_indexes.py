@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Diet', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='diet',
+            index=models.Index(fields=['user', '-start_date', 'end_date'], name='diet_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='diet',
+            index=models.Index(fields=['-start_date', 'user'], name='diet_start_user_idx'),
+        ),
+    ]
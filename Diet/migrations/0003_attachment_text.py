@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:35
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Diet', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='diet',
+            name='attachment_text',
+            field=models.TextField(blank=True, editable=False, help_text='Extraído em segundo plano; usado na busca do admin.', verbose_name='Texto do anexo'),
+        ),
+        migrations.AddField(
+            model_name='diet',
+            name='attachment_text_source',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Anexo de origem do texto'),
+        ),
+        migrations.AlterField(
+            model_name='diet',
+            name='attachment',
+            field=models.FileField(blank=True, help_text='Anexe o arquivo PDF ou imagem original da dieta.', null=True, storage=core.storage.content_addressed_storage, upload_to='diets/', verbose_name='Anexo'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:20
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Diet', '0003_attachment_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='diet',
+            index=models.Index(django.db.models.functions.comparison.Collate('name', 'NOCASE'), name='diet_name_nocase_idx'),
+        ),
+    ]
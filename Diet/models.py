@@ -1,11 +1,58 @@
-import datetime
 from django.db import models
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Collate
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from core.storage import content_addressed_storage
+
+
+class DietStatus(models.TextChoices):
+    PENDING = 'PENDING', 'Pendente'
+    PLANNED = 'PLANNED', 'Planejada'
+    ACTIVE = 'ACTIVE', 'Ativa'
+    FINISHED = 'FINISHED', 'Concluída'
+
+
+class DietQuerySet(models.QuerySet):
+    """Status e vigência calculados no banco, a partir de start_date e end_date."""
+
+    @staticmethod
+    def _status_conditions(date):
+        return {
+            DietStatus.PLANNED: Q(start_date__gt=date),
+            DietStatus.ACTIVE: Q(start_date__lte=date) & (Q(end_date__isnull=True) | Q(end_date__gte=date)),
+            DietStatus.FINISHED: Q(end_date__lt=date),
+        }
+
+    def with_status(self, date=None):
+        """Anota `current_status` (DietStatus) para a data informada (padrão: hoje)."""
+        conditions = self._status_conditions(date or timezone.localdate())
+        return self.annotate(current_status=Case(
+            *(When(condition, then=Value(status)) for status, condition in conditions.items()),
+            default=Value(DietStatus.PENDING),
+            output_field=models.CharField(max_length=10, choices=DietStatus.choices),
+        ))
+
+    def with_status_code(self, status, date=None):
+        """Filtra pelo status na data informada sem precisar da anotação."""
+        condition = self._status_conditions(date or timezone.localdate()).get(status)
+        return self.filter(condition) if condition is not None else self.none()
+
+    def active_on(self, date):
+        return self.with_status_code(DietStatus.ACTIVE, date)
+
+    def active_for(self, user, date=None):
+        """Dieta vigente do usuário na data (padrão: hoje), usando o índice (user, -start_date, end_date)."""
+        return self.filter(user=user).active_on(date or timezone.localdate()).order_by('-start_date').first()
+
 
 class Diet(models.Model):
     """
     Representa um plano alimentar (dieta) com um período e objetivo definidos.
     """
+    Status = DietStatus
+
     name = models.CharField(
         max_length=200,
         verbose_name="Nome da Dieta"
@@ -37,22 +84,41 @@ class Diet(models.Model):
     )
     attachment = models.FileField(
         upload_to='diets/',
+        storage=content_addressed_storage,
         blank=True,
         null=True,
         verbose_name="Anexo",
         help_text="Anexe o arquivo PDF ou imagem original da dieta."
     )
-    
+    attachment_text = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Texto do anexo",
+        help_text="Extraído em segundo plano; usado na busca do admin."
+    )
+    attachment_text_source = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name="Anexo de origem do texto"
+    )
+
+    objects = DietQuerySet.as_manager()
+
     @property
-    def status(self):
+    def status_code(self):
         if not self.start_date:
-            return "Pendente"
-        today = datetime.date.today()
+            return DietStatus.PENDING
+        today = timezone.localdate()
         if self.start_date > today:
-            return "Planejada"
+            return DietStatus.PLANNED
         if self.end_date is None or self.end_date >= today:
-            return "Ativa"
-        return "Concluída"
+            return DietStatus.ACTIVE
+        return DietStatus.FINISHED
+
+    @property
+    def status(self):
+        return DietStatus(self.status_code).label
 
     def __str__(self):
         return f"{self.name} ({self.user.username})"
@@ -61,3 +127,11 @@ class Diet(models.Model):
         verbose_name = "Plano Alimentar"
         verbose_name_plural = "Planos Alimentares"
         ordering = ['-start_date', 'user']
+        indexes = [
+            # Dietas do usuário por data de início (e vigência).
+            models.Index(fields=['user', '-start_date', 'end_date'], name='diet_user_start_idx'),
+            # Ordenação padrão.
+            models.Index(fields=['-start_date', 'user'], name='diet_start_user_idx'),
+            # Autocomplete por prefixo do nome (core.autocomplete).
+            models.Index(Collate('name', 'NOCASE'), name='diet_name_nocase_idx'),
+        ]
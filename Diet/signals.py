@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .attachments import schedule_text_extraction
+from .models import Diet
+
+
+@receiver(pre_save, sender=Diet)
+def clear_attachment_text(sender, instance, **kwargs):
+    if not instance.attachment:
+        instance.attachment_text = ''
+        instance.attachment_text_source = ''
+
+
+@receiver(post_save, sender=Diet)
+def extract_attachment_text(sender, instance, **kwargs):
+    schedule_text_extraction(instance)
@@ -1,3 +1,121 @@
-from django.test import TestCase
+import datetime
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from core.testing import QueryBudgetMixin
+from .models import Diet, DietStatus
+from .utils import active_diet
+
+
+class DietAdminQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(self.create_admin_user())
+
+    def add_diets(self, count):
+        for i in range(count):
+            user = User.objects.create_user(f'diet-user-{Diet.objects.count()}')
+            Diet.objects.create(name=f'Dieta {i}', user=user, start_date=datetime.date(2025, 1, 1))
+
+    def test_changelist(self):
+        self.add_diets(2)
+        self.assertQueryBudget('/admin/Diet/diet/', 6, lambda: self.add_diets(10))
+
+
+class DietStatusTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        self.today = timezone.localdate()
+        days = datetime.timedelta
+        self.finished = Diet.objects.create(name='Antiga', user=self.user, start_date=self.today - days(200),
+                                            end_date=self.today - days(100))
+        self.active = Diet.objects.create(name='Atual', user=self.user, start_date=self.today - days(99))
+        self.planned = Diet.objects.create(name='Próxima', user=self.user, start_date=self.today + days(30))
+
+    def test_with_status_annotates_in_sql(self):
+        statuses = dict(Diet.objects.with_status(self.today).values_list('name', 'current_status'))
+        self.assertEqual(statuses, {
+            'Antiga': DietStatus.FINISHED, 'Atual': DietStatus.ACTIVE, 'Próxima': DietStatus.PLANNED,
+        })
+
+    def test_status_filter_matches_property(self):
+        for diet in Diet.objects.all():
+            with self.subTest(diet.name):
+                self.assertEqual(list(Diet.objects.with_status_code(diet.status_code)), [diet])
+
+    def test_active_for(self):
+        self.assertEqual(Diet.objects.active_for(self.user, self.today), self.active)
+        self.assertEqual(Diet.objects.active_for(self.user), self.active)
+        self.assertEqual(Diet.objects.active_for(self.user, self.today - datetime.timedelta(150)), self.finished)
+        self.assertIsNone(Diet.objects.active_for(self.user, self.today - datetime.timedelta(201)))
+
+    def test_default_date_is_the_local_date(self):
+        # No início do dia local, a data UTC (e a do servidor) pode ser outra.
+        with mock.patch('django.utils.timezone.localdate', return_value=self.planned.start_date):
+            self.assertEqual(Diet.objects.active_for(self.user), self.planned)
+            self.assertEqual(self.planned.status_code, DietStatus.ACTIVE)
+            self.assertIn(self.planned, Diet.objects.with_status_code(DietStatus.ACTIVE))
+            self.assertEqual(active_diet(RequestFactory().get('/'), self.user), self.planned)
+
+    def test_active_diet_is_cached_per_request(self):
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(1):
+            self.assertEqual(active_diet(request, self.user, self.today), self.active)
+            self.assertEqual(active_diet(request, self.user.pk, self.today), self.active)
+        with self.assertNumQueries(1):
+            active_diet(RequestFactory().get('/'), self.user, self.today)
+
+    def test_admin_filters_and_sorts_by_status(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        response = self.client.get('/admin/Diet/diet/', {'status': DietStatus.ACTIVE})
+        self.assertEqual(list(response.context['cl'].result_list), [self.active])
+        response = self.client.get('/admin/Diet/diet/', {'o': '5'})
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class DietAttachmentTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.start = datetime.date(2025, 1, 1)
+
+    def create_diet(self, username, content):
+        user = User.objects.create_user(username)
+        with self.captureOnCommitCallbacks(execute=True):
+            diet = Diet.objects.create(name='Dieta', user=user, start_date=self.start,
+                                       attachment=ContentFile(content, name='Plano.TXT'))
+        diet.refresh_from_db()
+        return diet
+
+    def test_identical_uploads_are_stored_once(self):
+        first = self.create_diet('ana', b'Cafe: ovos mexidos')
+        second = self.create_diet('bia', b'Cafe: ovos mexidos')
+        self.assertEqual(first.attachment.name, second.attachment.name)
+        self.assertRegex(first.attachment.name, r'^diets/[0-9a-f]{2}/[0-9a-f]{64}\.txt$')
+        self.assertNotEqual(first.attachment.name, self.create_diet('caio', b'Outro plano').attachment.name)
+
+    def test_text_is_extracted_once_and_searchable(self):
+        first = self.create_diet('ana', b'Almoco: frango grelhado\n  e batata-doce')
+        self.assertEqual(first.attachment_text, 'Almoco: frango grelhado e batata-doce')
+        with mock.patch('Diet.attachments.background.submit') as submit:
+            second = self.create_diet('bia', b'Almoco: frango grelhado\n  e batata-doce')
+        submit.assert_not_called()
+        self.assertEqual(second.attachment_text, first.attachment_text)
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        response = self.client.get('/admin/Diet/diet/', {'q': 'batata-doce'})
+        self.assertEqual(set(response.context['cl'].result_list), {first, second})
+
+    def test_removing_attachment_clears_text(self):
+        diet = self.create_diet('ana', b'Jantar: sopa')
+        diet.attachment = None
+        diet.save()
+        diet.refresh_from_db()
+        self.assertEqual((diet.attachment_text, diet.attachment_text_source), ('', ''))
@@ -0,0 +1,16 @@
+from django.utils import timezone
+
+from .models import Diet
+
+
+def active_diet(request, user, date=None):
+    """
+    Diet.objects.active_for(user, date) com cache no próprio request, para que
+    várias gravações na mesma requisição (ex.: inlines) façam uma única consulta.
+    """
+    date = date or timezone.localdate()
+    cache = request.__dict__.setdefault('_active_diets', {})
+    key = (getattr(user, 'pk', user), date)
+    if key not in cache:
+        cache[key] = Diet.objects.active_for(user, date)
+    return cache[key]
@@ -0,0 +1,156 @@
+"""
+Adesão à dieta: refeições previstas (PlannedMeal) x registradas (MealLog).
+
+Um "slot" é uma refeição prevista: para cada dia, cada PlannedMeal de uma
+dieta vigente cujo bitmask inclui o dia da semana. O slot é cumprido quando
+há um MealLog planejado (is_planned) do mesmo usuário, dia e tipo de
+refeição. Tudo é calculado numa única query: um calendário gerado por CTE
+recursiva é cruzado com dietas e refeições planejadas e comparado com os
+registros agregados por (usuário, dia, tipo), qualquer que seja o intervalo.
+
+WeeklyAdherence guarda o resultado por semana (segunda a domingo) para os
+gráficos de tendência. Semanas que tocam meses arquivados (MealLog.archive)
+não são recalculadas: os registros delas já não estão em MealLog.
+"""
+import datetime
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import MealLog, WeeklyAdherence
+from .rollups import archived_months
+
+BATCH_SIZE = 500
+
+CALENDAR_SQL = '''
+WITH RECURSIVE calendar(day) AS (
+    SELECT date(%s)
+    UNION ALL
+    SELECT date(day, '+1 day') FROM calendar WHERE day < date(%s)
+),
+slots AS (
+    SELECT diet.user_id, calendar.day, planned.meal_type, COUNT(*) AS planned
+    FROM calendar
+    JOIN "Diet_diet" diet
+        ON diet.start_date <= calendar.day AND (diet.end_date IS NULL OR diet.end_date >= calendar.day)
+    JOIN "MealLog_plannedmeal" planned ON planned.diet_id = diet.id
+    -- strftime('%%w') vai de 0 (domingo) a 6; o bit 0 do bitmask é a segunda-feira.
+    WHERE planned.days_of_week & (1 << ((CAST(strftime('%%w', calendar.day) AS integer) + 6) %% 7)) != 0
+    {user_filter}
+    GROUP BY diet.user_id, calendar.day, planned.meal_type
+),
+actual AS ({actual_sql})
+SELECT slots.user_id, slots.day, SUM(slots.planned), SUM(MIN(slots.planned, COALESCE(actual.logged, 0)))
+FROM slots
+LEFT JOIN actual
+    ON actual.user_id = slots.user_id AND actual.day = slots.day AND actual.meal_type = slots.meal_type
+GROUP BY slots.user_id, slots.day
+ORDER BY slots.user_id, slots.day
+'''
+
+
+def _actual_logs(start, end, user_ids):
+    """Registros planejados por (usuário, dia local, tipo), como SQL para a CTE."""
+    day_start = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min))
+    day_end = timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min))
+    logs = MealLog.objects.filter(is_planned=True, consumed_at__gte=day_start, consumed_at__lt=day_end)
+    if user_ids is not None:
+        logs = logs.filter(user_id__in=user_ids)
+    return (
+        logs
+        .annotate(day=TruncDate('consumed_at'))
+        .values('user_id', 'day', 'meal_type')
+        .order_by()
+        .annotate(logged=Count('id'))
+        .query.sql_with_params()
+    )
+
+
+def daily_adherence(start, end, user_ids=None):
+    """
+    Lista de (user_id, data, previstas, cumpridas) para os dias entre `start`
+    e `end` com pelo menos uma refeição prevista. Executa uma query.
+    """
+    user_ids = list(user_ids) if user_ids is not None else None
+    if end < start or user_ids == []:
+        return []
+    actual_sql, actual_params = _actual_logs(start, end, user_ids)
+    params = [start.isoformat(), end.isoformat()]
+    user_filter = ''
+    if user_ids is not None:
+        user_filter = f"AND diet.user_id IN ({', '.join(['%s'] * len(user_ids))})"
+        params += user_ids
+    sql = CALENDAR_SQL.format(user_filter=user_filter, actual_sql=actual_sql)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + list(actual_params))
+        return [
+            (user_id, datetime.date.fromisoformat(day), planned, fulfilled)
+            for user_id, day, planned, fulfilled in cursor.fetchall()
+        ]
+
+
+def week_start(date):
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def refresh_weekly_adherence(start, end, user_ids=None):
+    """
+    Recalcula WeeklyAdherence das semanas que cruzam [start, end], até hoje.
+    Retorna a quantidade de semanas gravadas.
+    """
+    start = week_start(start)
+    end = min(week_start(end) + datetime.timedelta(days=6), timezone.localdate())
+    if end < start:
+        return 0
+    months = archived_months()
+
+    def frozen(week):
+        return bool(months) and {week.replace(day=1), (week + datetime.timedelta(days=6)).replace(day=1)} & months
+
+    totals = {}
+    for user_id, day, planned, fulfilled in daily_adherence(start, end, user_ids):
+        if frozen(week_start(day)):
+            continue
+        week = totals.setdefault((user_id, week_start(day)), [0, 0])
+        week[0] += planned
+        week[1] += fulfilled
+    rows = [
+        WeeklyAdherence(user_id=user_id, week_start=week, planned_slots=planned, fulfilled_slots=fulfilled)
+        for (user_id, week), (planned, fulfilled) in totals.items()
+    ]
+    stale = WeeklyAdherence.objects.filter(week_start__range=(start, end))
+    if user_ids is not None:
+        stale = stale.filter(user_id__in=user_ids)
+    with transaction.atomic():
+        stale.exclude(pk__in=[
+            pk for pk, user_id, week in stale.values_list('pk', 'user_id', 'week_start')
+            if (user_id, week) in totals or frozen(week)
+        ]).delete()
+        WeeklyAdherence.objects.bulk_create(
+            rows,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user', 'week_start'],
+            update_fields=['planned_slots', 'fulfilled_slots'],
+        )
+    return len(rows)
+
+
+def schedule_adherence_refresh(user_ids, dates):
+    """Agenda o recálculo das semanas de `dates` para depois do commit."""
+    user_ids, dates = set(user_ids), [date for date in dates if date]
+    if user_ids and dates:
+        first, last = min(dates), max(dates)
+        transaction.on_commit(lambda: refresh_weekly_adherence(first, last, user_ids))
+
+
+def adherence_series(user, start, end):
+    """Semanas de WeeklyAdherence do usuário no intervalo, da mais antiga à mais recente."""
+    return list(
+        WeeklyAdherence.objects
+        .filter(user=user, week_start__range=(week_start(start), end))
+        .order_by('week_start')
+        .values('week_start', 'planned_slots', 'fulfilled_slots')
+    )
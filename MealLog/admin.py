@@ -1,27 +1,141 @@
+import datetime
+
 from django.contrib import admin
-from .models import MealLog, PlannedMeal
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.utils import timezone
+from core.changelist import AutocompleteListFilter, ScalableChangeListMixin
+from core.search import FullTextSearchMixin
+from Diet.utils import active_diet
+from .fields import WEEKDAYS, weekday_labels
+from .models import DailyNutrition, MealLog, MealLogArchive, MonthlyMealSummary, PlannedMeal, WeeklyAdherence
+from .planning import materialize_planned_meals
+
+
+class WeekdayListFilter(admin.SimpleListFilter):
+    """Filtra refeições planejadas por dia da semana usando o bitmask."""
+    title = 'Dias da Semana'
+    parameter_name = 'weekday'
+
+    def lookups(self, request, model_admin):
+        return WEEKDAYS
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        days = {str(day): day for day, _ in WEEKDAYS}
+        if self.value() not in days:
+            raise IncorrectLookupParameters(f"Dia da semana inválido: {self.value()!r}.")
+        return queryset.filter(days_of_week__has=1 << days[self.value()])
 
 @admin.register(MealLog)
-class MealLogAdmin(admin.ModelAdmin):
+class MealLogAdmin(ScalableChangeListMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('name', 'user', 'consumed_at', 'meal_type', 'is_planned')
-    list_filter = ('user', 'meal_type', 'is_planned')
+    list_filter = (('user', AutocompleteListFilter), 'meal_type', 'is_planned')
+    list_select_related = ('user',)
     search_fields = ('name', 'description', 'user__username')
     date_hierarchy = 'consumed_at'
     autocomplete_fields = ('user', 'diet')
 
+    def get_changeform_initial_data(self, request):
+        initial = super().get_changeform_initial_data(request)
+        initial.setdefault('user', request.user.pk)
+        diet = active_diet(request, request.user)
+        if diet:
+            initial.setdefault('diet', diet.pk)
+        return initial
+
+    def save_model(self, request, obj, form, change):
+        if not change and obj.diet_id is None:
+            obj.diet = active_diet(request, obj.user_id, timezone.localdate(obj.consumed_at))
+        super().save_model(request, obj, form, change)
+
 
 @admin.register(PlannedMeal)
-class PlannedMealAdmin(admin.ModelAdmin):
+class PlannedMealAdmin(ScalableChangeListMixin, admin.ModelAdmin):
     list_display = ('name', 'diet', 'meal_type', 'display_days_of_week')
-    list_filter = ('diet', 'meal_type', 'days_of_week')
+    list_filter = (('diet', AutocompleteListFilter), 'meal_type', WeekdayListFilter)
+    list_select_related = ('diet__user',)
     search_fields = ('name', 'diet__name')
     autocomplete_fields = ('diet',)
+    actions = ('materialize_next_week',)
+
+    @admin.action(description='Gerar registros planejados para os próximos 7 dias')
+    def materialize_next_week(self, request, queryset):
+        start = timezone.localdate()
+        created = materialize_planned_meals(start, start + datetime.timedelta(days=6), queryset)
+        self.message_user(request, f"{created} registros planejados criados.")
 
     def display_days_of_week(self, obj):
         if not obj.days_of_week:
             return "Nenhum dia selecionado"
-        
-        day_map = dict(obj.DAYS_OF_WEEK)
-        return ", ".join(day_map.get(int(day)) for day in obj.days_of_week)
+
+        return ", ".join(weekday_labels(obj.days_of_week))
     
     display_days_of_week.short_description = 'Dias da Semana'
+
+
+@admin.register(DailyNutrition)
+class DailyNutritionAdmin(ScalableChangeListMixin, admin.ModelAdmin):
+    """Somente leitura: as linhas são mantidas por MealLog.rollups."""
+    list_display = ('user', 'date', 'calories', 'portions', 'meal_count', 'dessert_count')
+    list_filter = (('user', AutocompleteListFilter),)
+    list_select_related = ('user',)
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(WeeklyAdherence)
+class WeeklyAdherenceAdmin(ScalableChangeListMixin, admin.ModelAdmin):
+    """Somente leitura: as linhas são mantidas por MealLog.adherence."""
+    list_display = ('user', 'week_start', 'planned_slots', 'fulfilled_slots', 'adherence_display')
+    list_filter = (('user', AutocompleteListFilter),)
+    list_select_related = ('user',)
+    date_hierarchy = 'week_start'
+
+    @admin.display(description='Adesão')
+    def adherence_display(self, obj):
+        return '—' if obj.adherence is None else f'{obj.adherence:.0%}'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MonthlyMealSummary)
+class MonthlyMealSummaryAdmin(ScalableChangeListMixin, admin.ModelAdmin):
+    """Somente leitura: as linhas são mantidas por MealLog.archive."""
+    list_display = ('user', 'month', 'meal_type', 'meal_count', 'dessert_count', 'planned_count', 'planned_display')
+    list_filter = ('meal_type', ('user', AutocompleteListFilter))
+    list_select_related = ('user',)
+
+    @admin.display(description='Planejadas')
+    def planned_display(self, obj):
+        return '—' if obj.planned_ratio is None else f'{obj.planned_ratio:.0%}'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MealLogArchive)
+class MealLogArchiveAdmin(ScalableChangeListMixin, admin.ModelAdmin):
+    """Somente leitura: use os comandos archive_meal_logs e restore_meal_logs."""
+    list_display = ('month', 'row_count', 'path', 'archived_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -5,3 +5,6 @@ class MeallogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'MealLog'
     verbose_name = 'Registros de Refeição'
+
+    def ready(self):
+        from . import search, signals  # noqa: F401
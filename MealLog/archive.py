@@ -0,0 +1,247 @@
+"""
+Arquivamento de MealLog antigos.
+
+Os meses inteiros anteriores ao horizonte (MEAL_LOG_ARCHIVE_AFTER_DAYS) saem
+da tabela: as linhas vão para MEAL_LOG_ARCHIVE_DIR/meallog-AAAA-MM.jsonl.gz,
+um registro por linha, e ficam resumidas em MonthlyMealSummary (por usuário,
+mês e tipo de refeição). MealLogArchive guarda os meses arquivados e o caminho
+completo de cada arquivo. Arquivar de novo um mês (registros importados
+depois) acrescenta um membro gzip ao mesmo arquivo e soma aos resumos.
+
+A remoção não passa pelos sinais de MealLog: as contagens mensais
+(core.date_buckets) e o índice de busca são ajustados aqui em lote. As
+contagens diárias dos registros arquivados vão para as colunas archived_* de
+DailyNutrition, que MealLog.rollups soma às dos registros restantes, e
+WeeklyAdherence dos meses arquivados fica congelada (MealLog.adherence não a
+recalcula a partir de MealLog).
+
+restore_month() devolve as linhas do arquivo à tabela, com os mesmos pks, por
+MealLog.bulk.insert_meal_logs(): meal_logs_created recebe só as linhas
+regravadas, e as que colidem com registros atuais são contadas à parte.
+"""
+import datetime
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from Diet.models import Diet
+from .bulk import insert_meal_logs
+from .models import DailyNutrition, MealLog, MealLogArchive, MonthlyMealSummary
+from .rollups import daily_log_counts, refresh_daily_nutrition
+from .search import meal_log_index
+from .signals import meal_log_buckets
+
+BATCH_SIZE = 500
+
+ARCHIVE_FIELDS = ('id', 'user_id', 'consumed_at', 'name', 'meal_type', 'is_planned', 'is_dessert', 'diet_id',
+                  'description')
+
+
+def archive_directory():
+    return os.fspath(settings.MEAL_LOG_ARCHIVE_DIR)
+
+
+def archive_path(month, directory=None):
+    return os.path.join(directory or archive_directory(), f'meallog-{month:%Y-%m}.jsonl.gz')
+
+
+def _month_range(month):
+    start = timezone.make_aware(datetime.datetime(month.year, month.month, 1))
+    following = (month.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+    return start, timezone.make_aware(datetime.datetime(following.year, following.month, 1))
+
+
+def archive_cutoff(today=None, days=None):
+    """Primeiro dia do mês que contém o horizonte: os meses anteriores são arquivados."""
+    today = today or timezone.localdate()
+    days = settings.MEAL_LOG_ARCHIVE_AFTER_DAYS if days is None else days
+    return (today - datetime.timedelta(days=days)).replace(day=1)
+
+
+def archivable_months(cutoff):
+    """Meses (datas do dia 1) com registros anteriores a `cutoff`, do mais antigo ao mais recente."""
+    start, _ = _month_range(cutoff)
+    return [
+        value.date() for value in
+        MealLog.objects.filter(consumed_at__lt=start).datetimes('consumed_at', 'month')
+    ]
+
+
+def _summaries(logs, month):
+    rows = (
+        logs
+        .values('user_id', 'meal_type')
+        .order_by()
+        .annotate(
+            meal_count=Count('pk'),
+            dessert_count=Count('pk', filter=Q(is_dessert=True)),
+            planned_count=Count('pk', filter=Q(is_planned=True)),
+        )
+    )
+    existing = {
+        (summary.user_id, summary.meal_type): summary
+        for summary in MonthlyMealSummary.objects.filter(month=month)
+    }
+    summaries = []
+    for row in rows:
+        summary = existing.get((row['user_id'], row['meal_type'])) or MonthlyMealSummary(
+            user_id=row['user_id'], month=month, meal_type=row['meal_type'],
+        )
+        summary.meal_count += row['meal_count']
+        summary.dessert_count += row['dessert_count']
+        summary.planned_count += row['planned_count']
+        summaries.append(summary)
+    return summaries
+
+
+def _add_archived_counts(logs):
+    """Soma às colunas archived_* de DailyNutrition as contagens diárias de `logs`."""
+    totals = daily_log_counts(logs)
+    existing = {
+        (row.user_id, row.date): row
+        for row in DailyNutrition.objects.filter(
+            user_id__in={user_id for user_id, _ in totals}, date__in={date for _, date in totals}
+        )
+    }
+    rows = []
+    for (user_id, date), counts in totals.items():
+        row = existing.get((user_id, date)) or DailyNutrition(user_id=user_id, date=date)
+        row.archived_meal_count += counts['meal_count']
+        row.archived_dessert_count += counts['dessert_count']
+        rows.append(row)
+    DailyNutrition.objects.bulk_create(
+        rows,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user', 'date'],
+        update_fields=['archived_meal_count', 'archived_dessert_count'],
+    )
+    return set(totals)
+
+
+def _discard_appended(path, size):
+    if size is None:
+        os.remove(path)
+    else:
+        os.truncate(path, size)
+
+
+def archive_month(month, directory=None, batch_size=BATCH_SIZE):
+    """Arquiva os registros do mês; retorna quantos saíram de MealLog."""
+    month = month.replace(day=1)
+    start, end = _month_range(month)
+    logs = MealLog.objects.filter(consumed_at__gte=start, consumed_at__lt=end)
+    archive = MealLogArchive.objects.filter(month=month).first()
+    # Mês já arquivado: acrescenta ao mesmo arquivo, onde quer que ele esteja.
+    path = archive.path if archive else os.path.abspath(archive_path(month, directory))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size = os.path.getsize(path) if os.path.exists(path) else None
+    try:
+        with transaction.atomic():
+            summaries = _summaries(logs, month)
+            pks, consumed = [], []
+            # Modo "a": cada execução acrescenta um membro gzip; gzip.open lê todos em sequência.
+            with gzip.open(path, 'at', encoding='utf-8') as stream:
+                for row in logs.order_by('consumed_at', 'pk').values(*ARCHIVE_FIELDS).iterator(chunk_size=batch_size):
+                    stream.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+                    pks.append(row['id'])
+                    consumed.append(row['consumed_at'])
+            if not pks:
+                _discard_appended(path, size)
+                return 0
+            MonthlyMealSummary.objects.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=['user', 'month', 'meal_type'],
+                update_fields=['meal_count', 'dessert_count', 'planned_count'],
+            )
+            archive = archive or MealLogArchive(month=month, path=path)
+            archive.row_count += len(pks)
+            archive.save()
+            days = _add_archived_counts(logs)
+            meal_log_buckets.add(consumed, sign=-1)
+            meal_log_index.delete(pks)
+            for offset in range(0, len(pks), batch_size):
+                # Sem sinais: nada referencia MealLog e os efeitos derivados foram tratados acima.
+                MealLog.objects.filter(pk__in=pks[offset:offset + batch_size])._raw_delete(MealLog.objects.db)
+            refresh_daily_nutrition(days)
+    except BaseException:
+        _discard_appended(path, size)
+        raise
+    return len(pks)
+
+
+def archive_meal_logs(cutoff=None, directory=None, batch_size=BATCH_SIZE):
+    """Arquiva todos os meses anteriores a `cutoff`; retorna [(mês, registros)]."""
+    cutoff = cutoff or archive_cutoff()
+    return [
+        (month, archive_month(month, directory, batch_size))
+        for month in archivable_months(cutoff)
+    ]
+
+
+def read_archive(path):
+    """Gera os dicionários gravados no arquivo, com consumed_at já convertido."""
+    with gzip.open(path, 'rt', encoding='utf-8') as stream:
+        for line in stream:
+            row = json.loads(line)
+            row['consumed_at'] = parse_datetime(row['consumed_at'])
+            yield row
+
+
+def _restore_batch(rows, user_ids, diet_ids):
+    """Regrava as linhas; retorna (restauradas, já existentes pelo pk ou pela chave natural)."""
+    rows = [row for row in rows if row['user_id'] in user_ids]
+    taken = set(MealLog.objects.filter(pk__in=[row['id'] for row in rows]).values_list('pk', flat=True))
+    logs = [
+        MealLog(**{**row, 'diet_id': row['diet_id'] if row['diet_id'] in diet_ids else None})
+        for row in rows if row['id'] not in taken
+    ]
+    restored = len(insert_meal_logs(logs))
+    return restored, len(rows) - restored
+
+
+def restore_month(month, batch_size=BATCH_SIZE):
+    """
+    Devolve o mês arquivado a MealLog e apaga o arquivo após o commit; retorna
+    (restaurados, colisões). Registros de usuários removidos são descartados;
+    dietas removidas viram nulas. Uma linha cujo pk ou chave natural já está em
+    MealLog (registro gravado depois do arquivamento) não é regravada e conta
+    como colisão.
+    """
+    month = month.replace(day=1)
+    archive = MealLogArchive.objects.filter(month=month).first()
+    if archive is None:
+        return 0, 0
+    path = archive.path
+    user_ids = set(User.objects.values_list('pk', flat=True))
+    diet_ids = set(Diet.objects.values_list('pk', flat=True))
+    restored = collisions = 0
+    with transaction.atomic():
+        # Antes de regravar: os recálculos agendados pelo sinal já veem o mês como não arquivado.
+        MonthlyMealSummary.objects.filter(month=month).delete()
+        start, end = _month_range(month)
+        DailyNutrition.objects.filter(date__gte=start.date(), date__lt=end.date()).update(
+            archived_meal_count=0, archived_dessert_count=0,
+        )
+        archive.delete()
+        batch = []
+        for row in read_archive(path):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                inserted, skipped = _restore_batch(batch, user_ids, diet_ids)
+                restored, collisions = restored + inserted, collisions + skipped
+                batch = []
+        if batch:
+            inserted, skipped = _restore_batch(batch, user_ids, diet_ids)
+            restored, collisions = restored + inserted, collisions + skipped
+        transaction.on_commit(lambda: os.remove(path))
+    return restored, collisions
@@ -0,0 +1,62 @@
+"""
+Gravação em lote de MealLog pela chave natural (user, consumed_at, name).
+
+bulk_create com ignore_conflicts, no SQLite, não devolve os pks nem diz quais
+linhas foram puladas. insert_meal_logs() descarta as chaves que já existem e
+insere o resto sem ignore_conflicts, então o SQLite devolve os pks; se outra
+conexão gravou alguma das chaves nesse meio tempo, o INSERT falha dentro de um
+savepoint e é refeito só com as que faltam. meal_logs_created recebe apenas os
+registros realmente inseridos, então as contagens mensais e o índice de busca
+não ganham registros que não existem.
+"""
+from django.db import IntegrityError, transaction
+
+from .models import MealLog
+from .signals import meal_logs_created
+
+BATCH_SIZE = 500
+
+
+def natural_key(log):
+    return log.user_id, log.consumed_at, log.name
+
+
+def existing_log_ids(logs):
+    """pk dos registros já gravados com a chave natural de algum de `logs`, por chave."""
+    if not logs:
+        return {}
+    return {
+        (user_id, consumed_at, name): pk
+        for pk, user_id, consumed_at, name in MealLog.objects
+        .filter(user_id__in={log.user_id for log in logs}, consumed_at__in={log.consumed_at for log in logs})
+        .values_list('pk', 'user_id', 'consumed_at', 'name')
+    }
+
+
+def insert_meal_logs(logs, batch_size=BATCH_SIZE):
+    """
+    Insere os registros cuja chave ainda não existe (repetidos em `logs` contam
+    uma vez), envia meal_logs_created com eles e os retorna, já com pk.
+    """
+    inserted = []
+    with transaction.atomic():
+        for start in range(0, len(logs), batch_size):
+            batch = logs[start:start + batch_size]
+            existing = existing_log_ids(batch)
+            fresh = {}
+            for log in batch:
+                if natural_key(log) not in existing:
+                    fresh.setdefault(natural_key(log), log)
+            fresh = list(fresh.values())
+            try:
+                with transaction.atomic():
+                    MealLog.objects.bulk_create(fresh)
+            except IntegrityError:
+                # Outra conexão gravou alguma das chaves depois da leitura. O INSERT
+                # que falhou já tomou o lock de escrita, então a nova leitura vale.
+                taken = existing_log_ids(fresh)
+                fresh = [log for log in fresh if natural_key(log) not in taken]
+                MealLog.objects.bulk_create(fresh)
+            inserted += fresh
+        meal_logs_created.send(sender=MealLog, logs=inserted)
+    return inserted
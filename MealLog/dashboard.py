@@ -0,0 +1,139 @@
+"""
+Painel "hoje" por usuário: dieta vigente, marmitas do dia com as porções do
+usuário e refeições registradas, guardado no cache "dashboard".
+
+A chave inclui duas gerações, lidas antes de montar o painel: a do usuário e
+a do par (usuário, data). Os sinais em MealLog.signals trocam a geração de
+cada (usuário, data) afetado, na hora e de novo após o commit; mudanças numa
+dieta trocam a geração do usuário, o que torna todos os painéis dele
+inalcançáveis. Como nada é apagado, um painel montado antes do commit fica
+gravado sob a geração antiga e nunca é lido. Um acerto no cache não faz
+nenhuma query.
+
+O cache é configurado em settings.CACHES['dashboard'] (memória local com
+MAX_ENTRIES, removendo os menos usados, ou arquivos com DASHBOARD_CACHE_DIR).
+"""
+import datetime
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from Diet.models import Diet
+from MealPrep.models import MealPrep, MealPrepComponent
+from MealPrep.units import grams_expression, kcal_expression
+from .models import MealLog
+
+CACHE_ALIAS = 'dashboard'
+
+
+def dashboard_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _generation_key(user_id, date=None):
+    if date is None:
+        return f'dashboard:{user_id}:generation'
+    return f'dashboard:{user_id}:{date.isoformat()}:generation'
+
+
+def _generations(keys):
+    """Geração atual de cada chave; cria uma nova quando não há (ou foi removida)."""
+    cache = dashboard_cache()
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Nunca reaproveita um valor antigo: painéis de gerações anteriores
+            # ficam inalcançáveis mesmo que a chave da geração tenha sido descartada.
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def dashboard_key(user_id, date, generations):
+    return f'dashboard:{user_id}:{":".join(map(str, generations))}:{date.isoformat()}'
+
+
+def build_dashboard(user, date):
+    """Monta o painel direto do banco (quatro queries)."""
+    diet = Diet.objects.active_for(user, date)
+    portions = {}
+    for portion in (
+        MealPrepComponent.objects
+        .filter(user=user, meal_prep__target_date=date)
+        .select_related('component')
+        .annotate(grams=grams_expression(), kcal=kcal_expression())
+        .order_by('component__component_type', 'component__name')
+    ):
+        portions.setdefault(portion.meal_prep_id, []).append({
+            'component': portion.component.name,
+            'component_type': portion.component.component_type,
+            'quantity': portion.quantity,
+            'unit_of_measure': portion.unit_of_measure,
+            'grams': portion.grams,
+            'calories': portion.kcal,
+        })
+    meal_preps = [
+        {
+            'id': prep.pk,
+            'name': prep.name,
+            'meal_type': prep.meal_type,
+            'is_prepared': prep.is_prepared,
+            'portions': portions.get(prep.pk, []),
+        }
+        for prep in MealPrep.objects.filter(intended_for=user, target_date=date).order_by('meal_type', 'pk')
+    ]
+    day_start = timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+    meal_logs = list(
+        MealLog.objects
+        .filter(user=user, consumed_at__gte=day_start, consumed_at__lt=day_start + datetime.timedelta(days=1))
+        .order_by('consumed_at', 'pk')
+        .values('id', 'name', 'meal_type', 'consumed_at', 'is_planned', 'is_dessert')
+    )
+    return {
+        'date': date,
+        'diet': {'id': diet.pk, 'name': diet.name, 'end_date': diet.end_date} if diet else None,
+        'meal_preps': meal_preps,
+        'meal_logs': meal_logs,
+        'totals': {
+            'prep_calories': sum(p['calories'] or 0 for items in portions.values() for p in items),
+            'meal_count': len(meal_logs),
+            'dessert_count': sum(log['is_dessert'] for log in meal_logs),
+        },
+    }
+
+
+def get_dashboard(user, date=None):
+    date = date or timezone.localdate()
+    cache = dashboard_cache()
+    generations = _generations([_generation_key(user.pk), _generation_key(user.pk, date)])
+    key = dashboard_key(user.pk, date, generations)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_dashboard(user, date)
+        cache.set(key, payload)
+    return payload
+
+
+def _new_generations(keys):
+    dashboard_cache().set_many({key: time.time_ns() for key in keys}, timeout=None)
+
+
+def _bump(keys):
+    _new_generations(keys)
+    transaction.on_commit(lambda: _new_generations(keys))
+
+
+def invalidate_dashboards(keys):
+    """Invalida os painéis das chaves (user_id, date), agora e após o commit."""
+    keys = {(user_id, date) for user_id, date in keys if user_id and isinstance(date, datetime.date)}
+    if keys:
+        _bump([_generation_key(user_id, date) for user_id, date in keys])
+
+
+def invalidate_user_dashboards(user_ids):
+    """Invalida todos os painéis dos usuários, agora e após o commit."""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if user_ids:
+        _bump([_generation_key(user_id) for user_id in user_ids])
@@ -0,0 +1,128 @@
+"""
+Exportação do histórico completo de um usuário em CSV ou JSONL.
+
+As linhas saem de geradores sobre QuerySet.iterator(chunk_size=...), com as
+FKs exibidas carregadas por select_related; a memória usada não depende do
+tamanho do histórico. O mesmo gerador alimenta a view (StreamingHttpResponse)
+e o comando export_meal_history.
+
+Cada linha traz `record_type` (meal_log, meal_prep ou meal_prep_component);
+no CSV o cabeçalho é a união das colunas dos três tipos.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from MealPrep.models import MealPrep, MealPrepComponent
+from .models import MealLog
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+
+RECORD_FIELDS = {
+    'meal_log': ('id', 'user', 'consumed_at', 'name', 'meal_type', 'is_planned', 'is_dessert', 'diet', 'description'),
+    'meal_prep': ('id', 'user', 'target_date', 'name', 'meal_type', 'quantity', 'is_prepared', 'prepared_on',
+                  'diet', 'notes'),
+    'meal_prep_component': ('id', 'user', 'meal_prep', 'target_date', 'component', 'quantity', 'unit_of_measure',
+                            'notes'),
+}
+
+CSV_COLUMNS = ('record_type',) + tuple(dict.fromkeys(
+    name for fields in RECORD_FIELDS.values() for name in fields
+))
+
+
+def _meal_logs(user, chunk_size):
+    logs = (
+        MealLog.objects
+        .filter(user=user)
+        .select_related('user', 'diet')
+        .order_by('consumed_at', 'pk')
+    )
+    for log in logs.iterator(chunk_size=chunk_size):
+        yield 'meal_log', {
+            'id': log.pk,
+            'user': log.user.username,
+            'consumed_at': log.consumed_at,
+            'name': log.name,
+            'meal_type': log.meal_type,
+            'is_planned': log.is_planned,
+            'is_dessert': log.is_dessert,
+            'diet': log.diet.name if log.diet else None,
+            'description': log.description,
+        }
+
+
+def _meal_preps(user, chunk_size):
+    preps = (
+        MealPrep.objects
+        .filter(intended_for=user)
+        .select_related('diet')
+        .order_by('target_date', 'pk')
+    )
+    for prep in preps.iterator(chunk_size=chunk_size):
+        yield 'meal_prep', {
+            'id': prep.pk,
+            'user': user.username,
+            'target_date': prep.target_date,
+            'name': prep.name,
+            'meal_type': prep.meal_type,
+            'quantity': prep.quantity,
+            'is_prepared': prep.is_prepared,
+            'prepared_on': prep.prepared_on,
+            'diet': prep.diet.name if prep.diet else None,
+            'notes': prep.notes,
+        }
+
+
+def _meal_prep_components(user, chunk_size):
+    components = (
+        MealPrepComponent.objects
+        .filter(user=user)
+        .select_related('user', 'component', 'meal_prep')
+        .order_by('meal_prep__target_date', 'pk')
+    )
+    for item in components.iterator(chunk_size=chunk_size):
+        yield 'meal_prep_component', {
+            'id': item.pk,
+            'user': item.user.username,
+            'meal_prep': item.meal_prep_id,
+            'target_date': item.meal_prep.target_date,
+            'component': item.component.name,
+            'quantity': item.quantity,
+            'unit_of_measure': item.unit_of_measure,
+            'notes': item.notes,
+        }
+
+
+def history_records(user, chunk_size=CHUNK_SIZE):
+    """Gera (record_type, dicionário) para todo o histórico do usuário."""
+    yield from _meal_logs(user, chunk_size)
+    yield from _meal_preps(user, chunk_size)
+    yield from _meal_prep_components(user, chunk_size)
+
+
+class _Line:
+    """Destino de csv.writer que apenas devolve a linha escrita."""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(user, file_format, chunk_size=CHUNK_SIZE):
+    """Gera as linhas (str) do arquivo de exportação no formato pedido."""
+    if file_format == 'csv':
+        writer = csv.DictWriter(_Line(), fieldnames=CSV_COLUMNS)
+        yield writer.writeheader()
+        for record_type, record in history_records(user, chunk_size):
+            yield writer.writerow({'record_type': record_type, **record})
+    elif file_format == 'jsonl':
+        for record_type, record in history_records(user, chunk_size):
+            yield json.dumps({'record_type': record_type, **record}, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+    else:
+        raise ValueError(f"Formato desconhecido: {file_format}")
@@ -0,0 +1,90 @@
+"""
+Campo de dias da semana armazenado como bitmask inteiro.
+
+Bit 0 = segunda-feira ... bit 6 = domingo, seguindo datetime.date.weekday().
+Consultas como `.filter(days_of_week__has=TUESDAY)` viram `(coluna & 2) = 2`.
+"""
+from django import forms
+from django.db import models
+
+WEEKDAYS = (
+    (0, 'Segunda-feira'),
+    (1, 'Terça-feira'),
+    (2, 'Quarta-feira'),
+    (3, 'Quinta-feira'),
+    (4, 'Sexta-feira'),
+    (5, 'Sábado'),
+    (6, 'Domingo'),
+)
+
+MONDAY, TUESDAY, WEDNESDAY, THURSDAY, FRIDAY, SATURDAY, SUNDAY = (1 << day for day, _ in WEEKDAYS)
+ALL_DAYS = (1 << len(WEEKDAYS)) - 1
+
+
+def weekday_bit(date):
+    """Bit correspondente ao dia da semana de `date`."""
+    return 1 << date.weekday()
+
+
+def mask_from_days(days):
+    """Converte índices de dias (0 = segunda) em bitmask."""
+    mask = 0
+    for day in days:
+        mask |= 1 << int(day)
+    return mask
+
+
+def days_from_mask(mask):
+    """Converte o bitmask em índices de dias, em ordem."""
+    return [day for day, _ in WEEKDAYS if mask and mask & (1 << day)]
+
+
+def weekday_labels(mask):
+    labels = dict(WEEKDAYS)
+    return [labels[day] for day in days_from_mask(mask)]
+
+
+class WeekdaysFormField(forms.TypedMultipleChoiceField):
+    widget = forms.CheckboxSelectMultiple
+
+    def __init__(self, **kwargs):
+        kwargs.pop('max_length', None)
+        kwargs.pop('min_value', None)
+        kwargs.pop('max_value', None)
+        kwargs.pop('step_size', None)
+        kwargs.setdefault('choices', WEEKDAYS)
+        super().__init__(coerce=int, **kwargs)
+
+    def prepare_value(self, value):
+        if isinstance(value, int):
+            return days_from_mask(value)
+        return value
+
+    def has_changed(self, initial, data):
+        if isinstance(initial, int):
+            initial = days_from_mask(initial)
+        return super().has_changed(initial, data)
+
+    def clean(self, value):
+        return mask_from_days(super().clean(value))
+
+
+class WeekdaysField(models.PositiveSmallIntegerField):
+    """Bitmask de dias da semana editado no admin como caixas de seleção."""
+
+    def formfield(self, **kwargs):
+        # O admin sugere AdminIntegerFieldWidget para inteiros; o bitmask precisa de múltipla escolha.
+        if not getattr(kwargs.get('widget'), 'allow_multiple_selected', False):
+            kwargs['widget'] = forms.CheckboxSelectMultiple
+        return super().formfield(**{'form_class': WeekdaysFormField, **kwargs})
+
+
+@WeekdaysField.register_lookup
+class HasWeekdays(models.Lookup):
+    """`days_of_week__has=mask`: verdadeiro se todos os bits de `mask` estiverem ligados."""
+    lookup_name = 'has'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'({lhs} & {rhs}) = {rhs}', (*lhs_params, *rhs_params, *rhs_params)
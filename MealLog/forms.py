@@ -0,0 +1,31 @@
+from django import forms
+from django.utils import timezone
+
+from .models import MealLog
+
+
+class MealLogEntryForm(forms.Form):
+    """
+    Valida um registro recebido pela API de ingestão. Não consulta o banco,
+    então pode rodar direto no event loop; a dieta é conferida na gravação.
+    """
+    name = forms.CharField(max_length=200)
+    meal_type = forms.ChoiceField(choices=MealLog.MealType.choices)
+    consumed_at = forms.DateTimeField(required=False)
+    is_planned = forms.BooleanField(required=False)
+    is_dessert = forms.BooleanField(required=False)
+    description = forms.CharField(required=False)
+    diet = forms.IntegerField(required=False, min_value=1)
+
+    def to_meal_log(self, user_id):
+        data = self.cleaned_data
+        return MealLog(
+            user_id=user_id,
+            name=data['name'],
+            meal_type=data['meal_type'],
+            consumed_at=data['consumed_at'] or timezone.now(),
+            is_planned=data['is_planned'],
+            is_dessert=data['is_dessert'],
+            description=data['description'],
+            diet_id=data['diet'],
+        )
@@ -0,0 +1,223 @@
+"""
+Importação em massa do histórico de refeições (CSV ou JSONL).
+
+Os arquivos são lidos linha a linha; só um bloco de `transaction_size` linhas
+fica em memória por vez. Cada bloco é gravado numa transação, em lotes de
+`batch_size` com bulk_create, e as linhas que já existem pela chave natural
+(user, consumed_at, name) são ignoradas, então reimportar o mesmo arquivo não
+cria nada.
+
+Colunas reconhecidas: user (username; opcional se um usuário padrão for
+informado), name, meal_type (código ou rótulo), consumed_at (ISO 8601; sem
+fuso, vale o horário local), is_planned, is_dessert, diet (id) e description.
+"""
+import csv
+import datetime
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from Diet.models import Diet
+from .models import MealLog
+from .signals import meal_logs_created
+
+BATCH_SIZE = 1000
+TRANSACTION_SIZE = 20000
+MAX_REPORTED_ERRORS = 20
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'sim', 's', 'x'}
+FALSE_VALUES = {'', '0', 'false', 'f', 'no', 'n', 'nao', 'não'}
+
+MEAL_TYPES = {
+    **{value.lower(): value for value in MealLog.MealType.values},
+    **{label.lower(): value for value, label in MealLog.MealType.choices},
+}
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def read_rows(stream, file_format):
+    """Gera (número da linha, dicionário) a partir de um arquivo CSV ou JSONL aberto."""
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, RowError(f"JSON inválido: {exc}")
+                continue
+            yield line_number, row if isinstance(row, dict) else RowError("a linha não é um objeto JSON")
+    else:
+        raise ValueError(f"Formato desconhecido: {file_format}")
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value if value is not None else '').strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RowError(f"valor booleano inválido: {value!r}")
+
+
+def _datetime(value):
+    text = str(value or '').strip()
+    moment = parse_datetime(text)
+    if moment is None:
+        day = parse_date(text)
+        if day is None:
+            raise RowError(f"data/hora inválida: {value!r}")
+        moment = datetime.datetime.combine(day, datetime.time(12, 0))
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class RowMapper:
+    """Converte linhas em MealLog, com cache de usuários e dietas já consultados."""
+
+    def __init__(self, default_user=None):
+        self.default_user = default_user
+        self.user_ids = {}
+        self.diet_owners = {}
+
+    def _user_id(self, username):
+        if not username:
+            if self.default_user is None:
+                raise RowError("coluna 'user' vazia e nenhum usuário padrão informado")
+            return self.default_user.pk
+        if username not in self.user_ids:
+            self.user_ids[username] = User.objects.filter(username=username).values_list('pk', flat=True).first()
+        if self.user_ids[username] is None:
+            raise RowError(f"usuário inexistente: {username!r}")
+        return self.user_ids[username]
+
+    def _diet_id(self, value, user_id):
+        if value in (None, ''):
+            return None
+        try:
+            diet_id = int(value)
+        except (TypeError, ValueError):
+            raise RowError(f"dieta inválida: {value!r}")
+        if diet_id not in self.diet_owners:
+            self.diet_owners[diet_id] = Diet.objects.filter(pk=diet_id).values_list('user_id', flat=True).first()
+        if self.diet_owners[diet_id] != user_id:
+            raise RowError(f"dieta {diet_id} inexistente ou de outro usuário")
+        return diet_id
+
+    def __call__(self, row):
+        name = str(row.get('name') or '').strip()
+        if not name:
+            raise RowError("coluna 'name' vazia")
+        meal_type = MEAL_TYPES.get(str(row.get('meal_type') or '').strip().lower())
+        if meal_type is None:
+            raise RowError(f"tipo de refeição inválido: {row.get('meal_type')!r}")
+        user_id = self._user_id(str(row.get('user') or '').strip())
+        return MealLog(
+            user_id=user_id,
+            name=name[:200],
+            meal_type=meal_type,
+            consumed_at=_datetime(row.get('consumed_at')),
+            is_planned=_boolean(row.get('is_planned')),
+            is_dessert=_boolean(row.get('is_dessert')),
+            diet_id=self._diet_id(row.get('diet'), user_id),
+            description=row.get('description') or '',
+        )
+
+
+def _existing_keys(logs):
+    """Chaves naturais já gravadas, consultando só os instantes exatos dos registros de `logs`."""
+    return set(
+        MealLog.objects
+        .filter(user_id__in={log.user_id for log in logs}, consumed_at__in={log.consumed_at for log in logs})
+        .values_list('user_id', 'consumed_at', 'name')
+    )
+
+
+def _write_batch(logs, stats):
+    """Grava um lote, descartando duplicatas internas e as que já estão no banco."""
+    existing = _existing_keys(logs)
+    new_logs = []
+    for log in logs:
+        key = (log.user_id, log.consumed_at, log.name)
+        if key in existing:
+            stats.duplicates += 1
+        else:
+            existing.add(key)
+            new_logs.append(log)
+    try:
+        with transaction.atomic():
+            MealLog.objects.bulk_create(new_logs)
+    except IntegrityError:
+        # Outro processo gravou alguma das chaves depois da consulta. A transação
+        # externa já tem o lock de escrita, então a nova consulta é definitiva.
+        taken = _existing_keys(new_logs)
+        remaining = [log for log in new_logs if (log.user_id, log.consumed_at, log.name) not in taken]
+        stats.duplicates += len(new_logs) - len(remaining)
+        new_logs = remaining
+        MealLog.objects.bulk_create(new_logs)
+    stats.created += len(new_logs)
+    return new_logs
+
+
+def import_meal_logs(rows, default_user=None, batch_size=BATCH_SIZE, transaction_size=TRANSACTION_SIZE, progress=None):
+    """
+    Importa as linhas de `read_rows` e retorna um ImportStats. Linhas inválidas
+    são contadas e as primeiras são guardadas em `errors` (linha, mensagem).
+    `progress(stats)` é chamado após cada transação.
+    """
+    stats = ImportStats()
+    mapper = RowMapper(default_user)
+    rows = iter(rows)
+    started = time.perf_counter()
+    while chunk := list(islice(rows, transaction_size)):
+        logs = []
+        for line_number, row in chunk:
+            stats.read += 1
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                logs.append(mapper(row))
+            except RowError as exc:
+                stats.invalid += 1
+                if len(stats.errors) < MAX_REPORTED_ERRORS:
+                    stats.errors.append((line_number, str(exc)))
+        with transaction.atomic():
+            created = []
+            for start in range(0, len(logs), batch_size):
+                created += _write_batch(logs[start:start + batch_size], stats)
+            meal_logs_created.send(sender=MealLog, logs=created)
+        stats.elapsed = time.perf_counter() - started
+        if progress is not None:
+            progress(stats)
+    stats.elapsed = time.perf_counter() - started
+    return stats
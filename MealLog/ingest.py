@@ -0,0 +1,117 @@
+"""
+Ingestão assíncrona de MealLog com gravação em lotes.
+
+Requisições concorrentes entregam seus registros a um MealLogBatcher, que
+os acumula por uma janela curta (ou até um tamanho máximo) e grava tudo com
+um único insert_meal_logs() (MealLog.bulk) numa transação. Cada requisição só
+recebe a resposta depois do commit do lote que contém os seus registros.
+"""
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from Diet.models import Diet
+from .bulk import existing_log_ids, insert_meal_logs, natural_key
+
+
+def write_meal_logs(logs):
+    """
+    Grava os registros e retorna um resultado por registro, na mesma ordem:
+    {'status': 'created', 'id': ...}, {'status': 'duplicate', 'id': ...} (o
+    registro que já existia) ou {'status': 'invalid', 'errors': {...}}.
+    """
+    results = [None] * len(logs)
+    diet_ids = {log.diet_id for log in logs if log.diet_id}
+    diet_owners = dict(Diet.objects.filter(pk__in=diet_ids).values_list('pk', 'user_id')) if diet_ids else {}
+    existing = existing_log_ids(logs)
+    pending = {}
+    duplicates = []
+    new_logs = []
+    for index, log in enumerate(logs):
+        key = natural_key(log)
+        if log.diet_id and diet_owners.get(log.diet_id) != log.user_id:
+            results[index] = {'status': 'invalid', 'errors': {'diet': ['Dieta inexistente ou de outro usuário.']}}
+        elif key in existing or key in pending:
+            duplicates.append((index, key))
+        else:
+            pending[key] = log
+            new_logs.append((index, log))
+
+    inserted = {natural_key(log) for log in insert_meal_logs([log for _, log in new_logs])}
+    # Chaves gravadas por outro processo entre a verificação acima e o INSERT: o
+    # registro não foi inserido e aparece como duplicado do que já existe.
+    taken = [log for _, log in new_logs if natural_key(log) not in inserted]
+    if taken:
+        existing.update(existing_log_ids(taken))
+        duplicates += [(index, natural_key(log)) for index, log in new_logs if natural_key(log) not in inserted]
+        new_logs = [(index, log) for index, log in new_logs if natural_key(log) in inserted]
+    for index, log in new_logs:
+        results[index] = {'status': 'created', 'id': log.pk}
+    for index, key in duplicates:
+        results[index] = {'status': 'duplicate', 'id': existing[key] if key in existing else pending[key].pk}
+    return results
+
+
+class MealLogBatcher:
+    def __init__(self, window=None, max_size=None):
+        self.window = window if window is not None else getattr(settings, 'MEAL_LOG_INGEST_WINDOW', 0.05)
+        self.max_size = max_size or getattr(settings, 'MEAL_LOG_INGEST_MAX_BATCH', 500)
+        self._pending = []
+        self._pending_size = 0
+        self._timer = None
+        self._tasks = set()
+        self._write_lock = asyncio.Lock()
+
+    async def submit(self, logs):
+        """Enfileira os registros e espera o commit do lote; retorna os resultados deles."""
+        if not logs:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((logs, future))
+        self._pending_size += len(logs)
+        if self._pending_size >= self.max_size:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_pending)
+        return await future
+
+    def _flush_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_size = self._pending, [], 0
+        if batch:
+            task = asyncio.ensure_future(self._write(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch):
+        logs = [log for entry_logs, _ in batch for log in entry_logs]
+        try:
+            # Um lote por vez: no SQLite só há um escritor de qualquer forma.
+            async with self._write_lock:
+                results = await sync_to_async(write_meal_logs)(logs)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        offset = 0
+        for entry_logs, future in batch:
+            if not future.done():
+                future.set_result(results[offset:offset + len(entry_logs)])
+            offset += len(entry_logs)
+
+
+_batchers = weakref.WeakKeyDictionary()
+
+
+def get_batcher():
+    """Um batcher por event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _batchers:
+        _batchers[loop] = MealLogBatcher()
+    return _batchers[loop]
@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from MealLog.archive import archivable_months, archive_cutoff, archive_month
+
+
+class Command(BaseCommand):
+    help = (
+        "Move os registros de refeição dos meses anteriores ao horizonte para arquivos .jsonl.gz "
+        "(MEAL_LOG_ARCHIVE_DIR), deixando resumos mensais por usuário e tipo de refeição."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Horizonte em dias (padrão: MEAL_LOG_ARCHIVE_AFTER_DAYS).")
+        parser.add_argument('--before', type=datetime.date.fromisoformat,
+                            help="Arquiva os meses anteriores ao mês desta data (AAAA-MM-DD).")
+        parser.add_argument('--directory', help="Pasta dos arquivos (padrão: MEAL_LOG_ARCHIVE_DIR).")
+        parser.add_argument('--dry-run', action='store_true', help="Só lista os meses que seriam arquivados.")
+
+    def handle(self, *args, **options):
+        cutoff = (options['before'] or archive_cutoff(days=options['days'])).replace(day=1)
+        months = archivable_months(cutoff)
+        if not months:
+            self.stdout.write(f"Nenhum registro anterior a {cutoff:%m/%Y}.")
+            return
+        total = 0
+        for month in months:
+            if options['dry_run']:
+                self.stdout.write(f"  {month:%m/%Y}")
+                continue
+            count = archive_month(month, options['directory'])
+            total += count
+            self.stdout.write(f"  {month:%m/%Y}: {count} registros")
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{total} registros arquivados em {len(months)} meses."))
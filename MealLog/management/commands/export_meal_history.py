@@ -0,0 +1,37 @@
+import resource
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from MealLog.export import CHUNK_SIZE, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta o histórico completo de um usuário (registros de refeição, marmitas e porções) "
+        "para um arquivo CSV ou JSONL, informando o tempo gasto e o pico de memória do processo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path', help="Arquivo de saída.")
+        parser.add_argument('--format', choices=tuple(FORMATS), default='csv')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"Usuário inexistente: {options['username']}")
+        started = time.perf_counter()
+        lines = 0
+        with open(options['path'], 'w', newline='', encoding='utf-8') as output:
+            for line in export_lines(user, options['format'], options['chunk_size']):
+                output.write(line)
+                lines += 1
+        elapsed = time.perf_counter() - started
+        # ru_maxrss é informado em KiB no Linux.
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(self.style.SUCCESS(
+            f"{lines} linhas gravadas em {options['path']} em {elapsed:.1f}s (pico de memória: {peak_rss:.0f} MiB)."
+        ))
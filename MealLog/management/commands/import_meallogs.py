@@ -0,0 +1,52 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from MealLog.importing import BATCH_SIZE, TRANSACTION_SIZE, import_meal_logs, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa registros de refeição (MealLog) de um arquivo CSV ou JSONL, lendo linha a linha. "
+        "Registros já existentes (usuário, horário e nome) são ignorados, então o comando pode ser repetido."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Arquivo .csv ou .jsonl.")
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help="Padrão: pela extensão do arquivo.")
+        parser.add_argument('--user', help="Username usado nas linhas sem a coluna 'user'.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Linhas por bulk_create.")
+        parser.add_argument('--transaction-size', type=int, default=TRANSACTION_SIZE, help="Linhas por transação.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError("Informe --format=csv ou --format=jsonl.")
+        default_user = None
+        if options['user']:
+            default_user = User.objects.filter(username=options['user']).first()
+            if default_user is None:
+                raise CommandError(f"Usuário inexistente: {options['user']}")
+
+        verbosity = options['verbosity']
+
+        def progress(stats):
+            if verbosity >= 2:
+                self.stdout.write(f"{stats.read} linhas lidas ({stats.rows_per_second:.0f} linhas/s)")
+
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            stats = import_meal_logs(
+                read_rows(stream, file_format),
+                default_user=default_user,
+                batch_size=options['batch_size'],
+                transaction_size=options['transaction_size'],
+                progress=progress,
+            )
+        for line_number, message in stats.errors:
+            self.stderr.write(f"Linha {line_number}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats.read} linhas lidas: {stats.created} criadas, {stats.duplicates} já existentes, "
+            f"{stats.invalid} inválidas em {stats.elapsed:.1f}s ({stats.rows_per_second:.0f} linhas/s)."
+        ))
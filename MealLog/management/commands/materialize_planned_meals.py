@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from MealLog.models import PlannedMeal
+from MealLog.planning import materialize_planned_meals
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera os registros de refeição planejados (MealLog) a partir das refeições "
+        "planejadas das dietas vigentes. Pode ser executado várias vezes sem duplicar registros."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=datetime.date.fromisoformat,
+                            help="Data inicial (AAAA-MM-DD). Padrão: hoje.")
+        parser.add_argument('--end', type=datetime.date.fromisoformat,
+                            help="Data final (AAAA-MM-DD). Padrão: início + --days - 1.")
+        parser.add_argument('--days', type=int, default=7, help="Quantidade de dias quando --end não é informado.")
+        parser.add_argument('--diet', type=int, action='append', help="Restringe a uma dieta (pode repetir).")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        start = options['start'] or timezone.localdate()
+        end = options['end'] or start + datetime.timedelta(days=options['days'] - 1)
+        if end < start:
+            raise CommandError("A data final deve ser igual ou posterior à inicial.")
+        planned_meals = PlannedMeal.objects.all()
+        if options['diet']:
+            planned_meals = planned_meals.filter(diet_id__in=options['diet'])
+        created = materialize_planned_meals(start, end, planned_meals, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} registros planejados criados entre {start:%d/%m/%Y} e {end:%d/%m/%Y}."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from MealLog.rollups import rebuild_daily_nutrition
+
+
+class Command(BaseCommand):
+    help = "Reconstrói do zero a tabela de resumos nutricionais diários (DailyNutrition)."
+
+    def handle(self, *args, **options):
+        count = rebuild_daily_nutrition()
+        self.stdout.write(self.style.SUCCESS(f"{count} resumos diários gerados."))
@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from Diet.models import Diet
+from MealLog.adherence import refresh_weekly_adherence
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula a tabela de adesão semanal (WeeklyAdherence), comparando as refeições "
+        "planejadas das dietas com os registros de refeição, numa única query por execução."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=datetime.date.fromisoformat,
+                            help="Data inicial (AAAA-MM-DD). Padrão: hoje - --weeks semanas.")
+        parser.add_argument('--end', type=datetime.date.fromisoformat, help="Data final (AAAA-MM-DD). Padrão: hoje.")
+        parser.add_argument('--weeks', type=int, default=4, help="Semanas recalculadas quando --start não é informado.")
+        parser.add_argument('--all', action='store_true', help="Desde o início da dieta mais antiga.")
+        parser.add_argument('--user', type=int, action='append', help="Restringe a um usuário (id; pode repetir).")
+
+    def handle(self, *args, **options):
+        end = options['end'] or timezone.localdate()
+        if options['all']:
+            start = Diet.objects.aggregate(first=Min('start_date'))['first'] or end
+        else:
+            start = options['start'] or end - datetime.timedelta(weeks=options['weeks'])
+        if end < start:
+            raise CommandError("A data final deve ser igual ou posterior à inicial.")
+        count = refresh_weekly_adherence(start, end, options['user'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} semanas de adesão calculadas entre {start:%d/%m/%Y} e {end:%d/%m/%Y}."
+        ))
@@ -0,0 +1,34 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from MealLog.archive import restore_month
+from MealLog.models import MealLogArchive
+
+
+def _month(value):
+    return datetime.datetime.strptime(value, '%Y-%m').date()
+
+
+class Command(BaseCommand):
+    help = "Devolve a MealLog os registros de meses arquivados e apaga os arquivos correspondentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('months', nargs='*', type=_month, help="Meses no formato AAAA-MM.")
+        parser.add_argument('--all', action='store_true', help="Restaura todos os meses arquivados.")
+
+    def handle(self, *args, **options):
+        months = options['months']
+        if options['all']:
+            months = list(MealLogArchive.objects.order_by('month').values_list('month', flat=True))
+        elif not months:
+            raise CommandError("Informe os meses (AAAA-MM) ou --all.")
+        missing = set(months) - set(MealLogArchive.objects.filter(month__in=months).values_list('month', flat=True))
+        if missing:
+            raise CommandError("Meses não arquivados: " + ', '.join(f'{month:%Y-%m}' for month in sorted(missing)))
+        for month in months:
+            count, collisions = restore_month(month)
+            line = f"  {month:%m/%Y}: {count} registros"
+            if collisions:
+                line += f" ({collisions} já existiam em MealLog e não foram regravados)"
+            self.stdout.write(line)
@@ -2,7 +2,6 @@
 
 import django.db.models.deletion
 import django.utils.timezone
-import multiselectfield.db.fields
 from django.conf import settings
 from django.db import migrations, models
 
@@ -41,7 +40,7 @@ class Migration(migrations.Migration):
             fields=[
                 ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
                 ('name', models.CharField(max_length=200, verbose_name='Nome do Plano')),
-                ('days_of_week', multiselectfield.db.fields.MultiSelectField(choices=[(0, 'Segunda-feira'), (1, 'Terça-feira'), (2, 'Quarta-feira'), (3, 'Quinta-feira'), (4, 'Sexta-feira'), (5, 'Sábado'), (6, 'Domingo')], max_length=13, verbose_name='Dias da Semana')),
+                ('days_of_week', models.CharField(max_length=13, verbose_name='Dias da Semana')),
                 ('meal_type', models.CharField(choices=[('BREAKFAST', 'Café da Manhã'), ('MORNING_SNACK', 'Lanche da Manhã'), ('AFTERNOON_SNACK', 'Lanche da Tarde'), ('SUPPER', 'Ceia'), ('POST_WORKOUT', 'Pós-Treino'), ('OTHER', 'Outro')], max_length=20)),
                 ('diet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='Diet.diet')),
             ],
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Diet', '0001_initial'),
+        ('MealLog', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='plannedmeal',
+            options={'verbose_name': 'Refeição Planejada', 'verbose_name_plural': 'Refeições Planejadas'},
+        ),
+        migrations.AlterField(
+            model_name='plannedmeal',
+            name='diet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='Diet.diet', verbose_name='Plano alimentar'),
+        ),
+        migrations.AlterField(
+            model_name='plannedmeal',
+            name='meal_type',
+            field=models.CharField(choices=[('BREAKFAST', 'Café da Manhã'), ('MORNING_SNACK', 'Lanche da Manhã'), ('AFTERNOON_SNACK', 'Lanche da Tarde'), ('SUPPER', 'Ceia'), ('POST_WORKOUT', 'Pós-Treino'), ('OTHER', 'Outro')], max_length=20, verbose_name='Marmita'),
+        ),
+        migrations.CreateModel(
+            name='DailyNutrition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Data')),
+                ('calories', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Calorias das marmitas')),
+                ('portions', models.PositiveIntegerField(default=0, verbose_name='Porções de marmita')),
+                ('meal_count', models.PositiveIntegerField(default=0, verbose_name='Refeições registradas')),
+                ('dessert_count', models.PositiveIntegerField(default=0, verbose_name='Sobremesas registradas')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_nutrition', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Resumo Nutricional Diário',
+                'verbose_name_plural': 'Resumos Nutricionais Diários',
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:29
+
+import MealLog.fields
+from django.db import migrations, models
+
+
+def strings_to_mask(apps, schema_editor):
+    PlannedMeal = apps.get_model('MealLog', 'PlannedMeal')
+    planned_meals = list(PlannedMeal.objects.only('days_of_week'))
+    for planned_meal in planned_meals:
+        days = [day for day in planned_meal.days_of_week.split(',') if day.strip()]
+        planned_meal.days_mask = MealLog.fields.mask_from_days(days)
+    PlannedMeal.objects.bulk_update(planned_meals, ['days_mask'], batch_size=500)
+
+
+def mask_to_strings(apps, schema_editor):
+    PlannedMeal = apps.get_model('MealLog', 'PlannedMeal')
+    planned_meals = list(PlannedMeal.objects.only('days_mask'))
+    for planned_meal in planned_meals:
+        planned_meal.days_of_week = ','.join(
+            str(day) for day in MealLog.fields.days_from_mask(planned_meal.days_mask)
+        )
+    PlannedMeal.objects.bulk_update(planned_meals, ['days_of_week'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealLog', '0002_dailynutrition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plannedmeal',
+            name='days_mask',
+            field=MealLog.fields.WeekdaysField(default=0, verbose_name='Dias da Semana'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(strings_to_mask, mask_to_strings),
+        # Default só para que a reversão consiga recriar a coluna antiga.
+        migrations.AlterField(
+            model_name='plannedmeal',
+            name='days_of_week',
+            field=models.CharField(default='', max_length=13, verbose_name='Dias da Semana'),
+        ),
+        migrations.RemoveField(
+            model_name='plannedmeal',
+            name='days_of_week',
+        ),
+        migrations.RenameField(
+            model_name='plannedmeal',
+            old_name='days_mask',
+            new_name='days_of_week',
+        ),
+        migrations.AlterField(
+            model_name='plannedmeal',
+            name='days_of_week',
+            field=MealLog.fields.WeekdaysField(db_index=True, help_text='Bitmask: segunda-feira = 1, terça-feira = 2, ..., domingo = 64.', verbose_name='Dias da Semana'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Coalesce
+
+
+MAX_REPORTED_CONFLICTS = 20
+
+
+def remove_duplicate_logs(apps, schema_editor):
+    """
+    Funde só as cópias idênticas em todas as colunas (fica a de menor id).
+    Registros com a mesma chave natural e conteúdo diferente interrompem a
+    migração, listados, para serem resolvidos à mão.
+    """
+    MealLog = apps.get_model('MealLog', 'MealLog')
+    same_key = {'user_id': OuterRef('user_id'), 'consumed_at': OuterRef('consumed_at'), 'name': OuterRef('name')}
+    logs = MealLog.objects.annotate(diet_key=Coalesce('diet_id', 0))
+    copies = logs.filter(Exists(logs.filter(
+        **same_key,
+        meal_type=OuterRef('meal_type'),
+        is_planned=OuterRef('is_planned'),
+        is_dessert=OuterRef('is_dessert'),
+        description=OuterRef('description'),
+        diet_key=OuterRef('diet_key'),
+        pk__lt=OuterRef('pk'),
+    )))
+    MealLog.objects.filter(pk__in=list(copies.values_list('pk', flat=True))).delete()
+
+    conflicts = {}
+    for pk, user_id, consumed_at, name in (
+        MealLog.objects
+        .filter(Exists(MealLog.objects.filter(**same_key).exclude(pk=OuterRef('pk'))))
+        .order_by('user_id', 'consumed_at', 'name', 'pk')
+        .values_list('pk', 'user_id', 'consumed_at', 'name')
+    ):
+        conflicts.setdefault((user_id, consumed_at, name), []).append(pk)
+    if conflicts:
+        lines = [
+            f"  usuário {user_id}, {consumed_at:%Y-%m-%d %H:%M}, {name!r}: ids {pks}"
+            for (user_id, consumed_at, name), pks in list(conflicts.items())[:MAX_REPORTED_CONFLICTS]
+        ]
+        if len(conflicts) > MAX_REPORTED_CONFLICTS:
+            lines.append(f"  ... e mais {len(conflicts) - MAX_REPORTED_CONFLICTS}")
+        # A migração roda numa transação: as cópias fundidas acima voltam também.
+        raise RuntimeError(
+            "MealLog com a mesma chave (usuário, horário, nome) e conteúdo diferente; "
+            "resolva-os antes de migrar:\n" + '\n'.join(lines)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Diet', '0001_initial'),
+        ('MealLog', '0003_weekday_bitmask'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_logs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='meallog',
+            constraint=models.UniqueConstraint(fields=('user', 'consumed_at', 'name'), name='meallog_natural_key'),
+        ),
+    ]
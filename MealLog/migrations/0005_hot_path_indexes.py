@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Diet', '0002_hot_path_indexes'),
+        ('MealLog', '0004_meallog_natural_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meallog',
+            index=models.Index(fields=['user', '-consumed_at', '-id'], name='meallog_user_consumed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meallog',
+            index=models.Index(fields=['-consumed_at', '-id'], name='meallog_consumed_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealLog', '0005_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE VIRTUAL TABLE meallog_fts USING fts5("
+                "name, description, username, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+                'INSERT INTO meallog_fts (rowid, name, description, username) '
+                'SELECT log.id, log.name, log.description, u.username '
+                'FROM "MealLog_meallog" log JOIN auth_user u ON u.id = log.user_id',
+            ],
+            reverse_sql=["DROP TABLE meallog_fts"],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealLog', '0007_weeklyadherence'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='meallog',
+            name='meal_type',
+            field=models.CharField(choices=[('BREAKFAST', 'Café da Manhã'), ('MORNING_SNACK', 'Lanche da Manhã'), ('LUNCH', 'Almoço'), ('AFTERNOON_SNACK', 'Lanche da Tarde'), ('DINNER', 'Janta'), ('SUPPER', 'Ceia'), ('POST_WORKOUT', 'Pós-Treino'), ('OTHER', 'Outro')], max_length=20, verbose_name='Tipo de Refeição'),
+        ),
+        migrations.AlterField(
+            model_name='plannedmeal',
+            name='meal_type',
+            field=models.CharField(choices=[('BREAKFAST', 'Café da Manhã'), ('MORNING_SNACK', 'Lanche da Manhã'), ('LUNCH', 'Almoço'), ('AFTERNOON_SNACK', 'Lanche da Tarde'), ('DINNER', 'Janta'), ('SUPPER', 'Ceia'), ('POST_WORKOUT', 'Pós-Treino'), ('OTHER', 'Outro')], max_length=20, verbose_name='Marmita'),
+        ),
+    ]
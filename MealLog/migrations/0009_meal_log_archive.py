@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealLog', '0008_meal_type_lunch_dinner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True, verbose_name='Mês')),
+                ('file_name', models.CharField(max_length=100, verbose_name='Arquivo')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='Registros arquivados')),
+                ('archived_at', models.DateTimeField(auto_now=True, verbose_name='Arquivado em')),
+            ],
+            options={
+                'verbose_name': 'Arquivo de Registros',
+                'verbose_name_plural': 'Arquivos de Registros',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyMealSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mês')),
+                ('meal_type', models.CharField(choices=[('BREAKFAST', 'Café da Manhã'), ('MORNING_SNACK', 'Lanche da Manhã'), ('LUNCH', 'Almoço'), ('AFTERNOON_SNACK', 'Lanche da Tarde'), ('DINNER', 'Janta'), ('SUPPER', 'Ceia'), ('POST_WORKOUT', 'Pós-Treino'), ('OTHER', 'Outro')], max_length=20, verbose_name='Tipo de Refeição')),
+                ('meal_count', models.PositiveIntegerField(default=0, verbose_name='Refeições registradas')),
+                ('dessert_count', models.PositiveIntegerField(default=0, verbose_name='Sobremesas registradas')),
+                ('planned_count', models.PositiveIntegerField(default=0, verbose_name='Refeições planejadas')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_meal_summaries', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Resumo Mensal Arquivado',
+                'verbose_name_plural': 'Resumos Mensais Arquivados',
+                'ordering': ['-month', 'meal_type'],
+                'unique_together': {('user', 'month', 'meal_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:31
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def backfill_archived_counts(apps, schema_editor):
+    """Nos meses já arquivados, a parte das contagens que não vem de MealLog é de registros arquivados."""
+    DailyNutrition = apps.get_model('MealLog', 'DailyNutrition')
+    MealLog = apps.get_model('MealLog', 'MealLog')
+    MealLogArchive = apps.get_model('MealLog', 'MealLogArchive')
+    for month in MealLogArchive.objects.values_list('month', flat=True):
+        following = (month + datetime.timedelta(days=32)).replace(day=1)
+        days = list(DailyNutrition.objects.filter(date__gte=month, date__lt=following))
+        live = {
+            (row['user_id'], row['day']): row
+            for row in MealLog.objects
+            .annotate(day=TruncDate('consumed_at'))
+            .filter(day__gte=month, day__lt=following)
+            .values('user_id', 'day')
+            .order_by()
+            .annotate(meal_count=Count('id'), dessert_count=Count('id', filter=Q(is_dessert=True)))
+        }
+        for row in days:
+            counts = live.get((row.user_id, row.date), {})
+            row.archived_meal_count = max(row.meal_count - counts.get('meal_count', 0), 0)
+            row.archived_dessert_count = max(row.dessert_count - counts.get('dessert_count', 0), 0)
+        DailyNutrition.objects.bulk_update(days, ['archived_meal_count', 'archived_dessert_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealLog', '0009_meal_log_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailynutrition',
+            name='archived_dessert_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Sobremesas arquivadas'),
+        ),
+        migrations.AddField(
+            model_name='dailynutrition',
+            name='archived_meal_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Refeições arquivadas'),
+        ),
+        migrations.RunPython(backfill_archived_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:40
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def file_name_to_path(apps, schema_editor):
+    """Os arquivos gravados até aqui estão em MEAL_LOG_ARCHIVE_DIR."""
+    MealLogArchive = apps.get_model('MealLog', 'MealLogArchive')
+    directory = os.path.abspath(settings.MEAL_LOG_ARCHIVE_DIR)
+    for archive in MealLogArchive.objects.all():
+        archive.path = os.path.join(directory, archive.path)
+        archive.save(update_fields=['path'])
+
+
+def path_to_file_name(apps, schema_editor):
+    MealLogArchive = apps.get_model('MealLog', 'MealLogArchive')
+    for archive in MealLogArchive.objects.all():
+        archive.path = os.path.basename(archive.path)
+        archive.save(update_fields=['path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealLog', '0010_dailynutrition_archived_counts'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='meallogarchive',
+            old_name='file_name',
+            new_name='path',
+        ),
+        migrations.AlterField(
+            model_name='meallogarchive',
+            name='path',
+            field=models.CharField(max_length=500, verbose_name='Arquivo'),
+        ),
+        migrations.RunPython(file_name_to_path, path_to_file_name),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:53
+
+import MealLog.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealLog', '0011_meallogarchive_path'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='plannedmeal',
+            name='days_of_week',
+            field=MealLog.fields.WeekdaysField(help_text='Bitmask: segunda-feira = 1, terça-feira = 2, ..., domingo = 64.', verbose_name='Dias da Semana'),
+        ),
+    ]
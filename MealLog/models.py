@@ -1,8 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
-from multiselectfield import MultiSelectField
 from Diet.models import Diet
+from .fields import WEEKDAYS, WeekdaysField
 
 class MealLog(models.Model):
     """
@@ -12,7 +12,9 @@ class MealLog(models.Model):
     class MealType(models.TextChoices):
         BREAKFAST = 'BREAKFAST', 'Café da Manhã'
         MORNING_SNACK = 'MORNING_SNACK', 'Lanche da Manhã'
+        LUNCH = 'LUNCH', 'Almoço'
         AFTERNOON_SNACK = 'AFTERNOON_SNACK', 'Lanche da Tarde'
+        DINNER = 'DINNER', 'Janta'
         SUPPER = 'SUPPER', 'Ceia'
         POST_WORKOUT = 'POST_WORKOUT', 'Pós-Treino'
         OTHER = 'OTHER', 'Outro'
@@ -65,30 +67,31 @@ class MealLog(models.Model):
         verbose_name = "Registro de Refeição"
         verbose_name_plural = "Registros de Refeições"
         ordering = ['-consumed_at']
+        constraints = [
+            # Chave natural usada para deduplicar gerações e importações.
+            models.UniqueConstraint(fields=['user', 'consumed_at', 'name'], name='meallog_natural_key'),
+        ]
+        indexes = [
+            # Registros do usuário num intervalo, do mais recente para o mais antigo.
+            models.Index(fields=['user', '-consumed_at', '-id'], name='meallog_user_consumed_idx'),
+            # Ordenação padrão (changelist sem filtro).
+            models.Index(fields=['-consumed_at', '-id'], name='meallog_consumed_idx'),
+        ]
         
         
 class PlannedMeal(models.Model):
     """
     Exemplo de um model para templates de refeições planejadas.
     """
-    DAYS_OF_WEEK = (
-        (0, 'Segunda-feira'),
-        (1, 'Terça-feira'),
-        (2, 'Quarta-feira'),
-        (3, 'Quinta-feira'),
-        (4, 'Sexta-feira'),
-        (5, 'Sábado'),
-        (6, 'Domingo'),
-    )
+    DAYS_OF_WEEK = WEEKDAYS
 
     name = models.CharField(
         max_length=200,
         verbose_name="Nome do Plano"
     )
-    days_of_week = MultiSelectField(
-        choices=DAYS_OF_WEEK,
-        max_choices=7,
-        verbose_name="Dias da Semana"
+    days_of_week = WeekdaysField(
+        verbose_name="Dias da Semana",
+        help_text="Bitmask: segunda-feira = 1, terça-feira = 2, ..., domingo = 64."
     )
     meal_type = models.CharField(
         max_length=20,
@@ -107,3 +110,171 @@ class PlannedMeal(models.Model):
     
     def __str__(self):
         return self.name
+
+
+class DailyNutrition(models.Model):
+    """
+    Resumo diário materializado por usuário, mantido incrementalmente pelos
+    sinais em MealLog.signals e reconstruído pelo comando rebuild_daily_nutrition.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_nutrition',
+        verbose_name="Usuário"
+    )
+    date = models.DateField(
+        verbose_name="Data"
+    )
+    calories = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name="Calorias das marmitas"
+    )
+    portions = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Porções de marmita"
+    )
+    meal_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Refeições registradas"
+    )
+    dessert_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Sobremesas registradas"
+    )
+    # Parte das contagens acima vinda de registros já arquivados (MealLog.archive).
+    archived_meal_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Refeições arquivadas"
+    )
+    archived_dessert_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Sobremesas arquivadas"
+    )
+
+    class Meta:
+        verbose_name = "Resumo Nutricional Diário"
+        verbose_name_plural = "Resumos Nutricionais Diários"
+        ordering = ['-date']
+        unique_together = ('user', 'date')
+
+    def __str__(self):
+        return f"{self.user.username} em {self.date.strftime('%d/%m/%Y')}"
+
+
+class WeeklyAdherence(models.Model):
+    """
+    Adesão semanal à dieta: refeições previstas pelas PlannedMeal da dieta
+    vigente e quantas delas foram registradas (MealLog planejado do mesmo tipo
+    no mesmo dia). Mantida por MealLog.adherence.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='weekly_adherence',
+        verbose_name="Usuário"
+    )
+    week_start = models.DateField(
+        verbose_name="Semana (segunda-feira)"
+    )
+    planned_slots = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Refeições previstas"
+    )
+    fulfilled_slots = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Refeições cumpridas"
+    )
+
+    class Meta:
+        verbose_name = "Adesão Semanal"
+        verbose_name_plural = "Adesões Semanais"
+        ordering = ['-week_start']
+        unique_together = ('user', 'week_start')
+
+    @property
+    def adherence(self):
+        """Fração das refeições previstas que foram cumpridas (0 a 1)."""
+        return self.fulfilled_slots / self.planned_slots if self.planned_slots else None
+
+    def __str__(self):
+        return f"{self.user.username} na semana de {self.week_start.strftime('%d/%m/%Y')}"
+
+
+
+class MonthlyMealSummary(models.Model):
+    """
+    Contagens mensais por usuário e tipo de refeição dos registros já
+    arquivados (MealLog.archive). Os registros em si ficam nos arquivos
+    .jsonl.gz e podem ser restaurados.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='monthly_meal_summaries',
+        verbose_name="Usuário"
+    )
+    month = models.DateField(
+        verbose_name="Mês"
+    )
+    meal_type = models.CharField(
+        max_length=20,
+        choices=MealLog.MealType.choices,
+        verbose_name="Tipo de Refeição"
+    )
+    meal_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Refeições registradas"
+    )
+    dessert_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Sobremesas registradas"
+    )
+    planned_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Refeições planejadas"
+    )
+
+    class Meta:
+        verbose_name = "Resumo Mensal Arquivado"
+        verbose_name_plural = "Resumos Mensais Arquivados"
+        ordering = ['-month', 'meal_type']
+        unique_together = ('user', 'month', 'meal_type')
+
+    @property
+    def planned_ratio(self):
+        """Fração das refeições do mês que estavam no plano (0 a 1)."""
+        return self.planned_count / self.meal_count if self.meal_count else None
+
+    def __str__(self):
+        return f"{self.user.username} em {self.month.strftime('%m/%Y')} ({self.get_meal_type_display()})"
+
+
+class MealLogArchive(models.Model):
+    """Mês de MealLog movido para um arquivo .jsonl.gz (por padrão em MEAL_LOG_ARCHIVE_DIR)."""
+    month = models.DateField(
+        unique=True,
+        verbose_name="Mês"
+    )
+    path = models.CharField(
+        max_length=500,
+        verbose_name="Arquivo"
+    )
+    row_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Registros arquivados"
+    )
+    archived_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Arquivado em"
+    )
+
+    class Meta:
+        verbose_name = "Arquivo de Registros"
+        verbose_name_plural = "Arquivos de Registros"
+        ordering = ['-month']
+
+    def __str__(self):
+        return self.month.strftime('%m/%Y')
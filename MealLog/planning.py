@@ -0,0 +1,72 @@
+"""
+Expansão dos templates PlannedMeal em registros MealLog planejados.
+
+Para um intervalo de datas, cada refeição planejada de uma dieta vigente gera
+um MealLog (is_planned=True) por dia da semana marcado. A geração é idempotente:
+registros que já existem pela chave natural (user, consumed_at, name) são
+ignorados, e as inserções são feitas em lotes por MealLog.bulk.
+"""
+import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .bulk import insert_meal_logs
+from .fields import weekday_bit
+from .models import MealLog, PlannedMeal
+
+# Horário padrão em que cada tipo de refeição é registrado.
+MEAL_TIMES = {
+    MealLog.MealType.BREAKFAST: datetime.time(7, 0),
+    MealLog.MealType.MORNING_SNACK: datetime.time(10, 0),
+    MealLog.MealType.LUNCH: datetime.time(12, 30),
+    MealLog.MealType.AFTERNOON_SNACK: datetime.time(16, 0),
+    MealLog.MealType.POST_WORKOUT: datetime.time(19, 0),
+    MealLog.MealType.DINNER: datetime.time(20, 0),
+    MealLog.MealType.SUPPER: datetime.time(21, 30),
+    MealLog.MealType.OTHER: datetime.time(12, 0),
+}
+
+
+def meal_datetime(date, meal_type):
+    """Data/hora local em que uma refeição do tipo `meal_type` é registrada em `date`."""
+    return timezone.make_aware(datetime.datetime.combine(date, MEAL_TIMES[meal_type]))
+
+
+def _days(start, end):
+    for offset in range((end - start).days + 1):
+        yield start + datetime.timedelta(days=offset)
+
+
+def planned_meal_logs(start, end, planned_meals=None):
+    """Gera (sem salvar) os MealLog implicados pelos templates entre `start` e `end`."""
+    planned_meals = (planned_meals if planned_meals is not None else PlannedMeal.objects.all())
+    planned_meals = (
+        planned_meals
+        .select_related('diet')
+        .filter(diet__start_date__lte=end)
+        .filter(Q(diet__end_date__isnull=True) | Q(diet__end_date__gte=start))
+    )
+    for planned_meal in planned_meals:
+        diet = planned_meal.diet
+        first = max(start, diet.start_date)
+        last = min(end, diet.end_date) if diet.end_date else end
+        for day in _days(first, last):
+            if planned_meal.days_of_week & weekday_bit(day):
+                yield MealLog(
+                    user_id=diet.user_id,
+                    diet=diet,
+                    name=planned_meal.name,
+                    meal_type=planned_meal.meal_type,
+                    consumed_at=meal_datetime(day, planned_meal.meal_type),
+                    is_planned=True,
+                )
+
+
+def materialize_planned_meals(start, end, planned_meals=None, batch_size=500):
+    """
+    Cria os MealLog planejados que ainda não existem entre `start` e `end`.
+    Retorna a quantidade de registros criados.
+    """
+    candidates = list(planned_meal_logs(start, end, planned_meals))
+    return len(insert_meal_logs(candidates, batch_size=batch_size))
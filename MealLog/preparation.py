@@ -0,0 +1,84 @@
+"""
+Fim de uma sessão de preparo: marca várias marmitas como feitas e registra,
+para cada pessoa de intended_for, a refeição planejada correspondente.
+
+Tudo roda numa transação com um número fixo de queries, qualquer que seja a
+quantidade de marmitas e pessoas: um UPDATE para as marmitas e um
+insert_meal_logs() (MealLog.bulk) para os MealLog. Registros que já existem
+pela chave natural (user, consumed_at, name) não são duplicados.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from Diet.models import Diet
+from MealPrep.models import MealPrep
+from .bulk import insert_meal_logs
+from .dashboard import invalidate_dashboards
+from .models import MealLog
+from .planning import meal_datetime
+
+
+def _diet_picker(user_ids, first, last):
+    """Função (user_id, data) -> id da dieta vigente, com uma única query."""
+    diets = {}
+    for pk, user_id, start_date, end_date in (
+        Diet.objects
+        .filter(user_id__in=user_ids, start_date__lte=last)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=first))
+        .order_by('-start_date')
+        .values_list('pk', 'user_id', 'start_date', 'end_date')
+    ):
+        diets.setdefault(user_id, []).append((pk, start_date, end_date))
+
+    def pick(user_id, date):
+        for pk, start_date, end_date in diets.get(user_id, ()):
+            if start_date <= date and (end_date is None or end_date >= date):
+                return pk
+        return None
+    return pick
+
+
+def prepare_meal_preps(meal_preps, prepared_on=None, batch_size=500):
+    """
+    Marca como feitas as marmitas ainda não preparadas de `meal_preps` e cria
+    os MealLog planejados de cada destinatário. Retorna (marmitas, registros).
+    """
+    prepared_on = prepared_on or timezone.localdate()
+    preps = list(
+        meal_preps.filter(is_prepared=False)
+        .order_by()
+        .values('pk', 'name', 'target_date', 'meal_type', 'diet_id', 'diet__user_id')
+    )
+    if not preps:
+        return 0, 0
+    by_pk = {prep['pk']: prep for prep in preps}
+    recipients = list(
+        MealPrep.intended_for.through.objects
+        .filter(mealprep_id__in=by_pk)
+        .values_list('mealprep_id', 'user_id')
+    )
+    dates = [prep['target_date'] for prep in preps]
+    active_diet = _diet_picker({user_id for _, user_id in recipients}, min(dates), max(dates))
+
+    candidates = []
+    for prep_id, user_id in recipients:
+        prep = by_pk[prep_id]
+        # A dieta da marmita só vale para o próprio dono; os demais usam a dieta vigente.
+        diet_id = prep['diet_id'] if prep['diet__user_id'] == user_id else active_diet(user_id, prep['target_date'])
+        candidates.append(MealLog(
+            user_id=user_id,
+            diet_id=diet_id,
+            name=prep['name'],
+            meal_type=prep['meal_type'],
+            consumed_at=meal_datetime(prep['target_date'], prep['meal_type']),
+            is_planned=True,
+        ))
+    with transaction.atomic():
+        # update() não dispara post_save: o painel de cada destinatário é invalidado abaixo.
+        updated = MealPrep.objects.filter(pk__in=by_pk, is_prepared=False).update(
+            is_prepared=True, prepared_on=prepared_on,
+        )
+        inserted = insert_meal_logs(candidates, batch_size=batch_size)
+        invalidate_dashboards({(user_id, by_pk[prep_id]['target_date']) for prep_id, user_id in recipients})
+    return updated, len(inserted)
@@ -0,0 +1,166 @@
+"""
+Manutenção da tabela DailyNutrition.
+
+As funções aqui recalculam apenas as chaves (user_id, date) afetadas por uma
+alteração, com duas queries agregadas por lote de chaves, em vez de somar todo
+o histórico a cada relatório.
+
+Os registros arquivados (MealLog.archive) não estão mais em MealLog: suas
+contagens ficam em archived_meal_count/archived_dessert_count, gravadas no
+arquivamento, e são somadas às dos registros ainda em MealLog.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+
+from MealPrep.models import MealPrepComponent
+from MealPrep.units import kcal_expression
+from .models import DailyNutrition, MealLog, MealLogArchive
+
+BATCH_SIZE = 500
+
+ROLLUP_FIELDS = ('calories', 'portions', 'meal_count', 'dessert_count')
+
+
+def _prep_totals(components):
+    """Soma calorias (MealPrep.units) e porções por (usuário, data) das marmitas destinadas ao usuário."""
+    rows = (
+        components
+        .filter(meal_prep__intended_for=F('user'))
+        .values('user_id', 'meal_prep__target_date')
+        .order_by()
+        .annotate(calories=Sum(kcal_expression()), portions=Count('id'))
+    )
+    return {
+        (row['user_id'], row['meal_prep__target_date']): row
+        for row in rows
+    }
+
+
+def daily_log_counts(logs):
+    """Conta refeições e sobremesas registradas por (usuário, data local)."""
+    rows = (
+        logs
+        .annotate(day=TruncDate('consumed_at'))
+        .values('user_id', 'day')
+        .order_by()
+        .annotate(meal_count=Count('id'), dessert_count=Count('id', filter=Q(is_dessert=True)))
+    )
+    return {(row['user_id'], row['day']): row for row in rows}
+
+
+def archived_months():
+    """Meses (datas do dia 1) cujos registros foram arquivados."""
+    return set(MealLogArchive.objects.values_list('month', flat=True))
+
+
+def _archived_totals(rows):
+    """Contagens de registros arquivados por (usuário, data), das linhas que as têm."""
+    return {
+        (row['user_id'], row['date']): row
+        for row in rows
+        .filter(Q(archived_meal_count__gt=0) | Q(archived_dessert_count__gt=0))
+        .values('user_id', 'date', 'archived_meal_count', 'archived_dessert_count')
+    }
+
+
+def _build_rows(keys, prep_totals, log_totals, archived_totals):
+    rows = []
+    for user_id, date in keys:
+        prep = prep_totals.get((user_id, date), {})
+        log = log_totals.get((user_id, date), {})
+        archived = archived_totals.get((user_id, date), {})
+        if not prep and not log and not archived:
+            continue
+        archived_meals = archived.get('archived_meal_count', 0)
+        archived_desserts = archived.get('archived_dessert_count', 0)
+        rows.append(DailyNutrition(
+            user_id=user_id,
+            date=date,
+            calories=prep.get('calories') or 0,
+            portions=prep.get('portions', 0),
+            meal_count=log.get('meal_count', 0) + archived_meals,
+            dessert_count=log.get('dessert_count', 0) + archived_desserts,
+            archived_meal_count=archived_meals,
+            archived_dessert_count=archived_desserts,
+        ))
+    return rows
+
+
+def refresh_daily_nutrition(keys):
+    """Recalcula as linhas de DailyNutrition para as chaves (user_id, date) informadas."""
+    keys = sorted({(user_id, date) for user_id, date in keys if user_id and date})
+    for start in range(0, len(keys), BATCH_SIZE):
+        batch = keys[start:start + BATCH_SIZE]
+        wanted = set(batch)
+        user_ids = {user_id for user_id, _ in batch}
+        dates = {date for _, date in batch}
+        prep_totals = _prep_totals(MealPrepComponent.objects.filter(
+            user_id__in=user_ids, meal_prep__target_date__in=dates
+        ))
+        log_totals = daily_log_counts(MealLog.objects.filter(
+            user_id__in=user_ids, consumed_at__date__in=dates
+        ))
+        archived_totals = _archived_totals(DailyNutrition.objects.filter(user_id__in=user_ids, date__in=dates))
+        rows = _build_rows(batch, prep_totals, log_totals, archived_totals)
+        live = {(row.user_id, row.date) for row in rows}
+        stale = [
+            pk for pk, user_id, date in DailyNutrition.objects
+            .filter(user_id__in=user_ids, date__in=dates)
+            .values_list('pk', 'user_id', 'date')
+            if (user_id, date) in wanted and (user_id, date) not in live
+        ]
+        with transaction.atomic():
+            if stale:
+                DailyNutrition.objects.filter(pk__in=stale).delete()
+            DailyNutrition.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['user', 'date'],
+                update_fields=ROLLUP_FIELDS,
+            )
+
+
+def schedule_refresh(keys):
+    """Agenda o recálculo para depois do commit da transação atual."""
+    keys = set(keys)
+    if keys:
+        transaction.on_commit(lambda: refresh_daily_nutrition(keys))
+
+
+def rebuild_daily_nutrition():
+    """
+    Reconstrói DailyNutrition inteira a partir de MealPrepComponent e MealLog,
+    preservando as contagens de registros arquivados.
+    """
+    prep_totals = _prep_totals(MealPrepComponent.objects.all())
+    log_totals = daily_log_counts(MealLog.objects.all())
+    archived_totals = _archived_totals(DailyNutrition.objects.all())
+    keys = sorted(set(prep_totals) | set(log_totals) | set(archived_totals))
+    rows = _build_rows(keys, prep_totals, log_totals, archived_totals)
+    with transaction.atomic():
+        DailyNutrition.objects.all().delete()
+        DailyNutrition.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def nutrition_series(user, start, end, period='week'):
+    """
+    Agrega DailyNutrition por semana ou mês para gráficos. Lê no máximo uma
+    linha por dia do intervalo.
+    """
+    trunc = {'week': TruncWeek, 'month': TruncMonth}[period]
+    return list(
+        DailyNutrition.objects
+        .filter(user=user, date__range=(start, end))
+        .annotate(period=trunc('date'))
+        .values('period')
+        .order_by('period')
+        .annotate(
+            calories=Sum('calories'),
+            portions=Sum('portions'),
+            meal_count=Sum('meal_count'),
+            dessert_count=Sum('dessert_count'),
+        )
+    )
+
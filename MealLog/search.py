@@ -0,0 +1,29 @@
+"""Índice de busca textual (core.search) dos registros de refeição."""
+from django.contrib.auth.models import User
+from django.dispatch import receiver
+
+from core.search import register
+from .models import MealLog
+from .signals import meal_logs_created
+
+meal_log_index = register(
+    MealLog,
+    'meallog_fts',
+    {'name': 'name', 'description': 'description', 'username': 'user__username'},
+    weights=[10, 1, 5],
+    related={User: ('user', ('username',))},
+)
+
+
+@receiver(meal_logs_created, sender=MealLog)
+def index_bulk_meal_logs(sender, logs, **kwargs):
+    if not logs:
+        return
+    if all(log.pk for log in logs):
+        meal_log_index.update_queryset(MealLog.objects.filter(pk__in=[log.pk for log in logs]))
+        return
+    # bulk_create com ignore_conflicts não devolve os pks; reindexa o intervalo gravado.
+    meal_log_index.update_queryset(MealLog.objects.filter(
+        user_id__in={log.user_id for log in logs},
+        consumed_at__range=(min(log.consumed_at for log in logs), max(log.consumed_at for log in logs)),
+    ))
@@ -0,0 +1,190 @@
+"""
+Sinais que mantêm DailyNutrition, WeeklyAdherence e o cache do painel diário
+atualizados.
+
+Cada receiver calcula as chaves (user_id, date) afetadas, incluindo as antigas
+quando uma alteração move a linha de usuário ou de data, agenda o recálculo
+para depois do commit e invalida os painéis dessas chaves. Alterações numa
+dieta invalidam todos os painéis do usuário. A adesão semanal é recalculada
+para as semanas dos registros alterados e, quando muda uma dieta ou refeição
+planejada, para todo o período da dieta.
+
+As contagens mensais de consumed_at (core.date_buckets) alimentam o
+date_hierarchy do admin.
+
+bulk_create não dispara post_save; quem grava MealLog em lote envia
+meal_logs_created com os registros criados.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from core import date_buckets
+from Diet.models import Diet
+from MealPrep.models import MealComponent, MealPrep, MealPrepComponent
+from .adherence import schedule_adherence_refresh
+from .dashboard import invalidate_dashboards, invalidate_user_dashboards
+from .models import MealLog, PlannedMeal
+from .rollups import schedule_refresh
+
+
+meal_logs_created = Signal()
+
+meal_log_buckets = date_buckets.register(MealLog, 'consumed_at')
+
+
+def _changed(keys):
+    keys = set(keys)
+    schedule_refresh(keys)
+    invalidate_dashboards(keys)
+
+
+def _log_key(user_id, consumed_at):
+    return (user_id, timezone.localtime(consumed_at).date())
+
+
+@receiver(pre_save, sender=MealLog)
+def remember_meal_log_key(sender, instance, **kwargs):
+    instance._old_rollup_keys = {
+        _log_key(user_id, consumed_at)
+        for user_id, consumed_at in sender.objects
+        .filter(pk=instance.pk).values_list('user_id', 'consumed_at')
+    } if instance.pk else set()
+
+
+@receiver(post_save, sender=MealLog)
+@receiver(post_delete, sender=MealLog)
+def refresh_meal_log(sender, instance, **kwargs):
+    keys = getattr(instance, '_old_rollup_keys', set()) | {_log_key(instance.user_id, instance.consumed_at)}
+    _changed(keys)
+    schedule_adherence_refresh({user_id for user_id, _ in keys}, [date for _, date in keys])
+
+
+@receiver(meal_logs_created, sender=MealLog)
+def refresh_bulk_meal_logs(sender, logs, **kwargs):
+    keys = {_log_key(log.user_id, log.consumed_at) for log in logs}
+    meal_log_buckets.add(log.consumed_at for log in logs)
+    _changed(keys)
+    schedule_adherence_refresh({user_id for user_id, _ in keys}, [date for _, date in keys])
+
+
+@receiver(pre_save, sender=MealPrepComponent)
+def remember_component_key(sender, instance, **kwargs):
+    instance._old_rollup_keys = set(
+        sender.objects.filter(pk=instance.pk).values_list('user_id', 'meal_prep__target_date')
+    ) if instance.pk else set()
+
+
+@receiver(post_save, sender=MealPrepComponent)
+@receiver(post_delete, sender=MealPrepComponent)
+def refresh_meal_prep_component(sender, instance, **kwargs):
+    keys = getattr(instance, '_old_rollup_keys', set())
+    _changed(keys | {(instance.user_id, instance.meal_prep.target_date)})
+
+
+def _meal_prep_keys(meal_prep):
+    user_ids = meal_prep.intended_for.values_list('pk', flat=True)
+    return {(user_id, meal_prep.target_date) for user_id in user_ids}
+
+
+@receiver(pre_save, sender=MealPrep)
+def remember_meal_prep_date(sender, instance, **kwargs):
+    instance._old_target_date = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('target_date', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=MealPrep)
+def refresh_meal_prep(sender, instance, created, **kwargs):
+    if created:
+        return
+    keys = _meal_prep_keys(instance)
+    old_date = getattr(instance, '_old_target_date', None)
+    if old_date == instance.target_date:
+        # Nome, tipo ou situação mudaram: só o painel depende disso.
+        invalidate_dashboards(keys)
+    else:
+        _changed(keys | {(user_id, old_date) for user_id, _ in keys})
+
+
+@receiver(pre_delete, sender=MealPrep)
+def refresh_deleted_meal_prep(sender, instance, **kwargs):
+    _changed(_meal_prep_keys(instance))
+
+
+@receiver(m2m_changed, sender=MealPrep.intended_for.through)
+def refresh_intended_for(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_rollup_keys = {
+                (instance.pk, date) for date in instance.meal_preps.values_list('target_date', flat=True)
+            }
+        else:
+            instance._cleared_rollup_keys = _meal_prep_keys(instance)
+    elif action == 'post_clear':
+        _changed(getattr(instance, '_cleared_rollup_keys', set()))
+    elif action in ('post_add', 'post_remove'):
+        if reverse:
+            dates = MealPrep.objects.filter(pk__in=pk_set).values_list('target_date', flat=True)
+            _changed({(instance.pk, date) for date in dates})
+        else:
+            _changed({(user_id, instance.target_date) for user_id in pk_set})
+
+
+# Campos de MealComponent que entram nas calorias (MealPrep.units).
+CALORIE_FIELDS = ('calories_per_serving', 'serving_size_grams', 'grams_per_ml', 'grams_per_unit')
+
+
+def _component_keys(component):
+    return set(
+        MealPrepComponent.objects
+        .filter(component=component)
+        .values_list('user_id', 'meal_prep__target_date')
+        .distinct()
+    )
+
+
+@receiver(pre_save, sender=MealComponent)
+def refresh_component_calories(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    old = sender.objects.filter(pk=instance.pk).values(*CALORIE_FIELDS, 'name', 'component_type').first()
+    if old is None:
+        return
+    if any(old[name] != getattr(instance, name) for name in CALORIE_FIELDS):
+        _changed(_component_keys(instance))
+    elif (old['name'], old['component_type']) != (instance.name, instance.component_type):
+        invalidate_dashboards(_component_keys(instance))
+
+
+@receiver(pre_delete, sender=MealComponent)
+def refresh_deleted_component(sender, instance, **kwargs):
+    invalidate_dashboards(_component_keys(instance))
+
+
+@receiver(pre_save, sender=Diet)
+def remember_diet_user(sender, instance, **kwargs):
+    instance._old_diet = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('user_id', 'start_date').first() if instance.pk else None
+
+
+def _refresh_diet_period(user_ids, start_date):
+    schedule_adherence_refresh(user_ids, [start_date, timezone.localdate()])
+
+
+@receiver(post_save, sender=Diet)
+@receiver(post_delete, sender=Diet)
+def invalidate_diet_dashboards(sender, instance, **kwargs):
+    old_user_id, old_start = getattr(instance, '_old_diet', None) or (None, None)
+    user_ids = {user_id for user_id in (instance.user_id, old_user_id) if user_id}
+    invalidate_user_dashboards(user_ids)
+    _refresh_diet_period(user_ids, min(date for date in (instance.start_date, old_start) if date))
+
+
+@receiver(post_save, sender=PlannedMeal)
+@receiver(post_delete, sender=PlannedMeal)
+def refresh_planned_meal_adherence(sender, instance, **kwargs):
+    diet = Diet.objects.filter(pk=instance.diet_id).values_list('user_id', 'start_date').first()
+    if diet:
+        _refresh_diet_period({diet[0]}, diet[1])
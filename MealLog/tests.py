@@ -1,3 +1,788 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.date_buckets import buckets_for
+from core.search import index_for
+from core.testing import QueryBudgetMixin
+from Diet.models import Diet
+from MealPrep.models import MealComponent, MealPrep, MealPrepComponent
+from .adherence import daily_adherence, refresh_weekly_adherence, week_start
+from .archive import archive_path
+from .bulk import existing_log_ids
+from . import dashboard
+from .dashboard import dashboard_cache, get_dashboard
+from .fields import MONDAY, TUESDAY, WEDNESDAY, mask_from_days
+from .forms import MealLogEntryForm
+from .importing import _existing_keys
+from .ingest import MealLogBatcher, write_meal_logs
+from .models import DailyNutrition, MealLog, MealLogArchive, MonthlyMealSummary, PlannedMeal, WeeklyAdherence
+from .planning import materialize_planned_meals, meal_datetime
+from .rollups import rebuild_daily_nutrition, refresh_daily_nutrition
+from .signals import meal_logs_created
+from .preparation import prepare_meal_preps
+
+
+class MealLogAdminQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(self.create_admin_user())
+
+    def add_rows(self, count):
+        for i in range(count):
+            user = User.objects.create_user(f'log-user-{User.objects.count()}')
+            diet = Diet.objects.create(name=f'Dieta {i}', user=user, start_date=datetime.date(2025, 1, 1))
+            MealLog.objects.create(
+                user=user, diet=diet, name=f'Refeição {i}', meal_type=MealLog.MealType.BREAKFAST
+            )
+            PlannedMeal.objects.create(
+                name=f'Plano {i}', diet=diet, meal_type=MealLog.MealType.SUPPER, days_of_week=MONDAY | WEDNESDAY
+            )
+
+    def test_meallog_changelist(self):
+        self.add_rows(2)
+        self.assertQueryBudget('/admin/MealLog/meallog/', 8, lambda: self.add_rows(10))
+
+    def test_plannedmeal_changelist(self):
+        self.add_rows(2)
+        self.assertQueryBudget('/admin/MealLog/plannedmeal/', 6, lambda: self.add_rows(10))
+
+    def test_dailynutrition_changelist(self):
+        def add_rollups():
+            self.add_rows(10)
+            call_command('rebuild_daily_nutrition', stdout=StringIO())
+        add_rollups()
+        self.assertQueryBudget('/admin/MealLog/dailynutrition/', 8, add_rollups)
+
+
+class DailyNutritionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        self.component = MealComponent.objects.create(
+            name='Arroz', component_type=MealComponent.ComponentType.CARBOHYDRATE, calories_per_serving=2
+        )
+        self.day = datetime.date(2025, 3, 10)
+
+    def make_prep(self, quantity=100):
+        with self.captureOnCommitCallbacks(execute=True):
+            prep = MealPrep.objects.create(name='Marmita', target_date=self.day, meal_type=MealPrep.MealType.LUNCH)
+            prep.intended_for.add(self.user)
+            MealPrepComponent.objects.create(meal_prep=prep, component=self.component, user=self.user, quantity=quantity)
+        return prep
+
+    def rollup(self, date=None):
+        return DailyNutrition.objects.get(user=self.user, date=date or self.day)
+
+    def test_prep_components_are_rolled_up(self):
+        self.make_prep(quantity=100)
+        row = self.rollup()
+        self.assertEqual(row.calories, 200)
+        self.assertEqual(row.portions, 1)
+
+    def test_component_calorie_change_updates_rollup(self):
+        self.make_prep(quantity=100)
+        self.component.calories_per_serving = 3
+        with self.captureOnCommitCallbacks(execute=True):
+            self.component.save()
+        self.assertEqual(self.rollup().calories, 300)
+
+    def test_moving_prep_moves_rollup(self):
+        prep = self.make_prep()
+        prep.target_date = self.day + datetime.timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            prep.save()
+        self.assertFalse(DailyNutrition.objects.filter(date=self.day).exists())
+        self.assertEqual(self.rollup(prep.target_date).portions, 1)
+
+    def test_removing_user_from_prep_drops_rollup(self):
+        prep = self.make_prep()
+        with self.captureOnCommitCallbacks(execute=True):
+            prep.intended_for.remove(self.user)
+        self.assertFalse(DailyNutrition.objects.exists())
+
+    def test_meal_logs_are_counted(self):
+        consumed_at = timezone.make_aware(datetime.datetime.combine(self.day, datetime.time(12)))
+        with self.captureOnCommitCallbacks(execute=True):
+            MealLog.objects.create(user=self.user, name='Pudim', meal_type=MealLog.MealType.OTHER,
+                                   consumed_at=consumed_at, is_dessert=True)
+        row = self.rollup()
+        self.assertEqual((row.meal_count, row.dessert_count), (1, 1))
+
+    def test_rebuild_matches_incremental(self):
+        self.make_prep(quantity=50)
+        expected = list(DailyNutrition.objects.values('user', 'date', 'calories', 'portions'))
+        DailyNutrition.objects.all().delete()
+        call_command('rebuild_daily_nutrition', stdout=StringIO())
+        self.assertEqual(list(DailyNutrition.objects.values('user', 'date', 'calories', 'portions')), expected)
+
+
+class WeekdaysFieldTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('ana')
+        self.diet = Diet.objects.create(name='Dieta', user=user, start_date=datetime.date(2025, 1, 1))
+
+    def test_has_lookup_uses_bitwise_sql(self):
+        both = PlannedMeal.objects.create(name='Seg/Ter', diet=self.diet, meal_type=MealLog.MealType.SUPPER,
+                                          days_of_week=MONDAY | TUESDAY)
+        PlannedMeal.objects.create(name='Qua', diet=self.diet, meal_type=MealLog.MealType.SUPPER,
+                                   days_of_week=WEDNESDAY)
+        queryset = PlannedMeal.objects.filter(days_of_week__has=TUESDAY)
+        self.assertIn('&', str(queryset.query))
+        self.assertEqual(list(queryset), [both])
+        self.assertFalse(PlannedMeal.objects.filter(days_of_week__has=TUESDAY | WEDNESDAY).exists())
+
+    def test_admin_form_round_trips_checkboxes(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        response = self.client.post('/admin/MealLog/plannedmeal/add/', {
+            'name': 'Ceia', 'diet': self.diet.pk, 'meal_type': MealLog.MealType.SUPPER, 'days_of_week': ['0', '6'],
+        })
+        self.assertEqual(response.status_code, 302)
+        planned = PlannedMeal.objects.get()
+        self.assertEqual(planned.days_of_week, mask_from_days([0, 6]))
+        response = self.client.get('/admin/MealLog/plannedmeal/?weekday=6')
+        self.assertContains(response, 'Segunda-feira, Domingo')
+
+    def test_admin_rejects_invalid_weekday(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        for value in ('abc', '7', '-1'):
+            response = self.client.get('/admin/MealLog/plannedmeal/', {'weekday': value})
+            self.assertRedirects(response, '/admin/MealLog/plannedmeal/?e=1', fetch_redirect_response=False)
+
+
+class MaterializePlannedMealsTests(TestCase):
+    def setUp(self):
+        self.monday = datetime.date(2025, 1, 6)
+        self.users = [User.objects.create_user(f'user-{i}') for i in range(3)]
+        for user in self.users:
+            diet = Diet.objects.create(name='Dieta', user=user, start_date=self.monday)
+            PlannedMeal.objects.create(name='Café', diet=diet, meal_type=MealLog.MealType.BREAKFAST,
+                                       days_of_week=mask_from_days(range(7)))
+            PlannedMeal.objects.create(name='Ceia', diet=diet, meal_type=MealLog.MealType.SUPPER,
+                                       days_of_week=MONDAY | WEDNESDAY)
+
+    def test_expands_templates_in_a_constant_number_of_queries(self):
+        end = self.monday + datetime.timedelta(days=27)
+        # Templates, savepoint, registros existentes, INSERT em lote (em savepoint próprio),
+        # contagens mensais, leitura e gravação (executemany) do índice de busca, release.
+        with self.assertNumQueries(10):
+            created = materialize_planned_meals(self.monday, end, batch_size=1000)
+        self.assertEqual(created, 3 * (28 + 8))
+        self.assertTrue(MealLog.objects.filter(is_planned=True, meal_type=MealLog.MealType.SUPPER,
+                                               consumed_at__date=self.monday).exists())
+
+    def test_rerun_is_idempotent(self):
+        end = self.monday + datetime.timedelta(days=6)
+        materialize_planned_meals(self.monday, end)
+        self.assertEqual(materialize_planned_meals(self.monday, end), 0)
+        self.assertEqual(MealLog.objects.count(), 3 * (7 + 2))
+
+    def test_conflicting_rows_are_not_signalled(self):
+        end = self.monday + datetime.timedelta(days=6)
+        # Outro processo grava um dos registros entre a leitura das chaves e o INSERT.
+        taken = MealLog.objects.create(user=self.users[0], name='Café', meal_type=MealLog.MealType.BREAKFAST,
+                                       consumed_at=meal_datetime(self.monday, MealLog.MealType.BREAKFAST))
+        stale = [{}]
+
+        def existing_ids(logs):
+            return stale.pop() if stale else existing_log_ids(logs)
+
+        received = []
+        meal_logs_created.connect(lambda sender, logs, **kwargs: received.extend(logs), weak=False,
+                                  dispatch_uid='test-received')
+        self.addCleanup(meal_logs_created.disconnect, dispatch_uid='test-received')
+        with mock.patch('MealLog.bulk.existing_log_ids', side_effect=existing_ids):
+            created = materialize_planned_meals(self.monday, end)
+        self.assertEqual(created, 3 * (7 + 2) - 1)
+        self.assertEqual(len(received), created)
+        self.assertTrue(all(log.pk and log.pk != taken.pk for log in received))
+
+    def test_respects_diet_period(self):
+        Diet.objects.update(end_date=self.monday + datetime.timedelta(days=1))
+        created = materialize_planned_meals(self.monday - datetime.timedelta(days=7), self.monday + datetime.timedelta(days=6))
+        self.assertEqual(created, 3 * (2 + 1))
+
+    def test_command(self):
+        out = StringIO()
+        call_command('materialize_planned_meals', '--start=2025-01-06', '--days=7', stdout=out)
+        self.assertIn('27 registros', out.getvalue())
+
+
+class MealLogAdminDietTests(TestCase):
+    def test_new_log_gets_the_active_diet(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        diet = Diet.objects.create(name='Atual', user=admin_user, start_date=datetime.date(2025, 1, 1))
+        self.client.force_login(admin_user)
+        response = self.client.get('/admin/MealLog/meallog/add/')
+        self.assertEqual(response.context['adminform'].form.initial['diet'], diet.pk)
+        response = self.client.post('/admin/MealLog/meallog/add/', {
+            'user': admin_user.pk, 'name': 'Almoço', 'meal_type': MealLog.MealType.OTHER,
+            'consumed_at_0': '10/03/2025', 'consumed_at_1': '12:00', 'description': '',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(MealLog.objects.get().diet, diet)
+        # Ao editar, a dieta removida de propósito continua vazia.
+        log = MealLog.objects.get()
+        response = self.client.post(f'/admin/MealLog/meallog/{log.pk}/change/', {
+            'user': admin_user.pk, 'name': 'Almoço', 'meal_type': MealLog.MealType.OTHER, 'diet': '',
+            'consumed_at_0': '10/03/2025', 'consumed_at_1': '12:00', 'description': '',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNone(MealLog.objects.get().diet)
+
+
+class MealLogTimelineTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        other = User.objects.create_user('bia')
+        start = timezone.make_aware(datetime.datetime(2024, 1, 1, 12))
+        logs = []
+        for i in range(25):
+            # Pares com o mesmo horário exercitam o desempate pelo id.
+            consumed_at = start + datetime.timedelta(hours=i // 2)
+            logs.append(MealLog(user=self.user, name=f'Refeição {i}', meal_type=MealLog.MealType.OTHER,
+                                consumed_at=consumed_at))
+            logs.append(MealLog(user=other, name=f'Refeição {i}', meal_type=MealLog.MealType.OTHER,
+                                consumed_at=consumed_at))
+        MealLog.objects.bulk_create(logs)
+        self.client.force_login(self.user)
+
+    def test_walks_every_log_once_in_order(self):
+        expected = list(MealLog.objects.filter(user=self.user).order_by('-consumed_at', '-pk').values_list('pk', flat=True))
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 4, **({'cursor': cursor} if cursor else {})}
+            # Sessão, usuário e a página: o custo não cresce com a profundidade.
+            with self.assertNumQueries(3):
+                data = self.client.get('/api/meal-logs/', params).json()
+            seen.extend(row['id'] for row in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_rejects_anonymous_and_bad_cursors(self):
+        self.assertEqual(self.client.get('/api/meal-logs/', {'cursor': 'xyz'}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/meal-logs/').status_code, 401)
+
+
+class MealLogIngestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        self.diet = Diet.objects.create(name='Dieta', user=self.user, start_date=datetime.date(2025, 1, 1))
+
+    def entry(self, i, **extra):
+        return {'name': f'Lanche {i}', 'meal_type': 'OTHER', 'consumed_at': f'2025-03-10T10:{i:02d}:00', **extra}
+
+    async def test_concurrent_submissions_share_one_insert(self):
+        batcher = MealLogBatcher(window=0.05)
+        logs = [MealLogEntryForm(self.entry(i)) for i in range(5)]
+        for form in logs:
+            self.assertTrue(form.is_valid())
+        with mock.patch('MealLog.ingest.write_meal_logs', wraps=write_meal_logs) as write:
+            results = await asyncio.gather(*(batcher.submit([form.to_meal_log(self.user.pk)]) for form in logs))
+        write.assert_called_once()
+        self.assertEqual([result[0]['status'] for result in results], ['created'] * 5)
+        self.assertEqual(await MealLog.objects.acount(), 5)
+
+    async def test_endpoint_reports_each_entry(self):
+        await self.async_client.aforce_login(self.user)
+        other_diet = await Diet.objects.acreate(
+            name='Outra', user=await User.objects.acreate(username='bia'), start_date=datetime.date(2025, 1, 1)
+        )
+        payload = [
+            self.entry(1, diet=self.diet.pk, is_dessert=True),
+            self.entry(1, diet=self.diet.pk),
+            {'name': 'Sem tipo'},
+            self.entry(2, diet=other_diet.pk),
+        ]
+        response = await self.async_client.post('/api/meal-logs/ingest/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        statuses = [result['status'] for result in response.json()['results']]
+        self.assertEqual(statuses, ['created', 'duplicate', 'invalid', 'invalid'])
+        log = await MealLog.objects.aget()
+        self.assertTrue(log.is_dessert)
+        self.assertEqual(log.diet_id, self.diet.pk)
+        self.assertEqual(response.json()['results'][1], {'status': 'duplicate', 'id': log.pk})
+
+        # Só registros que já existiam: nada foi criado.
+        response = await self.async_client.post('/api/meal-logs/ingest/', self.entry(1),
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'status': 'duplicate', 'id': log.pk}])
+
+    def test_conflict_after_the_check_reports_ids(self):
+        forms = [MealLogEntryForm(self.entry(i)) for i in (1, 2)]
+        for form in forms:
+            self.assertTrue(form.is_valid())
+        logs = [form.to_meal_log(self.user.pk) for form in forms]
+        # Outro processo grava a primeira chave depois da verificação de existentes.
+        other = MealLog.objects.create(user=self.user, name='Lanche 1', meal_type='OTHER',
+                                       consumed_at=logs[0].consumed_at)
+        stale = [{}]
+
+        def existing_ids(logs):
+            return stale.pop() if stale else existing_log_ids(logs)
+
+        with mock.patch('MealLog.ingest.existing_log_ids', side_effect=existing_ids):
+            results = write_meal_logs(logs)
+        created = MealLog.objects.get(name='Lanche 2')
+        self.assertEqual(results, [{'status': 'duplicate', 'id': other.pk}, {'status': 'created', 'id': created.pk}])
+
+    def test_conflict_during_the_insert_reports_the_existing_id(self):
+        forms = [MealLogEntryForm(self.entry(i)) for i in (1, 2)]
+        for form in forms:
+            self.assertTrue(form.is_valid())
+        logs = [form.to_meal_log(self.user.pk) for form in forms]
+        other = MealLog.objects.create(user=self.user, name='Lanche 1', meal_type='OTHER',
+                                       consumed_at=logs[0].consumed_at)
+        # As duas leituras antes do INSERT perdem a chave: o INSERT falha e é refeito sem ela.
+        stale = [{}, {}]
+
+        def existing_ids(logs):
+            return stale.pop() if stale else existing_log_ids(logs)
+
+        received = []
+        meal_logs_created.connect(lambda sender, logs, **kwargs: received.extend(logs), weak=False,
+                                  dispatch_uid='test-received')
+        self.addCleanup(meal_logs_created.disconnect, dispatch_uid='test-received')
+        with mock.patch('MealLog.ingest.existing_log_ids', side_effect=existing_ids), \
+                mock.patch('MealLog.bulk.existing_log_ids', side_effect=existing_ids):
+            results = write_meal_logs(logs)
+        created = MealLog.objects.get(name='Lanche 2')
+        self.assertEqual(results, [{'status': 'duplicate', 'id': other.pk}, {'status': 'created', 'id': created.pk}])
+        self.assertEqual(received, [created])
+
+    async def test_endpoint_requires_authentication(self):
+        response = await self.async_client.post('/api/meal-logs/ingest/', self.entry(1), content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+
+class ImportMealLogsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        self.diet = Diet.objects.create(name='Dieta', user=self.user, start_date=datetime.date(2025, 1, 1))
+
+    def write(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        return path
+
+    def test_csv_import_is_idempotent(self):
+        path = self.write('diario.csv', (
+            "user,name,meal_type,consumed_at,is_dessert,is_planned,diet\n"
+            f"ana,Pão com ovo,BREAKFAST,2025-03-10T07:30:00,0,sim,{self.diet.pk}\n"
+            "ana,Pudim,Ceia,2025-03-10T21:00:00,1,0,\n"
+            "ana,Pudim,Ceia,2025-03-10T21:00:00,1,0,\n"
+            "bia,Fruta,OTHER,2025-03-10T10:00:00,0,0,\n"
+        ))
+        out, err = StringIO(), StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_meallogs', path, '--batch-size=2', stdout=out, stderr=err)
+        self.assertIn('2 criadas, 1 já existentes, 1 inválidas', out.getvalue())
+        self.assertIn("Linha 5: usuário inexistente: 'bia'", err.getvalue())
+        dessert = MealLog.objects.get(name='Pudim')
+        self.assertEqual(dessert.meal_type, MealLog.MealType.SUPPER)
+        self.assertTrue(dessert.is_dessert)
+        self.assertEqual(MealLog.objects.get(name='Pão com ovo').diet, self.diet)
+        self.assertEqual(DailyNutrition.objects.get(user=self.user).meal_count, 2)
+
+        call_command('import_meallogs', path, stdout=out, stderr=err)
+        self.assertEqual(MealLog.objects.count(), 2)
+
+    def test_jsonl_with_default_user(self):
+        rows = [
+            {'name': f'Lanche {i}', 'meal_type': 'OTHER', 'consumed_at': f'2025-03-{i + 1:02d}'}
+            for i in range(5)
+        ]
+        path = self.write('diario.jsonl', '\n'.join(json.dumps(row) for row in rows) + '\nnão é json\n')
+        out = StringIO()
+        call_command('import_meallogs', path, '--user=ana', '--transaction-size=2', stdout=out, stderr=StringIO())
+        self.assertIn('5 criadas', out.getvalue())
+        self.assertEqual(self.user.meal_logs.count(), 5)
+
+    def test_rows_written_concurrently_are_not_counted_as_created(self):
+        path = self.write('diario.csv', (
+            "user,name,meal_type,consumed_at\n"
+            "ana,Pudim,OTHER,2025-03-10T21:00:00\n"
+            "ana,Fruta,OTHER,2025-03-10T10:00:00\n"
+        ))
+        # Outro processo grava o pudim depois da consulta de existentes.
+        MealLog.objects.create(user=self.user, name='Pudim', meal_type='OTHER',
+                               consumed_at=timezone.make_aware(datetime.datetime(2025, 3, 10, 21)))
+        stale = [set()]
+
+        def existing_keys(logs):
+            return stale.pop() if stale else _existing_keys(logs)
+
+        out = StringIO()
+        with mock.patch('MealLog.importing._existing_keys', side_effect=existing_keys):
+            call_command('import_meallogs', path, stdout=out, stderr=StringIO())
+        self.assertIn('1 criadas, 1 já existentes', out.getvalue())
+        self.assertEqual(MealLog.objects.count(), 2)
+
+
+class ExportMealHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        self.other = User.objects.create_user('bia')
+        diet = Diet.objects.create(name='Dieta', user=self.user, start_date=datetime.date(2025, 1, 1))
+        for i in range(3):
+            MealLog.objects.create(user=self.user, diet=diet, name=f'Lanche {i}', meal_type='OTHER',
+                                   consumed_at=timezone.make_aware(datetime.datetime(2025, 3, 10, 10 + i)))
+        MealLog.objects.create(user=self.other, name='Fruta', meal_type='OTHER')
+        prep = MealPrep.objects.create(name='Marmita', target_date=datetime.date(2025, 3, 10), meal_type='LUNCH')
+        prep.intended_for.add(self.user)
+        component = MealComponent.objects.create(name='Arroz', component_type='CARBOHYDRATE')
+        MealPrepComponent.objects.create(meal_prep=prep, component=component, user=self.user, quantity=120)
+
+    def test_jsonl_streams_the_whole_history(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(5):  # sessão, usuário e uma query por tipo de registro
+            response = self.client.get('/api/meal-logs/export/', {'format': 'jsonl'})
+            rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['record_type'] for row in rows],
+                         ['meal_log'] * 3 + ['meal_prep', 'meal_prep_component'])
+        self.assertEqual(rows[0]['diet'], 'Dieta')
+        self.assertEqual(rows[-1]['component'], 'Arroz')
+
+    def test_command_writes_csv(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'ana.csv')
+        out = StringIO()
+        call_command('export_meal_history', 'ana', path, stdout=out)
+        self.assertIn('6 linhas gravadas', out.getvalue())
+        with open(path, encoding='utf-8') as stream:
+            rows = list(csv.DictReader(stream))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[3]['record_type'], 'meal_prep')
+        self.assertEqual(rows[4]['quantity'], '120.00')
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        dashboard_cache().clear()
+        self.user = User.objects.create_user('ana')
+        self.today = timezone.localdate()
+        self.diet = Diet.objects.create(name='Dieta', user=self.user, start_date=self.today)
+        self.prep = MealPrep.objects.create(name='Marmita', target_date=self.today, meal_type='LUNCH')
+        self.prep.intended_for.add(self.user)
+        self.component = MealComponent.objects.create(name='Arroz', component_type='CARBOHYDRATE',
+                                                      calories_per_serving=2)
+        MealPrepComponent.objects.create(meal_prep=self.prep, component=self.component, user=self.user, quantity=100)
+        MealLog.objects.create(user=self.user, name='Fruta', meal_type='OTHER')
+
+    def dashboard(self):
+        return get_dashboard(self.user)
+
+    def test_hit_costs_no_queries(self):
+        payload = self.dashboard()
+        self.assertEqual(payload['diet']['name'], 'Dieta')
+        self.assertEqual(payload['totals']['prep_calories'], 200)
+        self.assertEqual(payload['totals']['meal_count'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dashboard(self.user), payload)
+
+    def mark_prepared(self):
+        self.prep.is_prepared = True
+        self.prep.save()
+
+    def rename_component(self):
+        self.component.name = 'Arroz integral'
+        self.component.save()
+
+    def test_signals_invalidate_affected_dashboards(self):
+        changes = [
+            lambda: MealLog.objects.create(user=self.user, name='Pudim', meal_type='SUPPER', is_dessert=True),
+            self.mark_prepared,
+            self.rename_component,
+            lambda: self.prep.intended_for.remove(self.user),
+            lambda: Diet.objects.filter(pk=self.diet.pk).first().delete(),
+        ]
+        for change in changes:
+            before = self.dashboard()
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            with self.assertNumQueries(4):
+                self.assertNotEqual(self.dashboard(), before)
+
+    def test_build_racing_a_change_is_not_served(self):
+        real_build = dashboard.build_dashboard
+
+        def build_then_change(user, date):
+            # Outra requisição grava e faz commit enquanto este painel é montado.
+            payload = real_build(user, date)
+            with self.captureOnCommitCallbacks(execute=True):
+                MealLog.objects.create(user=self.user, name='Pudim', meal_type='SUPPER')
+            return payload
+
+        with mock.patch('MealLog.dashboard.build_dashboard', side_effect=build_then_change):
+            stale = self.dashboard()
+        self.assertEqual(self.dashboard()['totals']['meal_count'], stale['totals']['meal_count'] + 1)
+
+    def test_other_dates_stay_cached(self):
+        yesterday = self.today - datetime.timedelta(days=1)
+        get_dashboard(self.user, yesterday)
+        MealLog.objects.create(user=self.user, name='Pudim', meal_type='SUPPER')
+        with self.assertNumQueries(0):
+            get_dashboard(self.user, yesterday)
+
+    def test_view(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/dashboard/', {'date': self.today.isoformat()})
+        self.assertEqual(response.json()['meal_preps'][0]['portions'][0]['component'], 'Arroz')
+        self.assertEqual(self.client.get('/api/dashboard/', {'date': 'ontem'}).status_code, 400)
+
+    def test_component_without_calories(self):
+        water = MealComponent.objects.create(name='Água', component_type='OTHER')
+        MealPrepComponent.objects.create(meal_prep=self.prep, component=water, user=self.user, quantity=300,
+                                         unit_of_measure=MealPrepComponent.UnitOfMeasure.MILLILITERS)
+        self.client.force_login(self.user)
+        response = self.client.get('/api/dashboard/', {'date': self.today.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        portions = {portion['component']: portion for portion in response.json()['meal_preps'][0]['portions']}
+        self.assertIsNone(portions['Água']['calories'])
+        self.assertEqual(response.json()['totals']['prep_calories'], 200)
+
+
+class AdherenceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        self.monday = week_start(timezone.localdate()) - datetime.timedelta(weeks=4)
+        self.diet = Diet.objects.create(name='Dieta', user=self.user, start_date=self.monday,
+                                        end_date=self.monday + datetime.timedelta(days=13))
+        PlannedMeal.objects.create(name='Café', diet=self.diet, meal_type=MealLog.MealType.BREAKFAST,
+                                   days_of_week=mask_from_days(range(7)))
+        PlannedMeal.objects.create(name='Ceia', diet=self.diet, meal_type=MealLog.MealType.SUPPER,
+                                   days_of_week=MONDAY | WEDNESDAY)
+
+    def log(self, day, meal_type=MealLog.MealType.BREAKFAST, is_planned=True):
+        return MealLog.objects.create(user=self.user, name=f'{meal_type} {day}', meal_type=meal_type,
+                                      is_planned=is_planned, consumed_at=meal_datetime(day, meal_type))
+
+    def test_daily_adherence_in_one_query(self):
+        self.log(self.monday)
+        self.log(self.monday, MealLog.MealType.SUPPER)
+        self.log(self.monday + datetime.timedelta(days=1), is_planned=False)
+        self.log(self.monday + datetime.timedelta(days=2), MealLog.MealType.OTHER)
+        with self.assertNumQueries(1):
+            days = daily_adherence(self.monday - datetime.timedelta(days=3), self.monday + datetime.timedelta(days=30))
+        self.assertEqual(len(days), 14)
+        self.assertEqual(days[0], (self.user.pk, self.monday, 2, 2))
+        self.assertEqual(days[1][2:], (1, 0))
+        self.assertEqual(days[2][2:], (2, 0))
+
+    def test_weekly_table_follows_changes(self):
+        # Um registro recalcula só a própria semana.
+        with self.captureOnCommitCallbacks(execute=True):
+            log = self.log(self.monday)
+        self.assertEqual(list(WeeklyAdherence.objects.values_list('planned_slots', 'fulfilled_slots')), [(9, 1)])
+        # Mudar as refeições planejadas recalcula todo o período da dieta.
+        with self.captureOnCommitCallbacks(execute=True):
+            log.delete()
+            PlannedMeal.objects.filter(meal_type=MealLog.MealType.SUPPER).get().delete()
+        self.assertEqual(list(WeeklyAdherence.objects.values_list('planned_slots', 'fulfilled_slots')), [(7, 0)] * 2)
+
+        WeeklyAdherence.objects.all().delete()
+        out = StringIO()
+        call_command('refresh_weekly_adherence', '--all', stdout=out)
+        self.assertIn('2 semanas', out.getvalue())
+
+        self.client.force_login(self.user)
+        response = self.client.get('/api/adherence/', {'start': self.monday.isoformat()})
+        self.assertEqual([week['adherence'] for week in response.json()['results']], [0.0, 0.0])
+
+
+class PrepareMealPrepsTests(TestCase):
+    def setUp(self):
+        self.ana = User.objects.create_user('ana')
+        self.bia = User.objects.create_user('bia')
+        self.monday = datetime.date(2025, 3, 10)
+        self.ana_diet = Diet.objects.create(name='Dieta Ana', user=self.ana, start_date=self.monday)
+        self.bia_diet = Diet.objects.create(name='Dieta Bia', user=self.bia, start_date=self.monday)
+
+    def week(self, days):
+        preps = []
+        for offset in range(days):
+            for meal_type in MealPrep.MealType:
+                prep = MealPrep.objects.create(name=f'Marmita {meal_type.label}', meal_type=meal_type,
+                                               target_date=self.monday + datetime.timedelta(days=offset),
+                                               diet=self.ana_diet)
+                prep.intended_for.set([self.ana, self.bia])
+                preps.append(prep.pk)
+        return MealPrep.objects.filter(pk__in=preps)
+
+    def test_constant_number_of_queries(self):
+        def queries(days):
+            preps = self.week(days)
+            with CaptureQueriesContext(connection) as ctx:
+                prepare_meal_preps(preps, self.monday)
+            return len(ctx.captured_queries)
+        self.assertEqual(queries(1), queries(7))
+
+    def test_marks_preps_and_logs_each_recipient(self):
+        preps = self.week(2)
+        MealLog.objects.create(user=self.ana, name='Marmita Almoço', meal_type=MealLog.MealType.LUNCH,
+                               consumed_at=meal_datetime(self.monday, MealLog.MealType.LUNCH))
+        self.assertEqual(prepare_meal_preps(preps, self.monday), (4, 7))
+        self.assertEqual(preps.filter(is_prepared=True, prepared_on=self.monday).count(), 4)
+        self.assertEqual(prepare_meal_preps(preps), (0, 0))
+        # A dieta da marmita é da Ana; a Bia recebe a própria dieta vigente.
+        self.assertEqual(
+            set(MealLog.objects.filter(is_planned=True).values_list('user__username', 'diet__name')),
+            {('ana', 'Dieta Ana'), ('bia', 'Dieta Bia')},
+        )
+
+    def test_signals_only_inserted_logs(self):
+        preps = self.week(1)
+        MealLog.objects.create(user=self.bia, name='Marmita Almoço', meal_type=MealLog.MealType.LUNCH,
+                               consumed_at=meal_datetime(self.monday, MealLog.MealType.LUNCH))
+        received = []
+        meal_logs_created.connect(lambda sender, logs, **kwargs: received.extend(logs), weak=False,
+                                  dispatch_uid='test-received')
+        self.addCleanup(meal_logs_created.disconnect, dispatch_uid='test-received')
+        updated, created = prepare_meal_preps(preps, self.monday)
+        self.assertEqual(len(received), created)
+        self.assertEqual(created, 2 * updated - 1)
+        self.assertTrue(all(log.pk for log in received))
+
+    def test_endpoint_and_admin_action(self):
+        preps = self.week(1)
+        self.client.force_login(self.ana)
+        url = '/api/meal-preps/prepare/'
+        response = self.client.post(url, {'ids': [preps[0].pk]}, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(User.objects.create_superuser('admin'))
+        response = self.client.post(url, {'ids': 'x'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {'ids': [preps[0].pk]}, content_type='application/json')
+        self.assertEqual(response.json(), {'prepared': 1, 'meal_logs_created': 2})
+
+        self.client.post('/admin/MealPrep/mealprep/', {
+            'action': 'mark_prepared', '_selected_action': [prep.pk for prep in preps],
+        })
+        self.assertFalse(preps.filter(is_prepared=False).exists())
+        self.assertEqual(MealLog.objects.count(), 4)
+
+
+class MealLogArchiveTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(MEAL_LOG_ARCHIVE_DIR=directory.name))
+        self.user = User.objects.create_user('ana')
+        self.buckets = buckets_for(MealLog, 'consumed_at')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.old = [
+                self.log(datetime.date(2023, 1, 10), 'Pão de queijo', MealLog.MealType.BREAKFAST, is_planned=True),
+                self.log(datetime.date(2023, 1, 11), 'Pudim', MealLog.MealType.SUPPER, is_dessert=True),
+                self.log(datetime.date(2023, 2, 3), 'Pão na chapa', MealLog.MealType.BREAKFAST),
+            ]
+            self.recent = self.log(timezone.localdate(), 'Pão integral', MealLog.MealType.BREAKFAST)
+
+    def log(self, day, name, meal_type, **fields):
+        return MealLog.objects.create(user=self.user, name=name, meal_type=meal_type,
+                                      consumed_at=meal_datetime(day, meal_type), **fields)
+
+    def search(self, term):
+        return set(index_for(MealLog).filter(MealLog.objects.all(), term).values_list('pk', flat=True))
+
+    def test_archive_keeps_summaries_and_frozen_rollups(self):
+        out = StringIO()
+        call_command('archive_meal_logs', '--before', '2023-03-15', stdout=out)
+        self.assertIn('3 registros arquivados em 2 meses', out.getvalue())
+        self.assertEqual(list(MealLog.objects.values_list('pk', flat=True)), [self.recent.pk])
+        self.assertEqual(self.buckets.years(), [timezone.localdate().year])
+        self.assertEqual(self.search('pão'), {self.recent.pk})
+
+        summaries = {
+            (summary.month, summary.meal_type): (summary.meal_count, summary.dessert_count, summary.planned_ratio)
+            for summary in MonthlyMealSummary.objects.all()
+        }
+        self.assertEqual(summaries, {
+            (datetime.date(2023, 1, 1), 'BREAKFAST'): (1, 0, 1.0),
+            (datetime.date(2023, 1, 1), 'SUPPER'): (1, 1, 0.0),
+            (datetime.date(2023, 2, 1), 'BREAKFAST'): (1, 0, 0.0),
+        })
+        with gzip.open(archive_path(datetime.date(2023, 1, 1)), 'rt', encoding='utf-8') as stream:
+            self.assertEqual([json.loads(line)['name'] for line in stream], ['Pão de queijo', 'Pudim'])
+
+        # Os resumos diários e semanais dos meses arquivados não são zerados pelos recálculos.
+        refresh_daily_nutrition({(self.user.pk, datetime.date(2023, 1, 11))})
+        rebuild_daily_nutrition()
+        self.assertEqual(DailyNutrition.objects.get(date=datetime.date(2023, 1, 11)).dessert_count, 1)
+        # Registros importados depois num dia arquivado somam-se às contagens arquivadas.
+        with self.captureOnCommitCallbacks(execute=True):
+            MealLog.objects.create(user=self.user, name='Sopa', meal_type=MealLog.MealType.OTHER,
+                                   consumed_at=meal_datetime(datetime.date(2023, 1, 11), MealLog.MealType.OTHER))
+        day = DailyNutrition.objects.get(date=datetime.date(2023, 1, 11))
+        self.assertEqual((day.meal_count, day.dessert_count), (2, 1))
+        rebuild_daily_nutrition()
+        day = DailyNutrition.objects.get(date=datetime.date(2023, 1, 11))
+        self.assertEqual((day.meal_count, day.dessert_count, day.archived_meal_count), (2, 1, 1))
+        WeeklyAdherence.objects.create(user=self.user, week_start=datetime.date(2023, 1, 9),
+                                       planned_slots=7, fulfilled_slots=5)
+        refresh_weekly_adherence(datetime.date(2023, 1, 1), datetime.date(2023, 1, 31))
+        self.assertEqual(WeeklyAdherence.objects.get().fulfilled_slots, 5)
+
+        # Registros importados depois para um mês arquivado são acrescentados ao arquivo.
+        MealLog.objects.create(user=self.user, name='Fruta', meal_type=MealLog.MealType.OTHER,
+                               consumed_at=meal_datetime(datetime.date(2023, 2, 20), MealLog.MealType.OTHER))
+        call_command('archive_meal_logs', '--before', '2023-03-01', stdout=StringIO())
+        self.assertEqual(MealLogArchive.objects.get(month=datetime.date(2023, 2, 1)).row_count, 2)
+        with gzip.open(archive_path(datetime.date(2023, 2, 1)), 'rt', encoding='utf-8') as stream:
+            self.assertEqual(len(stream.readlines()), 2)
+
+    def test_restore_brings_the_rows_back(self):
+        # Arquivos gravados fora de MEAL_LOG_ARCHIVE_DIR são encontrados pelo caminho guardado.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        call_command('archive_meal_logs', '--before', '2023-03-01', '--directory', directory.name, stdout=StringIO())
+        path = os.path.join(directory.name, 'meallog-2023-01.jsonl.gz')
+        self.assertEqual(MealLogArchive.objects.get(month=datetime.date(2023, 1, 1)).path, path)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('restore_meal_logs', '2023-01', stdout=StringIO())
+        self.assertEqual(set(MealLog.objects.values_list('pk', flat=True)),
+                         {self.old[0].pk, self.old[1].pk, self.recent.pk})
+        self.assertEqual(MealLog.objects.get(pk=self.old[1].pk).consumed_at, self.old[1].consumed_at)
+        self.assertEqual(self.search('queijo'), {self.old[0].pk})
+        self.assertEqual(self.buckets.months(2023), [1])
+        self.assertEqual(set(MonthlyMealSummary.objects.values_list('month', flat=True)), {datetime.date(2023, 2, 1)})
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(DailyNutrition.objects.get(date=datetime.date(2023, 1, 11)).meal_count, 1)
+
+        with self.assertRaisesMessage(CommandError, '2023-01'):
+            call_command('restore_meal_logs', '2023-01', stdout=StringIO())
+
+    def test_restore_skips_rows_that_collide_with_live_logs(self):
+        call_command('archive_meal_logs', '--before', '2023-03-01', stdout=StringIO())
+        # Registro gravado de novo depois do arquivamento, com a mesma chave natural.
+        live = self.log(datetime.date(2023, 1, 11), 'Pudim', MealLog.MealType.SUPPER)
+        received = []
+        meal_logs_created.connect(lambda sender, logs, **kwargs: received.extend(logs), weak=False,
+                                  dispatch_uid='test-received')
+        self.addCleanup(meal_logs_created.disconnect, dispatch_uid='test-received')
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('restore_meal_logs', '2023-01', stdout=out)
+        self.assertIn('1 registros (1 já existiam', out.getvalue())
+        self.assertEqual([log.pk for log in received], [self.old[0].pk])
+        self.assertEqual(set(MealLog.objects.values_list('pk', flat=True)), {self.old[0].pk, live.pk, self.recent.pk})
+        self.assertEqual(self.buckets.months(2023), [1])
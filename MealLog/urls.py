@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'meallog'
+
+urlpatterns = [
+    path('adherence/', views.weekly_adherence, name='adherence'),
+    path('dashboard/', views.today_dashboard, name='dashboard'),
+    path('meal-logs/', views.meal_log_timeline, name='timeline'),
+    path('meal-logs/export/', views.export_meal_history, name='export'),
+    path('meal-logs/ingest/', views.ingest_meal_logs, name='ingest'),
+    path('meal-preps/prepare/', views.mark_meal_preps_prepared, name='prepare-meal-preps'),
+]
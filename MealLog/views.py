@@ -1,3 +1,224 @@
-from django.shortcuts import render
+import base64
+import binascii
+import datetime
+import json
 
-# Create your views here.
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import require_GET, require_POST
+
+from MealPrep.models import MealPrep
+from .adherence import adherence_series
+from .dashboard import get_dashboard
+from .export import FORMATS, export_lines
+from .forms import MealLogEntryForm
+from .ingest import get_batcher
+from .models import MealLog
+from .preparation import prepare_meal_preps
+
+TIMELINE_FIELDS = (
+    'id', 'name', 'consumed_at', 'meal_type', 'is_planned', 'is_dessert', 'diet_id', 'description',
+)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_INGEST_ENTRIES = 1000
+MAX_PREPARE_IDS = 1000
+
+
+def encode_cursor(consumed_at, pk):
+    return base64.urlsafe_b64encode(f'{consumed_at.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Retorna (consumed_at, id) ou levanta ValueError."""
+    try:
+        consumed_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        consumed_at = parse_datetime(consumed_at)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('cursor inválido')
+    if consumed_at is None:
+        raise ValueError('cursor inválido')
+    return consumed_at, int(pk)
+
+
+def timeline_queryset(user_id, cursor=None):
+    """
+    Registros do usuário após o cursor, na ordem de MealLog.Meta.ordering com
+    o id como desempate. A posição vem do cursor (keyset), então a página 500
+    custa o mesmo que a primeira: uma busca no índice (user, -consumed_at, -id).
+    """
+    logs = MealLog.objects.filter(user_id=user_id)
+    if cursor:
+        consumed_at, pk = decode_cursor(cursor)
+        # O primeiro filtro delimita a faixa do índice; o segundo desempata pelo id.
+        logs = logs.filter(consumed_at__lte=consumed_at).filter(Q(consumed_at__lt=consumed_at) | Q(pk__lt=pk))
+    return logs.order_by('-consumed_at', '-pk').values(*TIMELINE_FIELDS)
+
+
+def timeline_page(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    rows = list(timeline_queryset(user_id, cursor)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['consumed_at'], rows[-1]['id'])
+    return rows, next_cursor
+
+
+@require_GET
+def meal_log_timeline(request):
+    """
+    GET /api/meal-logs/?cursor=...&limit=...
+
+    Linha do tempo do usuário autenticado. Administradores podem consultar
+    outro usuário com ?user=<id>.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Autenticação necessária.'}, status=401)
+    user_id = request.user.pk
+    if request.GET.get('user') and request.user.is_staff:
+        user_id = request.GET['user']
+    try:
+        user_id = int(user_id)
+        limit = min(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+        rows, next_cursor = timeline_page(user_id, request.GET.get('cursor'), limit)
+    except ValueError:
+        return JsonResponse({'detail': 'Parâmetros inválidos.'}, status=400)
+    return JsonResponse({'results': rows, 'next_cursor': next_cursor})
+
+
+@require_GET
+def today_dashboard(request):
+    """
+    GET /api/dashboard/?date=AAAA-MM-DD
+
+    Painel do dia (padrão: hoje) do usuário autenticado, servido do cache
+    "dashboard" sempre que possível.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Autenticação necessária.'}, status=401)
+    date = None
+    if request.GET.get('date'):
+        try:
+            date = parse_date(request.GET['date'])
+        except ValueError:
+            pass
+        if date is None:
+            return JsonResponse({'detail': 'Parâmetros inválidos.'}, status=400)
+    return JsonResponse(get_dashboard(request.user, date))
+
+
+@require_GET
+def weekly_adherence(request):
+    """
+    GET /api/adherence/?start=AAAA-MM-DD&end=AAAA-MM-DD
+
+    Série semanal de adesão à dieta do usuário autenticado (padrão: últimas
+    12 semanas), lida da tabela pré-calculada WeeklyAdherence.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Autenticação necessária.'}, status=401)
+    try:
+        end = parse_date(request.GET['end']) if request.GET.get('end') else timezone.localdate()
+        start = parse_date(request.GET['start']) if request.GET.get('start') else end - datetime.timedelta(weeks=12)
+        if start is None or end is None or end < start:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'detail': 'Parâmetros inválidos.'}, status=400)
+    weeks = adherence_series(request.user, start, end)
+    for week in weeks:
+        week['adherence'] = week['fulfilled_slots'] / week['planned_slots'] if week['planned_slots'] else None
+    return JsonResponse({'results': weeks})
+
+
+@require_GET
+def export_meal_history(request):
+    """
+    GET /api/meal-logs/export/?format=csv|jsonl
+
+    Histórico completo (registros, marmitas e porções) do usuário autenticado,
+    enviado em streaming. Administradores podem exportar outro usuário com ?user=<id>.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Autenticação necessária.'}, status=401)
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in FORMATS:
+        return JsonResponse({'detail': 'Parâmetros inválidos.'}, status=400)
+    user = request.user
+    if request.GET.get('user') and request.user.is_staff:
+        try:
+            user = User.objects.get(pk=int(request.GET['user']))
+        except (ValueError, User.DoesNotExist):
+            return JsonResponse({'detail': 'Parâmetros inválidos.'}, status=400)
+    response = StreamingHttpResponse(export_lines(user, file_format), content_type=FORMATS[file_format])
+    response['Content-Disposition'] = f'attachment; filename="historico-{user.username}.{file_format}"'
+    return response
+
+
+@require_POST
+async def ingest_meal_logs(request):
+    """
+    POST /api/meal-logs/ingest/ com um objeto ou uma lista de objetos.
+
+    Os registros de requisições simultâneas são gravados juntos (ver
+    MealLog.ingest); a resposta só sai depois do commit e traz um resultado
+    por item, na ordem enviada. Status 201 se algum registro foi criado, 200
+    se os válidos já existiam e 400 se nenhum era válido.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'detail': 'Autenticação necessária.'}, status=401)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'detail': 'JSON inválido.'}, status=400)
+    entries = payload if isinstance(payload, list) else [payload]
+    if not entries or len(entries) > MAX_INGEST_ENTRIES or not all(isinstance(entry, dict) for entry in entries):
+        return JsonResponse({'detail': f'Envie de 1 a {MAX_INGEST_ENTRIES} objetos.'}, status=400)
+
+    results = [None] * len(entries)
+    valid = []
+    for index, entry in enumerate(entries):
+        form = MealLogEntryForm(entry)
+        if form.is_valid():
+            valid.append((index, form.to_meal_log(user.pk)))
+        else:
+            results[index] = {'status': 'invalid', 'errors': form.errors.get_json_data()}
+    written = await get_batcher().submit([log for _, log in valid])
+    for (index, _), result in zip(valid, written):
+        results[index] = result
+    if not valid:
+        return JsonResponse({'results': results}, status=400)
+    created = any(result['status'] == 'created' for result in written)
+    return JsonResponse({'results': results}, status=201 if created else 200)
+
+
+@require_POST
+def mark_meal_preps_prepared(request):
+    """
+    POST /api/meal-preps/prepare/ com {"ids": [...], "prepared_on": "AAAA-MM-DD"}.
+
+    Marca as marmitas como feitas (prepared_on padrão: hoje) e registra as
+    refeições planejadas de cada destinatário. Exige permissão de alterar marmitas.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Autenticação necessária.'}, status=401)
+    if not request.user.has_perm('MealPrep.change_mealprep'):
+        return JsonResponse({'detail': 'Permissão negada.'}, status=403)
+    try:
+        payload = json.loads(request.body)
+        ids = payload['ids']
+        if not isinstance(ids, list) or not 0 < len(ids) <= MAX_PREPARE_IDS:
+            raise ValueError
+        ids = [int(pk) for pk in ids]
+        prepared_on = parse_date(payload['prepared_on']) if payload.get('prepared_on') else None
+        if payload.get('prepared_on') and prepared_on is None:
+            raise ValueError
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({'detail': 'Parâmetros inválidos.'}, status=400)
+    prepared, created = prepare_meal_preps(MealPrep.objects.filter(pk__in=ids), prepared_on)
+    return JsonResponse({'prepared': prepared, 'meal_logs_created': created})
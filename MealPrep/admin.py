@@ -1,5 +1,28 @@
+import datetime
+
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.html import format_html
+
+from core.autocomplete import PrefixAutocompleteMixin
+from core.changelist import AutocompleteListFilter, ScalableChangeListMixin
+from core.search import FullTextSearchMixin
+from Diet.utils import active_diet
+from MealLog.preparation import prepare_meal_preps
 from .models import MealPrep, MealComponent, Ingredient, MealPrepComponent
+from .photos import ensure_variants, variant_url
+from .production import production_sheet
+
+
+def _date_param(request, name):
+    try:
+        return parse_date(request.GET.get(name) or '')
+    except ValueError:
+        return None
 
 
 class IngredientInline(admin.TabularInline):
@@ -16,35 +39,95 @@ class MealPrepComponentInline(admin.TabularInline):
 
 
 @admin.register(MealComponent)
-class MealComponentAdmin(admin.ModelAdmin):
+class MealComponentAdmin(ScalableChangeListMixin, PrefixAutocompleteMixin, FullTextSearchMixin, admin.ModelAdmin):
     """Admin para o catálogo de "Misturas" (Componentes)."""
-    list_display = ('name', 'component_type')
+    list_display = ('thumbnail', 'name', 'component_type')
+    list_display_links = ('thumbnail', 'name')
     list_filter = ('component_type',)
     search_fields = ('name', 'description')
+    autocomplete_prefix_field = 'name'
     inlines = [IngredientInline]
 
+    @admin.display(description='Foto')
+    def thumbnail(self, obj):
+        # Decide só pelo hash, sem tocar no storage. Foto sem hash (geração que
+        # falhou) é agendada de novo, uma vez enquanto a geração estiver pendente.
+        ensure_variants(obj)
+        url = variant_url(obj)
+        if url is None:
+            return '—'
+        return format_html(
+            '<img src="{}" alt="" width="48" height="48" loading="lazy" style="object-fit: cover;">',
+            url,
+        )
+
 
 @admin.register(MealPrep)
-class MealPrepAdmin(admin.ModelAdmin):
+class MealPrepAdmin(ScalableChangeListMixin, PrefixAutocompleteMixin, FullTextSearchMixin, admin.ModelAdmin):
     """Admin para o planejamento das "Marmitas" (MealPrep)."""
     list_display = ('name', 'target_date', 'meal_type', 'is_prepared')
     list_filter = ('is_prepared', 'meal_type', 'target_date')
     search_fields = ('name', 'notes')
+    autocomplete_prefix_field = 'name'
     date_hierarchy = 'target_date'
     filter_horizontal = ('intended_for',)
     inlines = [MealPrepComponentInline]
     exclude = ('components',)
+    actions = ('mark_prepared',)
+    change_list_template = 'admin/MealPrep/mealprep/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('production/', self.admin_site.admin_view(self.production_sheet_view),
+                 name='MealPrep_mealprep_production'),
+        ] + super().get_urls()
+
+    def production_sheet_view(self, request):
+        """Ficha de produção das marmitas entre ?start= e ?end= (padrão: próximos 7 dias)."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        start = _date_param(request, 'start') or timezone.localdate()
+        end = _date_param(request, 'end') or start + datetime.timedelta(days=6)
+        if end < start:
+            start, end = end, start
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Ficha de produção',
+            'start': start,
+            'end': end,
+            'sheet': production_sheet(start, end),
+        }
+        return TemplateResponse(request, 'admin/MealPrep/mealprep/production_sheet.html', context)
+
+    @admin.action(description='Marcar como feitas e registrar as refeições')
+    def mark_prepared(self, request, queryset):
+        prepared, created = prepare_meal_preps(queryset)
+        self.message_user(request, f"{prepared} marmitas marcadas como feitas, {created} refeições registradas.")
+
+    def save_model(self, request, obj, form, change):
+        # Marmita de uma única pessoa herda a dieta vigente dela na data planejada.
+        intended_for = form.cleaned_data.get('intended_for')
+        if obj.diet_id is None and intended_for is not None and len(intended_for) == 1:
+            obj.diet = active_diet(request, intended_for[0], obj.target_date)
+        super().save_model(request, obj, form, change)
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(ScalableChangeListMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('description', 'meal_component')
+    list_select_related = ('meal_component',)
     search_fields = ('description',)
     autocomplete_fields = ('meal_component',)
 
 
 @admin.register(MealPrepComponent)
-class MealPrepComponentAdmin(admin.ModelAdmin):
+class MealPrepComponentAdmin(ScalableChangeListMixin, admin.ModelAdmin):
     list_display = ('__str__', 'meal_prep', 'component', 'user', 'quantity', 'unit_of_measure')
-    list_filter = ('meal_prep', 'component', 'user')
+    list_filter = (
+        ('meal_prep', AutocompleteListFilter),
+        ('component', AutocompleteListFilter),
+        ('user', AutocompleteListFilter),
+    )
+    list_select_related = ('meal_prep', 'component', 'user')
     autocomplete_fields = ('meal_prep', 'component', 'user')
\ No newline at end of file
@@ -5,3 +5,6 @@ class MealprepConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'MealPrep'
     verbose_name = 'Preparo de Marmitas'
+
+    def ready(self):
+        from . import search, signals  # noqa: F401
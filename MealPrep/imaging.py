@@ -0,0 +1,60 @@
+"""
+Geração das variantes (miniatura e WebP) das fotos dos componentes.
+
+Este módulo roda nos processos de core.background e não depende do Django:
+recebe caminhos de arquivo e devolve o hash do conteúdo. As variantes ficam em
+<variants_root>/<hash[:2]>/<hash>/<variante>.<ext>, então fotos idênticas
+compartilham os mesmos arquivos.
+"""
+import hashlib
+import os
+
+from PIL import Image, ImageOps
+
+VARIANTS = {
+    # nome: (lado máximo em pixels, formato, extensão, opções de gravação)
+    'thumb': (160, 'JPEG', 'jpg', {'quality': 80, 'optimize': True}),
+    'webp': (960, 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def variant_path(digest, variant):
+    """Caminho relativo da variante; o mesmo para qualquer foto com esse conteúdo."""
+    extension = VARIANTS[variant][2]
+    return f'{digest[:2]}/{digest}/{variant}.{extension}'
+
+
+def render_variants(source_path, variants_root):
+    """Gera as variantes que ainda não existem e retorna o hash SHA-256 da foto."""
+    digest = file_sha256(source_path)
+    missing = {
+        name: os.path.join(variants_root, variant_path(digest, name))
+        for name in VARIANTS
+        if not os.path.exists(os.path.join(variants_root, variant_path(digest, name)))
+    }
+    if not missing:
+        return digest
+    with Image.open(source_path) as original:
+        largest = max(VARIANTS[name][0] for name in missing)
+        # Para JPEG, decodifica já reduzido (muito mais rápido em fotos de celular).
+        original.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(original).convert('RGB')
+    for name, destination in missing.items():
+        size, image_format, _, options = VARIANTS[name]
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.LANCZOS)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        temporary = f'{destination}.{os.getpid()}.tmp'
+        variant.save(temporary, image_format, **options)
+        os.replace(temporary, destination)
+    return digest
@@ -0,0 +1,122 @@
+"""
+Parser das descrições livres de Ingredient.
+
+Transforma textos como "1.5kg de bife de patinho, 2 cebolas grandes" em itens
+(quantidade, unidade, item), com as quantidades convertidas para as unidades
+de MealPrepComponent.UnitOfMeasure (g, ml, un, colher).
+"""
+import re
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple, Optional
+
+
+class ParsedItem(NamedTuple):
+    quantity: Optional[Decimal]
+    unit: str
+    item: str
+
+
+NUMBER_WORDS = {
+    'meio': Decimal('0.5'),
+    'meia': Decimal('0.5'),
+    'um': Decimal(1),
+    'uma': Decimal(1),
+    'dois': Decimal(2),
+    'duas': Decimal(2),
+    'três': Decimal(3),
+    'tres': Decimal(3),
+    'quatro': Decimal(4),
+    'cinco': Decimal(5),
+    'seis': Decimal(6),
+    'dez': Decimal(10),
+}
+
+# "dúzia" multiplica a quantidade que vem antes: "meia dúzia" = 6, "duas dúzias" = 24.
+DOZEN = Decimal(12)
+
+# Unidade reconhecida -> (unidade canônica, fator de conversão).
+UNITS = {
+    'kg': ('g', Decimal(1000)),
+    'quilo': ('g', Decimal(1000)),
+    'quilos': ('g', Decimal(1000)),
+    'g': ('g', Decimal(1)),
+    'gr': ('g', Decimal(1)),
+    'grama': ('g', Decimal(1)),
+    'gramas': ('g', Decimal(1)),
+    'l': ('ml', Decimal(1000)),
+    'litro': ('ml', Decimal(1000)),
+    'litros': ('ml', Decimal(1000)),
+    'ml': ('ml', Decimal(1)),
+    'xícara': ('ml', Decimal(240)),
+    'xícaras': ('ml', Decimal(240)),
+    'xicara': ('ml', Decimal(240)),
+    'xicaras': ('ml', Decimal(240)),
+    'colher de sopa': ('ml', Decimal(15)),
+    'colheres de sopa': ('ml', Decimal(15)),
+    'colher de chá': ('ml', Decimal(5)),
+    'colheres de chá': ('ml', Decimal(5)),
+    'colher': ('colher', Decimal(1)),
+    'colheres': ('colher', Decimal(1)),
+    'un': ('un', Decimal(1)),
+    'unidade': ('un', Decimal(1)),
+    'unidades': ('un', Decimal(1)),
+}
+
+_UNIT_PATTERN = '|'.join(sorted((re.escape(unit) for unit in UNITS), key=len, reverse=True))
+_NUMBER_PATTERN = r'\d+/\d+|\d+(?:[.,]\d+)?|(?:' + '|'.join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r')\b'
+
+ITEM_RE = re.compile(
+    rf'^(?P<quantity>{_NUMBER_PATTERN})?\s*'
+    r'(?:(?P<dozen>d[uú]zias?)\b\s*)?'
+    rf'(?:(?P<unit>{_UNIT_PATTERN})\b\.?)?\s*'
+    r'(?:(?:de|do|da|dos|das)\s+)?'
+    r'(?P<item>.+)$',
+    re.IGNORECASE,
+)
+
+# Vírgula seguida de espaço separa itens; "1,5kg" continua sendo um número.
+SEPARATOR_RE = re.compile(r'[;\n]|,\s+|\s+\+\s+')
+
+
+def _to_decimal(text):
+    """Valor de um número, fração ou número por extenso; None se não der para calcular ("1/0")."""
+    text = text.lower()
+    if text in NUMBER_WORDS:
+        return NUMBER_WORDS[text]
+    try:
+        if '/' in text:
+            numerator, denominator = text.split('/')
+            return Decimal(numerator) / Decimal(denominator)
+        return Decimal(text.replace(',', '.'))
+    except ArithmeticError:
+        # InvalidOperation e DivisionByZero são ArithmeticError.
+        return None
+
+
+def parse_item(text):
+    """Interpreta um único item. Retorna None para textos vazios."""
+    text = ' '.join(text.split())
+    if not text:
+        return None
+    match = ITEM_RE.match(text)
+    quantity_text, unit_text = match.group('quantity'), match.group('unit')
+    item = match.group('item').strip(' .').lower()
+    if not quantity_text and not match.group('dozen'):
+        return ParsedItem(None, '', text.lower())
+    quantity = _to_decimal(quantity_text) if quantity_text else Decimal(1)
+    unit, factor = UNITS.get((unit_text or '').lower(), ('un', Decimal(1)))
+    if match.group('dozen'):
+        factor *= DOZEN
+    if quantity is not None:
+        try:
+            quantity = (quantity * factor).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            # Grande demais para duas casas decimais na precisão do contexto.
+            quantity = None
+    return ParsedItem(quantity, unit, item)
+
+
+def parse_ingredient(description):
+    """Divide a descrição em itens e interpreta cada um."""
+    items = (parse_item(part) for part in SEPARATOR_RE.split(description or ''))
+    return [item for item in items if item]
@@ -0,0 +1,27 @@
+from itertools import repeat
+
+from django.core.management.base import BaseCommand
+
+from core.background import get_executor
+from MealPrep.imaging import render_variants
+from MealPrep.models import MealComponent
+from MealPrep.photos import variants_missing, variants_root
+
+
+class Command(BaseCommand):
+    help = "Gera (no pool de processos) as variantes de foto que estiverem faltando."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Reprocessa também fotos que já têm variantes.")
+
+    def handle(self, *args, **options):
+        components = [
+            component
+            for component in MealComponent.objects.exclude(photo='').exclude(photo__isnull=True)
+            if options['all'] or variants_missing(component)
+        ]
+        paths = [component.photo.path for component in components]
+        digests = get_executor().map(render_variants, paths, repeat(variants_root()))
+        for component, digest in zip(components, digests):
+            MealComponent.objects.filter(pk=component.pk).update(photo_hash=digest)
+        self.stdout.write(self.style.SUCCESS(f"{len(components)} fotos processadas."))
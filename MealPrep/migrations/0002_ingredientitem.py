@@ -0,0 +1,68 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from MealPrep.ingredients import parse_ingredient
+
+
+def parse_existing_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('MealPrep', 'Ingredient')
+    IngredientItem = apps.get_model('MealPrep', 'IngredientItem')
+    items = []
+    for ingredient in Ingredient.objects.iterator():
+        items.extend(
+            IngredientItem(ingredient=ingredient, quantity=parsed.quantity, unit=parsed.unit, item=parsed.item)
+            for parsed in parse_ingredient(ingredient.description)
+        )
+        ingredient.parsed_description = ingredient.description
+        ingredient.save(update_fields=['parsed_description'])
+    IngredientItem.objects.bulk_create(items, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealPrep', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='mealcomponent',
+            options={'verbose_name': 'Mistura', 'verbose_name_plural': 'Misturas'},
+        ),
+        migrations.AlterModelOptions(
+            name='mealprep',
+            options={'ordering': ['-target_date'], 'verbose_name': 'Marmita', 'verbose_name_plural': 'Marmitas'},
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='parsed_description',
+            field=models.CharField(blank=True, editable=False, help_text='Texto que gerou os itens atuais; a descrição só é reinterpretada quando muda.', max_length=255, verbose_name='Descrição interpretada'),
+        ),
+        migrations.AlterField(
+            model_name='mealprepcomponent',
+            name='component',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='MealPrep.mealcomponent', verbose_name='Mistura'),
+        ),
+        migrations.AlterField(
+            model_name='mealprepcomponent',
+            name='meal_prep',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='MealPrep.mealprep', verbose_name='Marmita'),
+        ),
+        migrations.CreateModel(
+            name='IngredientItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Quantidade')),
+                ('unit', models.CharField(blank=True, max_length=10, verbose_name='Unidade')),
+                ('item', models.CharField(max_length=255, verbose_name='Item')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='MealPrep.ingredient', verbose_name='Ingrediente')),
+            ],
+            options={
+                'verbose_name': 'Item de Ingrediente',
+                'verbose_name_plural': 'Itens de Ingredientes',
+            },
+        ),
+        migrations.RunPython(parse_existing_ingredients, migrations.RunPython.noop),
+    ]
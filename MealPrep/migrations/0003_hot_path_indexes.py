@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Diet', '0002_hot_path_indexes'),
+        ('MealPrep', '0002_ingredientitem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mealprep',
+            index=models.Index(fields=['target_date', 'meal_type', 'is_prepared'], name='mealprep_week_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealPrep', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mealcomponent',
+            name='photo_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 do arquivo; endereça as variantes geradas em segundo plano.', max_length=64, verbose_name='Hash da foto'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+
+from django.db import migrations
+
+TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealPrep', '0004_mealcomponent_photo_hash'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                f"CREATE VIRTUAL TABLE mealcomponent_fts USING fts5(name, description, {TOKENIZE})",
+                'INSERT INTO mealcomponent_fts (rowid, name, description) '
+                'SELECT id, name, description FROM "MealPrep_mealcomponent"',
+            ],
+            reverse_sql=["DROP TABLE mealcomponent_fts"],
+        ),
+        migrations.RunSQL(
+            sql=[
+                f"CREATE VIRTUAL TABLE ingredient_fts USING fts5(description, {TOKENIZE})",
+                'INSERT INTO ingredient_fts (rowid, description) '
+                'SELECT id, description FROM "MealPrep_ingredient"',
+            ],
+            reverse_sql=["DROP TABLE ingredient_fts"],
+        ),
+        migrations.RunSQL(
+            sql=[
+                f"CREATE VIRTUAL TABLE mealprep_fts USING fts5(name, notes, {TOKENIZE})",
+                'INSERT INTO mealprep_fts (rowid, name, notes) SELECT id, name, notes FROM "MealPrep_mealprep"',
+            ],
+            reverse_sql=["DROP TABLE mealprep_fts"],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MealPrep', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mealcomponent',
+            name='grams_per_ml',
+            field=models.DecimalField(blank=True, decimal_places=3, help_text='Converte mililitros e colheres em gramas. Em branco, usa a densidade da água.', max_digits=6, null=True, verbose_name='Densidade (g/ml)'),
+        ),
+        migrations.AddField(
+            model_name='mealcomponent',
+            name='grams_per_unit',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Converte porções em unidades (ex.: um ovo, um bife) em gramas.', max_digits=8, null=True, verbose_name='Peso da unidade (g)'),
+        ),
+        migrations.AddField(
+            model_name='mealcomponent',
+            name='serving_size_grams',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Peso a que as calorias por porção se referem. Em branco, as calorias são multiplicadas direto pela quantidade de cada porção.', max_digits=8, null=True, verbose_name='Tamanho da porção (g)'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:20
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Diet', '0004_name_nocase_index'),
+        ('MealPrep', '0006_component_units'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mealcomponent',
+            index=models.Index(django.db.models.functions.comparison.Collate('name', 'NOCASE'), name='mealcomponent_name_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mealprep',
+            index=models.Index(django.db.models.functions.comparison.Collate('name', 'NOCASE'), name='mealprep_name_nocase_idx'),
+        ),
+    ]
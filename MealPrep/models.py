@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models.functions import Collate
 from django.contrib.auth.models import User
 from Diet.models import Diet
+from .ingredients import parse_ingredient
 
 class MealComponent(models.Model):
     """
@@ -33,11 +35,43 @@ class MealComponent(models.Model):
         null=True,
         verbose_name="Foto"
     )
+    photo_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name="Hash da foto",
+        help_text="SHA-256 do arquivo; endereça as variantes geradas em segundo plano."
+    )
     calories_per_serving = models.PositiveIntegerField(
         blank=True,
         null=True,
         verbose_name="Calorias por porção"
     )
+    serving_size_grams = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        blank=True,
+        null=True,
+        verbose_name="Tamanho da porção (g)",
+        help_text="Peso a que as calorias por porção se referem. Em branco, as calorias são "
+                  "multiplicadas direto pela quantidade de cada porção."
+    )
+    grams_per_ml = models.DecimalField(
+        max_digits=6,
+        decimal_places=3,
+        blank=True,
+        null=True,
+        verbose_name="Densidade (g/ml)",
+        help_text="Converte mililitros e colheres em gramas. Em branco, usa a densidade da água."
+    )
+    grams_per_unit = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        blank=True,
+        null=True,
+        verbose_name="Peso da unidade (g)",
+        help_text="Converte porções em unidades (ex.: um ovo, um bife) em gramas."
+    )
 
     def __str__(self):
         return self.name
@@ -45,6 +79,10 @@ class MealComponent(models.Model):
     class Meta:
         verbose_name = "Mistura"
         verbose_name_plural = "Misturas"
+        indexes = [
+            # Autocomplete por prefixo do nome (core.autocomplete).
+            models.Index(Collate('name', 'NOCASE'), name='mealcomponent_name_nocase_idx'),
+        ]
 
 
 class Ingredient(models.Model):
@@ -62,15 +100,75 @@ class Ingredient(models.Model):
         verbose_name="Descrição do Ingrediente",
         help_text="Ex: 1.5kg de bife de patinho, 2 cebolas grandes"
     )
+    parsed_description = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name="Descrição interpretada",
+        help_text="Texto que gerou os itens atuais; a descrição só é reinterpretada quando muda."
+    )
 
     def __str__(self):
         return self.description
 
+    def save(self, *args, **kwargs):
+        reparse = self.description != self.parsed_description
+        if reparse:
+            self.parsed_description = self.description
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'parsed_description'}
+        super().save(*args, **kwargs)
+        if reparse:
+            self.items.all().delete()
+            IngredientItem.objects.bulk_create(
+                IngredientItem(ingredient=self, quantity=parsed.quantity, unit=parsed.unit, item=parsed.item)
+                for parsed in parse_ingredient(self.description)
+            )
+
     class Meta:
         verbose_name = "Ingrediente"
         verbose_name_plural = "Ingredientes"
 
 
+class IngredientItem(models.Model):
+    """
+    Item estruturado (quantidade, unidade, item) extraído de Ingredient.description.
+    As quantidades já estão na unidade canônica (g, ml, un ou colher).
+    """
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='items',
+        verbose_name="Ingrediente"
+    )
+    quantity = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="Quantidade"
+    )
+    unit = models.CharField(
+        max_length=10,
+        blank=True,
+        verbose_name="Unidade"
+    )
+    item = models.CharField(
+        max_length=255,
+        verbose_name="Item"
+    )
+
+    def __str__(self):
+        if self.quantity is None:
+            return self.item
+        return f"{self.quantity.normalize():f}{self.unit} de {self.item}"
+
+    class Meta:
+        verbose_name = "Item de Ingrediente"
+        verbose_name_plural = "Itens de Ingredientes"
+
+
 class MealPrep(models.Model):
     """
     Represents a batch of prepared meals (marmitas) for the week.
@@ -136,6 +234,12 @@ class MealPrep(models.Model):
         verbose_name = "Marmita"
         verbose_name_plural = "Marmitas"
         ordering = ['-target_date']
+        indexes = [
+            # Marmitas da semana por tipo de refeição e situação.
+            models.Index(fields=['target_date', 'meal_type', 'is_prepared'], name='mealprep_week_idx'),
+            # Autocomplete por prefixo do nome (core.autocomplete).
+            models.Index(Collate('name', 'NOCASE'), name='mealprep_name_nocase_idx'),
+        ]
 
 
 class MealPrepComponent(models.Model):
@@ -0,0 +1,86 @@
+"""
+Integração das variantes de foto com o Django.
+
+As variantes são geradas em segundo plano (core.background) a partir do
+arquivo original e endereçadas pelo hash do conteúdo, gravado em
+MealComponent.photo_hash quando a geração termina. Cada foto (pk e nome do
+arquivo) tem no máximo uma geração em andamento; trocar a foto agenda outra.
+"""
+import os
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from core import background
+from .imaging import VARIANTS, render_variants, variant_path
+from .models import MealComponent
+
+VARIANTS_DIR = 'components/variants'
+
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def variants_root():
+    return os.path.join(settings.MEDIA_ROOT, VARIANTS_DIR)
+
+
+def variant_name(digest, variant):
+    return f'{VARIANTS_DIR}/{variant_path(digest, variant)}'
+
+
+def variant_url(component, variant='thumb'):
+    """URL da variante, calculada só a partir do hash (sem abrir a imagem)."""
+    if not component.photo_hash:
+        return None
+    return default_storage.url(variant_name(component.photo_hash, variant))
+
+
+def _store_hash(pk, photo_name, digest):
+    # Só grava se a foto não mudou enquanto as variantes eram geradas.
+    MealComponent.objects.filter(pk=pk, photo=photo_name).update(photo_hash=digest)
+
+
+def _release(key):
+    with _pending_lock:
+        _pending.discard(key)
+
+
+def _submit(pk, photo_path, photo_name):
+    key = (pk, photo_name)
+    with _pending_lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+    background.submit(
+        render_variants, photo_path, variants_root(),
+        on_done=partial(_store_hash, pk, photo_name),
+        cleanup=partial(_release, key),
+    )
+
+
+def schedule_variants(component):
+    """Agenda a geração das variantes para depois do commit."""
+    if component.photo:
+        transaction.on_commit(partial(_submit, component.pk, component.photo.path, component.photo.name))
+
+
+def variants_missing(component):
+    return not component.photo_hash or any(
+        not default_storage.exists(variant_name(component.photo_hash, variant)) for variant in VARIANTS
+    )
+
+
+def ensure_variants(component):
+    """
+    Agenda de novo a geração de uma foto ainda sem hash (por exemplo, depois de
+    uma falha). Decide só pelo hash, sem consultar o storage: arquivos de
+    variante apagados ficam com o comando build_photo_variants.
+    """
+    if component.photo and not component.photo_hash:
+        schedule_variants(component)
+        return False
+    return bool(component.photo)
@@ -0,0 +1,96 @@
+"""
+Ficha de produção: quanto de cada mistura cozinhar para as marmitas de um
+intervalo de datas, somando as porções de todos os usuários.
+
+As porções são convertidas para gramas e kcal no próprio banco
+(MealPrep.units), então a ficha sai de uma única query agrupada por mistura
+e fica no cache "production_sheet" por intervalo. A chave inclui uma geração
+global, trocada pelos sinais de MealPrep.signals sempre que uma porção,
+marmita ou mistura muda, agora e de novo após o commit.
+
+O cache é configurado em settings.CACHES['production_sheet']: memória local,
+que só vale dentro de um processo, ou arquivos com PRODUCTION_SHEET_CACHE_DIR,
+compartilhados entre os processos do servidor.
+"""
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import MealComponent, MealPrepComponent
+from .units import grams_expression, kcal_expression
+
+GENERATION_KEY = 'production-sheet:generation'
+CACHE_ALIAS = 'production_sheet'
+
+
+def production_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _generation():
+    cache = production_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def build_production_sheet(start, end):
+    """
+    Totais por tipo de mistura, na ordem de ComponentType (uma query). As
+    porções em unidades sem peso cadastrado ficam fora dos gramas e são
+    somadas à parte, em unidades (unconverted_quantity).
+    """
+    without_weight = Q(unit_of_measure=MealPrepComponent.UnitOfMeasure.UNIT, component__grams_per_unit__isnull=True)
+    rows = (
+        MealPrepComponent.objects
+        .filter(meal_prep__target_date__range=(start, end))
+        .values('component_id', 'component__name', 'component__component_type')
+        .annotate(
+            grams=Sum(grams_expression()),
+            kcal=Sum(kcal_expression()),
+            portions=Count('pk'),
+            unconverted=Count('pk', filter=without_weight),
+            unconverted_quantity=Sum('quantity', filter=without_weight),
+            users=Count('user', distinct=True),
+        )
+        .order_by('component__component_type', 'component__name')
+    )
+    groups = {component_type: [] for component_type in MealComponent.ComponentType.values}
+    for row in rows:
+        groups[row['component__component_type']].append({
+            'component_id': row['component_id'],
+            'component': row['component__name'],
+            'grams': row['grams'],
+            'kcal': row['kcal'],
+            'portions': row['portions'],
+            'unconverted': row['unconverted'],
+            'unconverted_quantity': row['unconverted_quantity'],
+            'users': row['users'],
+        })
+    return [
+        {'component_type': component_type, 'label': MealComponent.ComponentType(component_type).label, 'items': items}
+        for component_type, items in groups.items() if items
+    ]
+
+
+def production_sheet(start, end):
+    key = f'production-sheet:{_generation()}:{start.isoformat()}:{end.isoformat()}'
+    sheet = production_cache().get(key)
+    if sheet is None:
+        sheet = build_production_sheet(start, end)
+        production_cache().set(key, sheet)
+    return sheet
+
+
+def _new_generation():
+    production_cache().set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_production_sheets():
+    """Invalida todas as fichas, agora e após o commit."""
+    _new_generation()
+    transaction.on_commit(_new_generation)
@@ -0,0 +1,9 @@
+"""Índices de busca textual (core.search) dos models de MealPrep."""
+from core.search import register
+from .models import Ingredient, MealComponent, MealPrep
+
+meal_component_index = register(
+    MealComponent, 'mealcomponent_fts', {'name': 'name', 'description': 'description'}, weights=[10, 1],
+)
+ingredient_index = register(Ingredient, 'ingredient_fts', {'description': 'description'})
+meal_prep_index = register(MealPrep, 'mealprep_fts', {'name': 'name', 'notes': 'notes'}, weights=[10, 1])
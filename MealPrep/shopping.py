@@ -0,0 +1,44 @@
+"""
+Lista de compras agregada a partir dos itens de ingredientes.
+
+Em uma única query: para cada IngredientItem, soma MealPrep.quantity de todas
+as marmitas do período que usam o componente dono do ingrediente e multiplica
+pela quantidade do item, agrupando por (item, unidade).
+"""
+from django.db.models import Exists, F, OuterRef, Subquery, Sum
+
+from .models import IngredientItem, MealPrep, MealPrepComponent
+
+
+def _batches_per_component(start, end):
+    """Subquery: total de marmitas (MealPrep.quantity) do período que usam o componente."""
+    uses_component = MealPrepComponent.objects.filter(
+        meal_prep=OuterRef('pk'),
+        component=OuterRef(OuterRef('ingredient__meal_component')),
+    )
+    return Subquery(
+        MealPrep.objects
+        .filter(target_date__range=(start, end))
+        .filter(Exists(uses_component))
+        .annotate(component=OuterRef('ingredient__meal_component'))
+        .values('component')
+        .order_by()
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+
+
+def shopping_list(start, end):
+    """
+    Retorna [{'item', 'unit', 'quantity'}] para as marmitas com target_date
+    entre `start` e `end`. Itens sem quantidade ("sal a gosto") vêm com
+    quantity None.
+    """
+    return list(
+        IngredientItem.objects
+        .annotate(batches=_batches_per_component(start, end))
+        .filter(batches__gt=0)
+        .values('item', 'unit')
+        .annotate(quantity=Sum(F('quantity') * F('batches')))
+        .order_by('item', 'unit')
+    )
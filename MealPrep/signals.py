@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import date_buckets
+from .models import MealComponent, MealPrep, MealPrepComponent
+from .photos import schedule_variants
+from .production import invalidate_production_sheets
+
+meal_prep_buckets = date_buckets.register(MealPrep, 'target_date')
+
+
+@receiver(pre_save, sender=MealComponent)
+def reset_photo_hash(sender, instance, **kwargs):
+    old_photo = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('photo', flat=True).first() if instance.pk else None
+    instance._photo_changed = (old_photo or '') != (instance.photo.name or '')
+    if instance._photo_changed:
+        instance.photo_hash = ''
+
+
+@receiver(post_save, sender=MealComponent)
+def generate_photo_variants(sender, instance, **kwargs):
+    if getattr(instance, '_photo_changed', False):
+        schedule_variants(instance)
+
+
+@receiver(post_save, sender=MealPrepComponent)
+@receiver(post_delete, sender=MealPrepComponent)
+@receiver(post_save, sender=MealPrep)
+@receiver(post_delete, sender=MealPrep)
+def refresh_production_sheets(sender, instance, **kwargs):
+    invalidate_production_sheets()
+
+
+@receiver(post_save, sender=MealComponent)
+def refresh_production_sheets_on_rename(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_production_sheets()
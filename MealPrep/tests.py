@@ -1,3 +1,295 @@
-from django.test import TestCase
+import datetime
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core.testing import QueryBudgetMixin
+from .imaging import VARIANTS
+from .ingredients import ParsedItem, parse_ingredient
+from .models import Ingredient, MealComponent, MealPrep, MealPrepComponent
+from . import photos
+from .photos import variant_name, variants_missing
+from .production import production_sheet
+from .shopping import shopping_list
+from .units import grams_expression, kcal_expression
+
+
+class MealPrepAdminQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(self.create_admin_user())
+
+    def add_rows(self, count):
+        for i in range(count):
+            user = User.objects.create_user(f'prep-user-{User.objects.count()}')
+            component = MealComponent.objects.create(
+                name=f'Arroz {i}', component_type=MealComponent.ComponentType.CARBOHYDRATE
+            )
+            Ingredient.objects.create(meal_component=component, description='500g de arroz')
+            prep = MealPrep.objects.create(
+                name=f'Marmita {i}', target_date=datetime.date(2025, 1, 6), meal_type=MealPrep.MealType.LUNCH
+            )
+            prep.intended_for.add(user)
+            MealPrepComponent.objects.create(meal_prep=prep, component=component, user=user, quantity=150)
+
+    def assertChangelistBudget(self, model_name, budget):
+        self.add_rows(2)
+        self.assertQueryBudget(f'/admin/MealPrep/{model_name}/', budget, lambda: self.add_rows(10))
+
+    def test_mealcomponent_changelist(self):
+        self.assertChangelistBudget('mealcomponent', 5)
+
+    def test_mealprep_changelist(self):
+        self.assertChangelistBudget('mealprep', 7)
+
+    def test_ingredient_changelist(self):
+        self.assertChangelistBudget('ingredient', 5)
+
+    def test_mealprepcomponent_changelist(self):
+        self.assertChangelistBudget('mealprepcomponent', 8)
+
+
+class IngredientParsingTests(TestCase):
+    def setUp(self):
+        self.component = MealComponent.objects.create(name='Bife', component_type=MealComponent.ComponentType.PROTEIN)
+
+    def test_description_is_parsed_into_items(self):
+        ingredient = Ingredient.objects.create(
+            meal_component=self.component, description='1.5kg de bife de patinho, 2 cebolas grandes'
+        )
+        self.assertEqual(
+            list(ingredient.items.values_list('quantity', 'unit', 'item').order_by('pk')),
+            [(Decimal('1500.00'), 'g', 'bife de patinho'), (Decimal('2.00'), 'un', 'cebolas grandes')]
+        )
+
+    def test_parse_ingredient_handles_words_fractions_and_decimal_commas(self):
+        self.assertEqual(parse_ingredient('meio quilo de carne; 1/2 xícara de arroz, 1,5 l de leite, sal a gosto'), [
+            ParsedItem(Decimal('500.00'), 'g', 'carne'),
+            ParsedItem(Decimal('120.00'), 'ml', 'arroz'),
+            ParsedItem(Decimal('1500.00'), 'ml', 'leite'),
+            ParsedItem(None, '', 'sal a gosto'),
+        ])
+
+    def test_dozen_multiplies_the_quantity(self):
+        self.assertEqual(parse_ingredient('meia dúzia de ovos; uma dúzia de bananas, 2 duzias de pães, dúzia de ovos'), [
+            ParsedItem(Decimal('6.00'), 'un', 'ovos'),
+            ParsedItem(Decimal('12.00'), 'un', 'bananas'),
+            ParsedItem(Decimal('24.00'), 'un', 'pães'),
+            ParsedItem(Decimal('12.00'), 'un', 'ovos'),
+        ])
+
+    def test_impossible_quantity_is_unknown(self):
+        self.assertEqual(parse_ingredient('1/0 xícara de arroz; 0/0 de sal'), [
+            ParsedItem(None, 'ml', 'arroz'),
+            ParsedItem(None, 'un', 'sal'),
+        ])
+
+    def test_unchanged_description_is_not_reparsed(self):
+        ingredient = Ingredient.objects.create(meal_component=self.component, description='2 cebolas')
+        item_pk = ingredient.items.get().pk
+        ingredient.save()
+        self.assertEqual(ingredient.items.get().pk, item_pk)
+        ingredient.description = '3 cebolas'
+        ingredient.save()
+        self.assertEqual(ingredient.items.get().quantity, 3)
+
+
+class ShoppingListTests(TestCase):
+    def test_components_are_scaled_by_prep_quantity_and_summed(self):
+        ana, bia = User.objects.create_user('ana'), User.objects.create_user('bia')
+        beef = MealComponent.objects.create(name='Bife', component_type=MealComponent.ComponentType.PROTEIN)
+        rice = MealComponent.objects.create(name='Arroz', component_type=MealComponent.ComponentType.CARBOHYDRATE)
+        Ingredient.objects.create(meal_component=beef, description='500g de carne, 1 cebola')
+        Ingredient.objects.create(meal_component=rice, description='200g de arroz, 1 cebola')
+        monday = datetime.date(2025, 1, 6)
+        for target_date, quantity in ((monday, 2), (monday + datetime.timedelta(days=2), 3), (monday + datetime.timedelta(days=14), 5)):
+            prep = MealPrep.objects.create(name='Marmita', target_date=target_date,
+                                           meal_type=MealPrep.MealType.LUNCH, quantity=quantity)
+            for user in (ana, bia):
+                MealPrepComponent.objects.create(meal_prep=prep, component=beef, user=user, quantity=150)
+            if quantity == 2:
+                MealPrepComponent.objects.create(meal_prep=prep, component=rice, user=ana, quantity=100)
+
+        with self.assertNumQueries(1):
+            result = shopping_list(monday, monday + datetime.timedelta(days=6))
+        self.assertEqual(
+            [(row['item'], row['unit'], row['quantity']) for row in result],
+            [('arroz', 'g', Decimal('400')), ('carne', 'g', Decimal('2500')), ('cebola', 'un', Decimal('7'))]
+        )
+
+
+class UnitConversionTests(TestCase):
+    def test_columns_are_converted_in_sql(self):
+        user = User.objects.create_user('ana')
+        prep = MealPrep.objects.create(name='Marmita', target_date=datetime.date(2025, 1, 6),
+                                       meal_type=MealPrep.MealType.LUNCH)
+        units = MealPrepComponent.UnitOfMeasure
+        cases = [
+            # (densidade, peso da unidade, porção, kcal por porção), quantidade, unidade, gramas, kcal
+            ((None, None, 100, 50), 150, units.GRAMS, 150, 75),
+            ((Decimal('0.9'), None, 100, 800), 10, units.MILLILITERS, 9, 72),
+            ((None, None, 10, 5), 2, units.SPOON, 30, 15),
+            ((None, 50, 50, 70), 3, units.UNIT, 150, 210),
+            ((None, None, 100, 70), 3, units.UNIT, None, None),
+            ((None, None, None, 2), 100, units.GRAMS, 100, 200),  # sem porção: regra antiga
+        ]
+        for i, ((density, unit_weight, serving, calories), quantity, unit, _, _) in enumerate(cases):
+            component = MealComponent.objects.create(
+                name=f'Mistura {i}', component_type=MealComponent.ComponentType.OTHER, grams_per_ml=density,
+                grams_per_unit=unit_weight, serving_size_grams=serving, calories_per_serving=calories,
+            )
+            MealPrepComponent.objects.create(meal_prep=prep, component=component, user=user,
+                                             quantity=quantity, unit_of_measure=unit)
+        with self.assertNumQueries(1):
+            rows = list(
+                MealPrepComponent.objects.order_by('component__name')
+                .annotate(grams=grams_expression(), kcal=kcal_expression())
+                .values_list('grams', 'kcal')
+            )
+        for (grams, kcal), case in zip(rows, cases):
+            with self.subTest(case):
+                expected_grams, expected_kcal = case[3:]
+                self.assertEqual(grams if grams is None else round(grams, 6), expected_grams)
+                self.assertEqual(kcal if kcal is None else round(kcal, 6), expected_kcal)
+
+
+class ProductionSheetTests(TestCase):
+    def setUp(self):
+        self.ana, self.bia = User.objects.create_user('ana'), User.objects.create_user('bia')
+        self.rice = MealComponent.objects.create(name='Arroz', component_type=MealComponent.ComponentType.CARBOHYDRATE,
+                                                 calories_per_serving=130, serving_size_grams=100)
+        self.beef = MealComponent.objects.create(name='Bife', component_type=MealComponent.ComponentType.PROTEIN)
+        self.monday = datetime.date(2025, 1, 6)
+        for offset in (0, 1, 14):
+            prep = MealPrep.objects.create(name='Marmita', meal_type=MealPrep.MealType.LUNCH,
+                                           target_date=self.monday + datetime.timedelta(days=offset))
+            for user in (self.ana, self.bia):
+                MealPrepComponent.objects.create(meal_prep=prep, component=self.rice, user=user, quantity=100)
+            MealPrepComponent.objects.create(meal_prep=prep, component=self.beef, user=self.ana, quantity=1,
+                                             unit_of_measure=MealPrepComponent.UnitOfMeasure.UNIT)
+
+    def sheet(self):
+        return [
+            (group['label'], [(item['component'], item['grams'], item['kcal'], item['unconverted'],
+                               item['unconverted_quantity'], item['users'])
+                              for item in group['items']])
+            for group in production_sheet(self.monday, self.monday + datetime.timedelta(days=6))
+        ]
+
+    def test_grouped_totals_cached_until_a_portion_changes(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.sheet(), [
+                ('Proteína', [('Bife', None, None, 2, 2, 1)]),
+                ('Carboidrato', [('Arroz', 400, 520, 0, None, 2)]),
+            ])
+        with self.assertNumQueries(0):
+            self.sheet()
+        MealPrepComponent.objects.filter(component=self.beef).first().delete()
+        self.assertEqual(self.sheet()[0], ('Proteína', [('Bife', None, None, 1, 1, 1)]))
+        # Mistura com porções em gramas e em unidades sem peso: as unidades aparecem ao lado dos gramas.
+        MealPrepComponent.objects.create(meal_prep=MealPrep.objects.get(target_date=self.monday),
+                                         component=self.beef, user=self.bia, quantity=150)
+        self.assertEqual(self.sheet()[0], ('Proteína', [('Bife', 150, None, 1, 1, 2)]))
+        self.beef.grams_per_unit = 120
+        self.beef.save()
+        self.assertEqual(self.sheet()[0], ('Proteína', [('Bife', 270, None, 0, None, 2)]))
+
+    def test_admin_view(self):
+        self.client.force_login(User.objects.create_superuser('admin'))
+        response = self.client.get('/admin/MealPrep/mealprep/production/', {'start': self.monday.isoformat()})
+        self.assertContains(response, '<td>400 g</td>', html=True)
+        self.assertContains(response, '<td>520 kcal</td>', html=True)
+        self.assertContains(response, '2 un (2 porções sem peso por unidade cadastrado)')
+        response = self.client.get('/admin/MealPrep/mealprep/')
+        self.assertContains(response, '/admin/MealPrep/mealprep/production/')
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class PhotoVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def make_photo(self, color='red'):
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 900), color).save(buffer, 'JPEG')
+        return ContentFile(buffer.getvalue(), name='foto.jpg')
+
+    def create_component(self, name, photo):
+        with self.captureOnCommitCallbacks(execute=True):
+            return MealComponent.objects.create(
+                name=name, component_type=MealComponent.ComponentType.PROTEIN, photo=photo
+            )
+
+    def test_variants_are_generated_and_deduplicated(self):
+        first = self.create_component('Frango', self.make_photo())
+        second = self.create_component('Frango de novo', self.make_photo())
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertTrue(first.photo_hash)
+        self.assertEqual(first.photo_hash, second.photo_hash)
+        self.assertFalse(variants_missing(first))
+        with Image.open(os.path.join(settings.MEDIA_ROOT, variant_name(first.photo_hash, 'thumb'))) as thumb:
+            self.assertEqual(max(thumb.size), VARIANTS['thumb'][0])
+
+    def test_changelist_reschedules_photos_without_hash(self):
+        component = self.create_component('Frango', self.make_photo())
+        MealComponent.objects.filter(pk=component.pk).update(photo_hash='')
+        self.client.force_login(User.objects.create_superuser('admin'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get('/admin/MealPrep/mealcomponent/')
+        component.refresh_from_db()
+        self.assertTrue(component.photo_hash)
+
+    def test_failed_generation_does_not_block_the_photo(self):
+        with mock.patch('MealPrep.photos.render_variants', side_effect=OSError), self.assertRaises(OSError):
+            self.create_component('Frango', self.make_photo())
+        component = MealComponent.objects.get()
+        self.assertEqual((component.photo_hash, photos._pending), ('', set()))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertFalse(photos.ensure_variants(component))
+        component.refresh_from_db()
+        self.assertTrue(component.photo_hash)
+
+    def test_photo_changed_while_pending_is_generated(self):
+        component = self.create_component('Frango', self.make_photo())
+        # Geração da foto antiga ainda em andamento: a nova foto é agendada mesmo assim.
+        old_key = (component.pk, component.photo.name)
+        self.enterContext(mock.patch.object(photos, '_pending', {old_key}))
+        component.photo = self.make_photo('blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            component.save()
+        component.refresh_from_db()
+        self.assertTrue(component.photo_hash)
+        self.assertEqual(photos._pending, {old_key})
+
+    def test_changelist_thumbnail_uses_only_the_hash(self):
+        component = self.create_component('Frango', self.make_photo())
+        component.refresh_from_db()
+        MealComponent.objects.create(name='Arroz', component_type=MealComponent.ComponentType.CARBOHYDRATE)
+        os.remove(os.path.join(settings.MEDIA_ROOT, variant_name(component.photo_hash, 'thumb')))
+        self.client.force_login(User.objects.create_superuser('admin'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.get('/admin/MealPrep/mealcomponent/')
+        self.assertEqual(callbacks, [])
+        self.assertContains(response, variant_name(component.photo_hash, 'thumb'))
+        self.assertContains(response, '—')
+
+    def test_changing_photo_resets_hash(self):
+        component = self.create_component('Frango', self.make_photo())
+        component.refresh_from_db()
+        old_hash = component.photo_hash
+        component.photo = self.make_photo('blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            component.save()
+        component.refresh_from_db()
+        self.assertNotIn(component.photo_hash, ('', old_hash))
@@ -0,0 +1,57 @@
+"""
+Normalização de porções para gramas e kcal, como expressões SQL.
+
+Cada MealComponent pode informar a densidade (g/ml), o peso de uma unidade e
+o tamanho da porção a que calories_per_serving se refere. As expressões
+abaixo convertem a coluna inteira no banco, então relatórios sobre muitas
+porções agregam gramas e calorias sem instanciar os objetos:
+
+- g: a própria quantidade;
+- ml e colher: volume (uma colher = SPOON_ML ml) vezes a densidade, ou a da
+  água quando a mistura não informa;
+- un: quantidade vezes o peso da unidade (nulo se não informado).
+
+Sem tamanho de porção, a caloria segue a regra antiga (quantidade vezes
+calories_per_serving, qualquer que seja a unidade).
+"""
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+from .models import MealPrepComponent
+
+SPOON_ML = 15.0
+WATER_DENSITY = 1.0
+
+
+def _float(name):
+    # SQLite guarda decimais inteiros como INTEGER; sem o cast, a divisão seria inteira.
+    return Cast(F(name), FloatField())
+
+
+def grams_expression(quantity='quantity', unit='unit_of_measure', component='component'):
+    """Expressão com a quantidade em gramas (FloatField; nula se não for conversível)."""
+    units = MealPrepComponent.UnitOfMeasure
+    amount = _float(quantity)
+    density = Coalesce(_float(f'{component}__grams_per_ml'), Value(WATER_DENSITY))
+    return Case(
+        When(**{unit: units.GRAMS}, then=amount),
+        When(**{unit: units.MILLILITERS}, then=amount * density),
+        When(**{unit: units.SPOON}, then=amount * Value(SPOON_ML) * density),
+        When(**{unit: units.UNIT}, then=amount * _float(f'{component}__grams_per_unit')),
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def kcal_expression(quantity='quantity', unit='unit_of_measure', component='component'):
+    """Expressão com as calorias da porção (FloatField)."""
+    calories = _float(f'{component}__calories_per_serving')
+    serving = _float(f'{component}__serving_size_grams')
+    return Case(
+        When(
+            **{f'{component}__serving_size_grams__gt': 0},
+            then=grams_expression(quantity, unit, component) * calories / serving,
+        ),
+        default=_float(quantity) * calories,
+        output_field=FloatField(),
+    )
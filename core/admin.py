@@ -0,0 +1,15 @@
+from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
+
+from .autocomplete import PrefixAutocompleteMixin
+from .changelist import ScalableChangeListMixin
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(ScalableChangeListMixin, PrefixAutocompleteMixin, BaseUserAdmin):
+    """UserAdmin do Django com autocomplete por prefixo do username (índice criado em core.migrations)."""
+    autocomplete_prefix_field = 'username'
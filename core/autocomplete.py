@@ -0,0 +1,151 @@
+"""
+Autocomplete do admin por prefixo indexado, com ranking por popularidade.
+
+O autocomplete padrão do Django (autocomplete_fields e AutocompleteListFilter)
+faz icontains em todos os search_fields, o que percorre a tabela inteira. Com
+PrefixAutocompleteMixin o ModelAdmin responde ao autocomplete com um
+intervalo sobre `campo COLLATE NOCASE` (o prefixo digitado até o próximo
+prefixo), que usa o índice de mesma collation criado na migração do model:
+uma busca na árvore do índice em vez de uma varredura. Só esse campo é
+consultado; quando nenhum objeto começa com o termo, a resposta cai na busca
+normal do ModelAdmin (search_fields), mais lenta, para que termos que só
+casam com outros campos (ex.: o usuário de uma dieta) ainda encontrem algo.
+
+Cada prefixo guarda no cache padrão até RESULT_LIMIT pks: primeiro os objetos
+mais escolhidos nos filtros da lista (record_choice()), depois os demais em
+ordem alfabética. A chave inclui uma geração por model, trocada pelos sinais
+post_save/post_delete.
+"""
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, When
+from django.db.models.functions import Collate
+from django.db.models.signals import post_delete, post_save
+
+RESULT_LIMIT = 100
+POPULAR_SIZE = 200
+CACHE_TIMEOUT = 10 * 60
+
+_registry = {}
+
+
+def _ascii_lower(term):
+    # NOCASE só ignora a caixa de letras ASCII; as demais são comparadas como estão.
+    return ''.join(char.lower() if char.isascii() else char for char in term)
+
+
+def prefix_filter(queryset, field, term):
+    """Objetos cujo `field` começa com `term`, sem distinguir maiúsculas (intervalo indexável)."""
+    term = _ascii_lower(term.strip())
+    if not term:
+        return queryset
+    upper = term[:-1] + chr(ord(term[-1]) + 1)
+    return queryset.alias(_prefix=Collate(field, 'NOCASE')).filter(_prefix__gte=term, _prefix__lt=upper)
+
+
+def prefix_matches(queryset, field, term):
+    """prefix_filter() em ordem alfabética, na ordem do próprio índice."""
+    return prefix_filter(queryset, field, term).order_by(Collate(field, 'NOCASE'), 'pk')
+
+
+def _popularity_key(model):
+    return f'autocomplete:popular:{model._meta.label_lower}'
+
+
+def record_choice(model, pk):
+    """Conta uma escolha do objeto; só os POPULAR_SIZE mais escolhidos são mantidos."""
+    key = _popularity_key(model)
+    counts = Counter(cache.get(key) or {})
+    counts[str(pk)] += 1
+    cache.set(key, dict(counts.most_common(POPULAR_SIZE)), timeout=None)
+
+
+def popular(model):
+    """pks (como texto) dos objetos mais escolhidos, do mais ao menos popular."""
+    counts = cache.get(_popularity_key(model)) or {}
+    return sorted(counts, key=counts.get, reverse=True)
+
+
+class PrefixAutocomplete:
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.generation_key = f'autocomplete:generation:{model._meta.label_lower}'
+
+    def _generation(self):
+        generation = cache.get(self.generation_key)
+        if generation is None:
+            cache.add(self.generation_key, time.time_ns(), timeout=None)
+            generation = cache.get(self.generation_key)
+        return generation
+
+    def invalidate(self, **kwargs):
+        cache.set(self.generation_key, time.time_ns(), timeout=None)
+
+    def suggestions(self, term):
+        """Até RESULT_LIMIT pks que casam com o prefixo: populares primeiro, depois por ordem alfabética."""
+        term = term.strip()
+        key = f'autocomplete:{self.model._meta.label_lower}:{self._generation()}:{_ascii_lower(term)}'
+        pks = cache.get(key)
+        if pks is not None:
+            return pks
+        matches = prefix_matches(self.model._default_manager.all(), self.field, term)
+        ranking = {pk: position for position, pk in enumerate(popular(self.model))}
+        pks = sorted(
+            matches.filter(pk__in=list(ranking)).order_by().values_list('pk', flat=True),
+            key=lambda pk: ranking[str(pk)],
+        )[:RESULT_LIMIT] if ranking else []
+        pks += list(matches.exclude(pk__in=pks).values_list('pk', flat=True)[:RESULT_LIMIT - len(pks)])
+        cache.set(key, pks, CACHE_TIMEOUT)
+        return pks
+
+
+def register(model, field):
+    """Registra o autocomplete por prefixo do model e conecta a invalidação do cache."""
+    if model not in _registry:
+        autocomplete = PrefixAutocomplete(model, field)
+        _registry[model] = autocomplete
+        uid = f'prefix-autocomplete-{model._meta.label_lower}'
+        post_save.connect(autocomplete.invalidate, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(autocomplete.invalidate, sender=model, weak=False, dispatch_uid=uid)
+    return _registry[model]
+
+
+def autocomplete_for(model):
+    return _registry.get(model)
+
+
+def is_autocomplete_request(request):
+    match = getattr(request, 'resolver_match', None)
+    return match is not None and match.url_name == 'autocomplete'
+
+
+class PrefixAutocompleteMixin:
+    """
+    Mixin de ModelAdmin: o autocomplete do admin busca por prefixo de
+    `autocomplete_prefix_field` (indexado com COLLATE NOCASE) em vez de
+    icontains sobre search_fields; sem nenhum resultado por prefixo, usa a
+    busca normal. A busca da lista não muda.
+    """
+    autocomplete_prefix_field = None
+
+    def __init__(self, model, admin_site):
+        super().__init__(model, admin_site)
+        if self.autocomplete_prefix_field:
+            register(model, self.autocomplete_prefix_field)
+
+    def get_search_results(self, request, queryset, search_term):
+        autocomplete = autocomplete_for(self.model)
+        if autocomplete is None or not is_autocomplete_request(request):
+            return super().get_search_results(request, queryset, search_term)
+        pks = autocomplete.suggestions(search_term)
+        if not pks:
+            return super().get_search_results(request, queryset, search_term)
+        ranking = Case(*[When(pk=pk, then=position) for position, pk in enumerate(pks)], output_field=IntegerField())
+        queryset = queryset.filter(pk__in=pks).order_by(ranking)
+        if isinstance(self.list_select_related, (list, tuple)) and self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset, False
+
@@ -0,0 +1,70 @@
+"""
+Execução de tarefas fora do ciclo de requisição/resposta.
+
+As tarefas rodam num ProcessPoolExecutor compartilhado (processos "spawn",
+que não herdam o estado do worker web). A função da tarefa precisa ser
+importável sem Django configurado; os callbacks `on_done` e `cleanup` rodam
+no processo principal e podem usar o ORM.
+
+Com BACKGROUND_TASKS_EAGER = True (testes, scripts) tudo roda na hora,
+no próprio processo.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def _finish(on_done, cleanup, future):
+    try:
+        result = future.result()
+        if on_done is not None:
+            on_done(result)
+    except Exception:
+        logger.exception("Falha em tarefa de segundo plano")
+    finally:
+        try:
+            if cleanup is not None:
+                cleanup()
+        finally:
+            # O callback roda numa thread do executor; fecha as conexões que ela abriu.
+            connections.close_all()
+
+
+def submit(func, *args, on_done=None, cleanup=None):
+    """
+    Agenda `func(*args)`; `on_done(resultado)` é chamado quando terminar com
+    sucesso e `cleanup()` sempre, mesmo se a tarefa ou on_done falharem.
+    """
+    if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+        try:
+            result = func(*args)
+            if on_done is not None:
+                on_done(result)
+        finally:
+            if cleanup is not None:
+                cleanup()
+        return None
+    future = get_executor().submit(func, *args)
+    if on_done is not None or cleanup is not None:
+        future.add_done_callback(lambda f: _finish(on_done, cleanup, f))
+    return future
@@ -0,0 +1,150 @@
+"""
+Suíte de benchmarks reprodutível: páginas do admin, busca e agregações.
+
+Cada cenário roda `repeat` vezes (após uma execução de aquecimento); o
+relatório traz p50 e p95 em milissegundos e o número de queries de uma
+execução extra, medida à parte para não pesar nos tempos. compare() confronta
+o resultado com um JSON de referência salvo anteriormente.
+
+As páginas do admin são chamadas direto pela view (RequestFactory), sem
+middlewares, e renderizadas por completo.
+"""
+import datetime
+import math
+import statistics
+import time
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Max
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from MealLog.adherence import daily_adherence
+from MealLog.dashboard import build_dashboard
+from MealLog.models import MealLog
+from MealLog.rollups import nutrition_series
+from MealLog.views import timeline_page
+from MealPrep.production import build_production_sheet
+from MealPrep.shopping import shopping_list
+
+BENCHMARK_APPS = ('Diet', 'MealLog', 'MealPrep')
+
+SEARCHES = {
+    'MealLog.meallog': 'pão',
+    'MealPrep.mealcomponent': 'arroz',
+    'MealPrep.mealprep': 'marmita',
+}
+
+
+def percentile(values, fraction):
+    """Percentil pelo posto mais próximo (valores já ordenados)."""
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+def measure(run, repeat):
+    run()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    with CaptureQueriesContext(connection) as ctx:
+        run()
+    timings.sort()
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': len(ctx.captured_queries),
+    }
+
+
+class BenchmarkContext:
+    """Usuário, datas e administrador usados pelos cenários, a partir dos dados do banco."""
+
+    def __init__(self, admin_user, user):
+        self.admin_user = admin_user
+        self.user = user
+        last = MealLog.objects.filter(user=user).aggregate(last=Max('consumed_at'))['last']
+        self.end = timezone.localdate(last) if last else timezone.localdate()
+        self.factory = RequestFactory()
+
+    def admin_page(self, url, params=None):
+        def run():
+            request = self.factory.get(url, params or {})
+            request.user = self.admin_user
+            match = resolve(url)
+            response = match.func(request, *match.args, **match.kwargs)
+            response.render()
+            if response.status_code != 200:
+                raise RuntimeError(f'{url} respondeu {response.status_code}')
+        return run
+
+
+def scenarios(context):
+    """Dicionário nome -> função sem argumentos que executa o cenário."""
+    end = context.end
+    user = context.user
+    found = {}
+    for model, model_admin in admin.site._registry.items():
+        if model._meta.app_label not in BENCHMARK_APPS:
+            continue
+        label = model._meta.label_lower
+        url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+        found[f'admin {model._meta.label}'] = context.admin_page(url)
+        if label in SEARCHES:
+            found[f'busca {model._meta.label}'] = context.admin_page(url, {'q': SEARCHES[label]})
+    found.update({
+        'linha do tempo': lambda: timeline_page(user.pk),
+        'painel diário': lambda: build_dashboard(user, end),
+        'série nutricional (1 ano)': lambda: nutrition_series(user, end - datetime.timedelta(days=364), end),
+        'adesão diária (90 dias)': lambda: daily_adherence(end - datetime.timedelta(days=89), end),
+        'ficha de produção (30 dias)': lambda: build_production_sheet(end - datetime.timedelta(days=29), end),
+        'lista de compras (7 dias)': lambda: shopping_list(end - datetime.timedelta(days=6), end),
+    })
+    return found
+
+
+def run_suite(context, repeat=20, only=None):
+    results = {}
+    for name, run in scenarios(context).items():
+        if only and not any(term.lower() in name.lower() for term in only):
+            continue
+        results[name] = measure(run, repeat)
+    return results
+
+
+def compare(results, baseline, tolerance=1.25):
+    """
+    Lista de (cenário, situação, detalhe). "regressão" quando o p50 passa de
+    tolerance vezes o da referência ou quando o número de queries aumenta.
+    """
+    report = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            report.append((name, 'novo', ''))
+            continue
+        ratio = result['p50_ms'] / reference['p50_ms'] if reference['p50_ms'] else 1.0
+        detail = f"p50 {ratio:.2f}x, queries {reference['queries']} -> {result['queries']}"
+        if ratio > tolerance or result['queries'] > reference['queries']:
+            report.append((name, 'regressão', detail))
+        elif ratio < 1 / tolerance or result['queries'] < reference['queries']:
+            report.append((name, 'melhora', detail))
+        else:
+            report.append((name, 'igual', detail))
+    return report
+
+
+def benchmark_users():
+    """Primeiro usuário gerado por core.seeding e um superusuário para o admin (criado se preciso)."""
+    user = User.objects.filter(username__startswith='perf-').order_by('pk').first()
+    if user is None:
+        return None, None
+    admin_user = User.objects.filter(is_superuser=True, is_active=True).first()
+    if admin_user is None:
+        admin_user = User.objects.create_superuser('bench-admin', 'bench-admin@example.com', None)
+    return admin_user, user
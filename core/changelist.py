@@ -0,0 +1,128 @@
+"""
+Listas do admin que não dependem do tamanho das tabelas.
+
+CappedCountPaginator conta no máximo COUNT_LIMIT linhas (COUNT sobre uma
+subquery com LIMIT); acima disso a contagem é estimada, a lista mostra
+"mais de N" e as páginas além da estimativa continuam acessíveis. ScalableChangeListMixin aplica o paginador, desliga a contagem
+total sem filtros (show_full_result_count) e troca o date_hierarchy pelo de
+core.date_buckets.
+
+AutocompleteListFilter substitui o filtro lateral de FK, que listaria todos
+os objetos relacionados a cada carregamento, por uma caixa de autocomplete
+(core.autocomplete).
+"""
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import EmptyPage, Paginator
+from django.db import DatabaseError, connection
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from .autocomplete import record_choice
+
+COUNT_LIMIT = 10000
+
+
+def estimated_row_count(model):
+    """
+    Linhas da tabela segundo o sqlite_stat1 (gerado por ANALYZE) ou, sem
+    estatísticas, o maior pk. Não varre a tabela.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [model._meta.db_table])
+            row = cursor.fetchone()
+        if row:
+            return int(row[0].split()[0])
+    except DatabaseError:
+        pass
+    return model._default_manager.aggregate(last=Max('pk'))['last'] or 0
+
+
+class CappedCountPaginator(Paginator):
+    count_limit = COUNT_LIMIT
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return len(queryset)
+        counted = queryset.order_by().values('pk')[:self.count_limit + 1].count()
+        if counted <= self.count_limit:
+            return counted
+        self.estimated = True
+        if queryset.query.has_filters():
+            return self.count_limit
+        return max(self.count_limit, estimated_row_count(queryset.model))
+
+    def validate_number(self, number):
+        # Com a contagem estimada, páginas além da estimativa podem ter linhas.
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.estimated or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if self.estimated and bottom + self.per_page > self.count:
+            return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+        return super().page(number)
+
+
+class ScalableChangeListMixin:
+    """Mixin de ModelAdmin: contagem limitada e date_hierarchy a partir de DateBucket."""
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/core/change_list.html'
+
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, (list, tuple)) and issubclass(list_filter[1], AutocompleteListFilter):
+                field = get_fields_from_path(self.model, list_filter[0])[-1]
+                return media + AutocompleteSelect(field, self.admin_site).media + AutocompleteListFilter.media
+        return media
+
+
+class AutocompleteListFilter(admin.RelatedFieldListFilter):
+    """
+    Filtro por FK sem a lista de objetos: escolhe-se numa caixa de autocomplete
+    paginada (a mesma de autocomplete_fields) e só o objeto escolhido é lido.
+    O admin do model relacionado precisa de search_fields.
+    """
+    template = 'admin/core/autocomplete_filter.html'
+    media = forms.Media(js=['core/js/autocomplete_filter.js'])
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.model_admin = model_admin
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        queryset = super().queryset(request, queryset)
+        for value in self.lookup_val or ():
+            record_choice(self.field.related_model, value)
+        return queryset
+
+    @property
+    def widget(self):
+        form_field = self.field.formfield(
+            widget=AutocompleteSelect(self.field, self.model_admin.admin_site), required=False,
+        )
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return form_field.widget.render(self.lookup_kwarg, value, attrs={'id': f'filter_{self.lookup_kwarg}'})
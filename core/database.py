@@ -0,0 +1,91 @@
+"""
+Perfis de configuração do SQLite.
+
+O perfil "basic" (padrão) usa o SQLite como o Django o configura. O perfil
+"tuned" (DB_PROFILE=tuned nas settings) ajusta cada conexão nova com PRAGMAs
+para uso concorrente: WAL (leitores não bloqueiam o escritor),
+synchronous=NORMAL (seguro com WAL), busy timeout, mmap e cache maiores. As
+transações começam com BEGIN IMMEDIATE, então um escritor espera o lock no
+início da transação em vez de falhar com "database is locked" ao tentar
+promovê-la, e as conexões são reaproveitadas entre requisições (CONN_MAX_AGE).
+
+No perfil "tuned", read_replica=True cria o alias "replica": uma segunda
+conexão, somente leitura, para o mesmo arquivo, usada pelo ReadReplicaRouter.
+"""
+from django.conf import settings
+from django.db import connections
+
+BUSY_TIMEOUT = 20  # segundos
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': BUSY_TIMEOUT * 1000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # negativo = KiB
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+PROFILES = ('basic', 'tuned')
+
+
+def init_command(pragmas):
+    return ';'.join(f'PRAGMA {name}={value}' for name, value in pragmas.items())
+
+
+def sqlite_databases(path, profile='basic', read_replica=False, conn_max_age=600):
+    """Monta o dicionário DATABASES para o arquivo `path` no perfil informado."""
+    if profile not in PROFILES:
+        raise ValueError(f"Perfil de banco desconhecido: {profile}")
+    default = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+    }
+    if profile == 'basic':
+        return {'default': default}
+    default.update({
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': init_command(SQLITE_PRAGMAS),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': BUSY_TIMEOUT,
+        },
+    })
+    databases = {'default': default}
+    if read_replica:
+        pragmas = {name: value for name, value in SQLITE_PRAGMAS.items() if name != 'journal_mode'}
+        databases['replica'] = {
+            **default,
+            'NAME': f'file:{path}?mode=ro',
+            'OPTIONS': {
+                'init_command': init_command({**pragmas, 'query_only': 'ON'}),
+                'timeout': BUSY_TIMEOUT,
+                'uri': True,
+            },
+            'TEST': {'MIRROR': 'default'},
+        }
+    return databases
+
+
+class ReadReplicaRouter:
+    """
+    Envia as leituras para o alias "replica" e as escritas para "default".
+    Dentro de uma transação em "default" as leituras também ficam em
+    "default", para enxergarem o que a própria transação gravou.
+    """
+
+    def db_for_read(self, model, **hints):
+        if 'replica' not in settings.DATABASES or connections['default'].in_atomic_block:
+            return 'default'
+        return 'replica'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,118 @@
+"""
+Contagens mensais (core.models.DateBucket) para o date_hierarchy do admin.
+
+O date_hierarchy padrão agrega a tabela inteira a cada página (MIN/MAX e
+datas distintas). Para os campos registrados com register(), os anos e meses
+vêm de DateBucket, uma linha por (model, campo, ano, mês); só a lista de dias
+de um mês ainda consulta a tabela, já limitada àquele mês.
+
+Os sinais post_save/post_delete mantêm as contagens. Gravações em lote
+(bulk_create, update, delete sem sinais) precisam chamar add() ou o comando
+rebuild_date_buckets. As contagens valem para a tabela inteira: com filtros
+aplicados na lista, um ano ou mês pode não ter resultados.
+"""
+import datetime
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import DateBucket
+
+_registry = {}
+
+
+def _month(value):
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.year, value.month
+
+
+class DateBuckets:
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.label = model._meta.label_lower
+
+    def buckets(self):
+        return DateBucket.objects.filter(model=self.label, field=self.field, count__gt=0)
+
+    def years(self):
+        return list(self.buckets().order_by('year').values_list('year', flat=True).distinct())
+
+    def months(self, year):
+        return list(self.buckets().filter(year=year).order_by('month').values_list('month', flat=True))
+
+    def add(self, values, sign=1):
+        """Soma (ou, com sign=-1, subtrai) um objeto por valor de data em `values`."""
+        counts = Counter(_month(value) for value in values if value is not None)
+        if not counts:
+            return
+        table = connection.ops.quote_name(DateBucket._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {table} (model, field, year, month, "count") VALUES (%s, %s, %s, %s, %s) '
+                f'ON CONFLICT (model, field, year, month) DO UPDATE SET "count" = "count" + excluded."count"',
+                [[self.label, self.field, year, month, sign * count] for (year, month), count in counts.items()],
+            )
+
+    def rebuild(self):
+        """Recalcula as contagens a partir da tabela; retorna quantos meses foram gravados."""
+        rows = (
+            self.model._default_manager
+            .annotate(bucket=TruncMonth(self.field))
+            .values('bucket')
+            .order_by()
+            .annotate(total=Count('pk'))
+        )
+        buckets = [
+            DateBucket(model=self.label, field=self.field, year=row['bucket'].year,
+                       month=row['bucket'].month, count=row['total'])
+            for row in rows if row['bucket'] is not None
+        ]
+        with transaction.atomic():
+            DateBucket.objects.filter(model=self.label, field=self.field).delete()
+            DateBucket.objects.bulk_create(buckets)
+        return len(buckets)
+
+    def _pre_save(self, sender, instance, update_fields=None, **kwargs):
+        if not instance.pk or (update_fields is not None and self.field not in update_fields):
+            instance._date_bucket_old = None
+            return
+        instance._date_bucket_old = sender._default_manager.filter(
+            pk=instance.pk
+        ).values_list(self.field, flat=True).first()
+
+    def _saved(self, sender, instance, created, **kwargs):
+        old = getattr(instance, '_date_bucket_old', None)
+        new = getattr(instance, self.field)
+        if created:
+            self.add([new])
+        elif old is not None and _month(old) != _month(new):
+            self.add([old], sign=-1)
+            self.add([new])
+
+    def _deleted(self, sender, instance, **kwargs):
+        self.add([getattr(instance, self.field)], sign=-1)
+
+
+def register(model, field):
+    """Registra as contagens mensais de `field` e conecta os sinais que as mantêm."""
+    buckets = DateBuckets(model, field)
+    _registry[model, field] = buckets
+    uid = f'date-buckets-{buckets.label}-{field}'
+    pre_save.connect(buckets._pre_save, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(buckets._saved, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(buckets._deleted, sender=model, weak=False, dispatch_uid=uid)
+    return buckets
+
+
+def buckets_for(model, field):
+    return _registry.get((model, field))
+
+
+def registered_buckets():
+    return list(_registry.values())
@@ -0,0 +1,69 @@
+"""
+Padrões de acesso mais frequentes e a verificação dos seus planos de execução.
+
+Cada consulta é descrita por uma função que recebe um usuário de referência e
+uma data e devolve o queryset exatamente como a aplicação o executa.
+"""
+import datetime
+import re
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .autocomplete import prefix_matches
+
+from Diet.models import Diet
+from MealLog.models import MealLog
+from MealLog.views import encode_cursor, timeline_queryset
+from MealPrep.models import MealComponent, MealPrep
+
+
+def _day_start(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+HOT_QUERIES = {
+    'meallog_user_range': lambda user, date: MealLog.objects.filter(
+        user=user, consumed_at__gte=_day_start(date - datetime.timedelta(days=30)), consumed_at__lt=_day_start(date)
+    ),
+    'meallog_timeline_keyset': lambda user, date: timeline_queryset(
+        user.pk, encode_cursor(_day_start(date - datetime.timedelta(days=30)), 10 ** 12)
+    ),
+    'meallog_changelist': lambda user, date: MealLog.objects.order_by('-consumed_at', '-pk'),
+    'mealprep_week_by_type': lambda user, date: MealPrep.objects.filter(
+        target_date__range=(date, date + datetime.timedelta(days=6)), meal_type=MealPrep.MealType.LUNCH
+    ),
+    'mealprep_week_pending': lambda user, date: MealPrep.objects.filter(
+        target_date__range=(date, date + datetime.timedelta(days=6)),
+        meal_type=MealPrep.MealType.DINNER,
+        is_prepared=False,
+    ),
+    'diet_user_by_start': lambda user, date: Diet.objects.filter(user=user),
+    'diet_changelist': lambda user, date: Diet.objects.all(),
+    'user_autocomplete': lambda user, date: prefix_matches(User.objects.all(), 'username', user.username[:3]),
+    'diet_autocomplete': lambda user, date: prefix_matches(Diet.objects.all(), 'name', 'Die'),
+    'mealcomponent_autocomplete': lambda user, date: prefix_matches(MealComponent.objects.all(), 'name', 'ar'),
+    'mealprep_autocomplete': lambda user, date: prefix_matches(MealPrep.objects.all(), 'name', 'Mar'),
+}
+
+
+def plan_problems(plan):
+    """Lista os trechos do EXPLAIN QUERY PLAN que indicam varredura sem índice ou ordenação em disco."""
+    problems = []
+    for line in plan.splitlines():
+        # O backend SQLite prefixa cada linha com "id parent notused".
+        detail = re.sub(r'^(\d+ ){3}', '', line.strip())
+        if 'TEMP B-TREE' in detail:
+            problems.append(detail)
+        elif detail.startswith('SCAN') and 'INDEX' not in detail:
+            problems.append(detail)
+    return problems
+
+
+def explain_hot_queries(user, date):
+    """Retorna {nome: (plano, problemas)} para cada consulta de HOT_QUERIES."""
+    results = {}
+    for name, build in HOT_QUERIES.items():
+        plan = build(user, date).explain()
+        results[name] = (plan, plan_problems(plan))
+    return results
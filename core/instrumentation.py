@@ -0,0 +1,133 @@
+"""
+Instrumentação por requisição: queries, tempo de banco e de view.
+
+Com REQUEST_INSTRUMENTATION ligado, RequestInstrumentationMiddleware mede
+cada requisição e:
+
+- envia o cabeçalho Server-Timing (db, app e total), visível nas
+  ferramentas de desenvolvedor do navegador;
+- registra no logger "core.instrumentation", em JSON, as requisições acima de
+  SLOW_REQUEST_MS e as queries acima de SLOW_QUERY_MS;
+- aponta queries repetidas (mesmo SQL com parâmetros diferentes, sinal de
+  N+1) a partir de DUPLICATE_QUERY_THRESHOLD execuções;
+- com REQUEST_PROFILE_DIR, roda o cProfile numa amostra das requisições
+  (REQUEST_PROFILE_SAMPLE_RATE) e grava o .prof das que passarem do limite.
+
+Desligado, o middleware levanta MiddlewareNotUsed e sai da cadeia: nenhum
+custo por requisição. Views assíncronas são executadas pelo adaptador do
+Django, já que as queries precisam rodar na thread da requisição para
+serem medidas.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def fingerprint(sql):
+    """SQL sem os valores: listas IN de qualquer tamanho viram uma só forma."""
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """execute_wrapper que acumula o tempo e o fingerprint de cada query."""
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.duration += elapsed
+            self.fingerprints[fingerprint(sql)] += 1
+            if elapsed >= self.slow_query_ms:
+                self.slow.append({'sql': sql, 'ms': round(elapsed, 2), 'alias': context['connection'].alias})
+
+    def duplicates(self, threshold):
+        return {sql: count for sql, count in self.fingerprints.items() if count >= threshold}
+
+
+class RequestInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_ms = settings.SLOW_REQUEST_MS
+        self.slow_query_ms = settings.SLOW_QUERY_MS
+        self.duplicate_threshold = settings.DUPLICATE_QUERY_THRESHOLD
+        self.profile_dir = settings.REQUEST_PROFILE_DIR
+        self.profile_rate = settings.REQUEST_PROFILE_SAMPLE_RATE
+
+    def __call__(self, request):
+        recorder = QueryRecorder(self.slow_query_ms)
+        profiler = None
+        if self.profile_dir and random.random() < self.profile_rate:
+            profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            if profiler:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+        total = (time.perf_counter() - start) * 1000
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={recorder.duration:.1f};desc="{recorder.count} queries"',
+            f'app;dur={max(total - recorder.duration, 0):.1f}',
+            f'total;dur={total:.1f}',
+        ])
+        self._log(request, response, recorder, total, profiler)
+        return response
+
+    def _log(self, request, response, recorder, total, profiler):
+        for query in recorder.slow:
+            logger.warning(json.dumps({'event': 'slow_query', 'path': request.path, **query}))
+        duplicates = recorder.duplicates(self.duplicate_threshold)
+        if total < self.slow_request_ms and not duplicates:
+            return
+        record = {
+            'event': 'slow_request' if total >= self.slow_request_ms else 'duplicate_queries',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(total, 2),
+            'db_ms': round(recorder.duration, 2),
+            'queries': recorder.count,
+            'duplicates': duplicates,
+        }
+        if profiler and total >= self.slow_request_ms:
+            record['profile'] = self._dump(profiler, request)
+        logger.warning(json.dumps(record))
+
+    def _dump(self, profiler, request):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r'[^\w-]+', '-', request.path).strip('-') or 'root'
+        path = os.path.join(self.profile_dir, f'{time.time_ns()}-{slug}.prof')
+        profiler.dump_stats(path)
+        return path
@@ -0,0 +1,50 @@
+import resource
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from core.seeding import SeedConfig, benchmark_database, seed
+from MealLog.export import CHUNK_SIZE, FORMATS, export_lines, history_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede tempo e pico de memória da exportação em streaming do histórico de um "
+        "usuário, comparando com a carga de todos os registros em memória."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=5)
+        parser.add_argument('--logs-per-day', type=int, default=8)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _measure(self, produce):
+        started = time.perf_counter()
+        size = sum(len(line) for line in produce() if isinstance(line, str))
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        for _ in produce():
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return size, elapsed, peak / 1024 / 1024
+
+    def handle(self, *args, **options):
+        config = SeedConfig(users=2, days=options['years'] * 365, logs_per_day=options['logs_per_day'],
+                            seed=options['seed'])
+        with benchmark_database():
+            user = seed(config)[0]
+            results = {
+                file_format: self._measure(lambda: export_lines(user, file_format, options['chunk_size']))
+                for file_format in FORMATS
+            }
+            results['lista em memória'] = self._measure(lambda: list(history_records(user, options['chunk_size'])))
+            records = sum(1 for _ in history_records(user))
+        self.stdout.write(f"{records} registros exportados por usuário.")
+        for name, (size, elapsed, peak) in results.items():
+            generated = f"{size / 1024 / 1024:8.1f} MiB gerados" if size else " " * 17
+            self.stdout.write(f"  {name:<17} {elapsed:6.2f}s  {generated}  pico Python {peak:7.1f} MiB")
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(f"Pico de RSS do processo (inclui a geração dos dados): {peak_rss:.0f} MiB")
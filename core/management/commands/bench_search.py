@@ -0,0 +1,85 @@
+import datetime
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.seeding import benchmark_database
+from MealLog.models import MealLog
+from MealLog.search import meal_log_index
+
+WORDS = [
+    'arroz', 'feijão', 'frango', 'grelhado', 'pão', 'queijo', 'ovo', 'tapioca', 'banana', 'maçã', 'iogurte',
+    'granola', 'batata-doce', 'carne', 'moída', 'salada', 'tomate', 'alface', 'café', 'leite', 'açaí', 'aveia',
+    'mamão', 'requeijão', 'presunto', 'cuscuz', 'macarrão', 'molho', 'brócolis', 'cenoura', 'peixe', 'tilápia',
+]
+
+TERMS = ('feijao', 'pão queijo', 'frang grelh', 'tilápia brócolis')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a busca do admin por icontains (LIKE) com o índice FTS5 de MealLog "
+        "num banco temporário com muitas linhas (padrão: 10⁶)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _populate(self, rows, seed):
+        rng = random.Random(seed)
+        start = timezone.make_aware(datetime.datetime(2020, 1, 1))
+        with transaction.atomic():
+            users = User.objects.bulk_create(User(username=f'perf-{i}') for i in range(20))
+            batch = []
+            for i in range(rows):
+                batch.append(MealLog(
+                    user=users[i % len(users)],
+                    name=' '.join(rng.sample(WORDS, 2)).capitalize(),
+                    description=' '.join(rng.sample(WORDS, 6)) if i % 3 == 0 else '',
+                    meal_type=MealLog.MealType.OTHER,
+                    consumed_at=start + datetime.timedelta(minutes=7 * i),
+                ))
+                if len(batch) == 10_000:
+                    MealLog.objects.bulk_create(batch)
+                    batch = []
+            MealLog.objects.bulk_create(batch)
+            meal_log_index.rebuild()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _time(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - started)
+        return result, statistics.median(timings) * 1000
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            started = time.perf_counter()
+            self._populate(options['rows'], options['seed'])
+            self.stdout.write(f"{options['rows']} registros criados e indexados em {time.perf_counter() - started:.1f}s.")
+            for term in TERMS:
+                like = Q()
+                for word in term.split():
+                    like &= (Q(name__icontains=word) | Q(description__icontains=word)
+                             | Q(user__username__icontains=word))
+                like_qs = MealLog.objects.filter(like)
+                fts_qs = meal_log_index.search(MealLog.objects.all(), term)
+                (like_count, _), like_ms = self._time(
+                    lambda: (like_qs.count(), list(like_qs.order_by('-consumed_at')[:100])), options['repeat'])
+                (fts_count, _), fts_ms = self._time(
+                    lambda: (fts_qs.count(), list(fts_qs[:100])), options['repeat'])
+                self.stdout.write(
+                    f"  {term!r:<20} LIKE {like_ms:8.1f} ms ({like_count} resultados)   "
+                    f"FTS5 {fts_ms:8.1f} ms ({fts_count} resultados)"
+                )
@@ -0,0 +1,115 @@
+import datetime
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from core.database import sqlite_databases
+from Diet.models import Diet
+from MealLog.models import MealLog
+
+PROFILES = {
+    # nome: (perfil de core.database, usa o alias somente leitura)
+    'basic': ('basic', False),
+    'tuned': ('tuned', False),
+    'tuned+replica': ('tuned', True),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga concorrente de leituras e escritas (várias threads, uma conexão por thread) "
+        "sobre um arquivo SQLite temporário em cada perfil de core.database, comparando "
+        "operações por segundo e erros de \"database is locked\"."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--profile', action='append', choices=tuple(PROFILES),
+                            help="Perfil a medir (pode repetir). Padrão: todos.")
+
+    def _configure(self, name, path):
+        profile, read_replica = PROFILES[name]
+        databases = sqlite_databases(path, profile=profile, read_replica=read_replica)
+        aliases = {}
+        for role, config in databases.items():
+            alias = f'bench-{name}-{role}'
+            connections.settings[alias] = connections.configure_settings({'default': config})['default']
+            aliases[role] = alias
+        return aliases['default'], aliases.get('replica', aliases['default'])
+
+    def _prepare(self, alias, users):
+        with connections[alias].schema_editor() as editor:
+            for model in (User, Diet, MealLog):
+                editor.create_model(model)
+        User.objects.using(alias).bulk_create(User(username=f'bench-{i}') for i in range(users))
+        return list(User.objects.using(alias).values_list('pk', flat=True))
+
+    def _worker(self, write_alias, read_alias, user_ids, deadline, write_ratio, totals, lock):
+        rng = random.Random(threading.get_ident())
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        while time.monotonic() < deadline:
+            user_id = rng.choice(user_ids)
+            try:
+                if rng.random() < write_ratio:
+                    # Lê e depois grava na mesma transação, como um save() do admin.
+                    with transaction.atomic(using=write_alias):
+                        MealLog.objects.using(write_alias).filter(user_id=user_id).count()
+                        # bulk_create não dispara os sinais de resumo, que usam o banco padrão.
+                        MealLog.objects.using(write_alias).bulk_create([MealLog(
+                            user_id=user_id, name=f'Carga {rng.random()}', meal_type=MealLog.MealType.OTHER,
+                            consumed_at=timezone.now() - datetime.timedelta(minutes=rng.randint(0, 10 ** 5)),
+                        )])
+                    counts['writes'] += 1
+                else:
+                    list(MealLog.objects.using(read_alias).filter(user_id=user_id)[:50])
+                    counts['reads'] += 1
+            except OperationalError as exc:
+                if 'locked' not in str(exc):
+                    raise
+                counts['locked'] += 1
+            # Fim da "requisição": fecha a conexão se CONN_MAX_AGE não permitir reaproveitá-la.
+            for alias in {write_alias, read_alias}:
+                connections[alias].close_if_unusable_or_obsolete()
+        for alias in {write_alias, read_alias}:
+            connections[alias].close()
+        with lock:
+            for key, value in counts.items():
+                totals[key] += value
+
+    def handle(self, *args, **options):
+        names = options['profile'] or list(PROFILES)
+        with tempfile.TemporaryDirectory() as directory:
+            for name in names:
+                write_alias, read_alias = self._configure(name, os.path.join(directory, f'{name}.sqlite3'))
+                user_ids = self._prepare(write_alias, options['users'])
+                totals = {'reads': 0, 'writes': 0, 'locked': 0}
+                lock = threading.Lock()
+                deadline = time.monotonic() + options['seconds']
+                threads = [
+                    threading.Thread(target=self._worker, args=(
+                        write_alias, read_alias, user_ids, deadline, options['write_ratio'], totals, lock,
+                    ))
+                    for _ in range(options['threads'])
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                for alias in {write_alias, read_alias}:
+                    connections[alias].close()
+                operations = totals['reads'] + totals['writes']
+                self.stdout.write(
+                    f"{name:<14} {operations / options['seconds']:8.0f} ops/s  "
+                    f"({totals['reads']} leituras, {totals['writes']} escritas, "
+                    f"{totals['locked']} erros de lock)"
+                )
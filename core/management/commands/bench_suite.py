@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.benchmarks import BenchmarkContext, benchmark_users, compare, run_suite
+from core.seeding import SeedConfig, benchmark_database, rebuild_derived, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede páginas do admin, busca e agregações (p50, p95 e queries) sobre dados gerados "
+        "por core.seeding e compara com um JSON de referência. Por padrão gera os dados num "
+        "banco temporário; com --existing usa o banco configurado (ex.: após seed_perf)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--existing', action='store_true',
+                            help="Usa os dados do banco configurado, sem alterá-lo.")
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--years', type=float, default=2)
+        parser.add_argument('--logs-per-day', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--only', action='append', help="Só cenários cujo nome contém o texto (pode repetir).")
+        parser.add_argument('--baseline', help="JSON de referência para comparar.")
+        parser.add_argument('--save-baseline', help="Grava os resultados neste JSON.")
+        parser.add_argument('--tolerance', type=float, default=1.25,
+                            help="Razão de p50 acima da qual um cenário é regressão.")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def _run(self, options):
+        # Nada do que os cenários gravam (ex.: o superusuário) sobrevive à execução.
+        with transaction.atomic():
+            admin_user, user = benchmark_users()
+            if user is None:
+                raise CommandError("Nenhum dado de benchmark no banco; rode seed_perf antes.")
+            results = run_suite(BenchmarkContext(admin_user, user), options['repeat'], options['only'])
+            transaction.set_rollback(True)
+        return results
+
+    def handle(self, *args, **options):
+        if options['existing']:
+            results = self._run(options)
+        else:
+            config = SeedConfig(users=options['users'], days=max(int(options['years'] * 365), 1),
+                                logs_per_day=options['logs_per_day'], seed=options['seed'])
+            with benchmark_database():
+                seed(config)
+                rebuild_derived(config)
+                results = self._run(options)
+
+        width = max(len(name) for name in results) if results else 0
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<{width}}  p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+                f"{result['queries']:3d} queries"
+            )
+
+        regressions = 0
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as stream:
+                baseline = json.load(stream)['results']
+            self.stdout.write(f"\nComparação com {options['baseline']}:")
+            for name, status, detail in compare(results, baseline, options['tolerance']):
+                style = {'regressão': self.style.ERROR, 'melhora': self.style.SUCCESS}.get(status, str)
+                self.stdout.write(f"  {name:<{width}}  {style(status):<10} {detail}")
+                regressions += status == 'regressão'
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w', encoding='utf-8') as stream:
+                json.dump({'options': {key: options[key] for key in ('users', 'years', 'logs_per_day', 'seed',
+                                                                      'repeat', 'existing')},
+                           'results': results}, stream, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Referência gravada em {options['save_baseline']}.")
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{regressions} cenário(s) mais lentos que a referência.")
@@ -0,0 +1,55 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from core.seeding import SeedConfig, benchmark_database, seed
+from MealLog.views import meal_log_timeline
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a latência da API de linha do tempo (paginação por cursor) em "
+        "várias profundidades de página, sobre um histórico de vários anos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=5)
+        parser.add_argument('--logs-per-day', type=int, default=6)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        config = SeedConfig(users=2, days=options['years'] * 365, logs_per_day=options['logs_per_day'],
+                            seed=options['seed'])
+        with benchmark_database():
+            user = seed(config)[0]
+            user = User.objects.get(pk=user.pk)
+            factory = RequestFactory()
+            cursor, page, timings = None, 0, {}
+            while True:
+                params = {'limit': options['page_size']}
+                if cursor:
+                    params['cursor'] = cursor
+                request = factory.get('/api/meal-logs/', params)
+                request.user = user
+                started = time.perf_counter()
+                response = meal_log_timeline(request)
+                timings[page] = time.perf_counter() - started
+                cursor = json.loads(response.content)['next_cursor']
+                page += 1
+                if not cursor:
+                    break
+        self.stdout.write(f"{page} páginas de {options['page_size']} registros.")
+        for depth in sorted({0, 1, 10, 100, page // 2, page - 1}):
+            if depth in timings:
+                self.stdout.write(f"  página {depth + 1:>5}: {timings[depth] * 1000:.2f} ms")
+        values = sorted(timings.values())
+        self.stdout.write(
+            f"mediana {statistics.median(values) * 1000:.2f} ms, "
+            f"p95 {values[int(len(values) * 0.95) - 1] * 1000:.2f} ms, "
+            f"máx {values[-1] * 1000:.2f} ms"
+        )
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.hot_queries import HOT_QUERIES, explain_hot_queries
+from core.seeding import SeedConfig, benchmark_database, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula um banco de teste isolado com volumes realistas e verifica, via "
+        "EXPLAIN QUERY PLAN, se as consultas mais frequentes usam índices."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--days', type=int, default=3 * 365)
+        parser.add_argument('--logs-per-day', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=20, help="Execuções cronometradas de cada consulta.")
+
+    def handle(self, *args, **options):
+        config = SeedConfig(
+            users=options['users'], days=options['days'], logs_per_day=options['logs_per_day'], seed=options['seed']
+        )
+        with benchmark_database():
+            started = time.perf_counter()
+            users = seed(config)
+            self.stdout.write(f"Dados gerados em {time.perf_counter() - started:.1f}s.")
+            user, date = users[0], config.end
+            failures = 0
+            for name, (plan, problems) in explain_hot_queries(user, date).items():
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    list(HOT_QUERIES[name](user, date)[:100])
+                    timings.append(time.perf_counter() - started)
+                timings.sort()
+                status = self.style.ERROR('FALHOU') if problems else self.style.SUCCESS('OK')
+                self.stdout.write(f"\n{name}: {status} (mediana {timings[len(timings) // 2] * 1000:.2f} ms)")
+                self.stdout.write(plan)
+                failures += bool(problems)
+        if failures:
+            raise CommandError(f"{failures} consulta(s) sem índice adequado.")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.date_buckets import registered_buckets
+
+
+class Command(BaseCommand):
+    help = "Recalcula as contagens mensais (DateBucket) dos campos registrados em core.date_buckets."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append',
+                            help="Restringe a um model, no formato app_label.model (pode repetir).")
+
+    def handle(self, *args, **options):
+        wanted = {label.lower() for label in options['model'] or []}
+        for buckets in registered_buckets():
+            if wanted and buckets.label.lower() not in wanted:
+                continue
+            count = buckets.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"{buckets.label}.{buckets.field}: {count} meses."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.search import registered_indexes
+
+
+class Command(BaseCommand):
+    help = "Reconstrói as tabelas de busca textual (FTS5) a partir dos models registrados em core.search."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append',
+                            help="Restringe a um model, no formato app_label.model (pode repetir).")
+
+    def handle(self, *args, **options):
+        wanted = {label.lower() for label in options['model'] or []}
+        for index in registered_indexes():
+            label = index.model._meta.label_lower
+            if wanted and label.lower() not in wanted:
+                continue
+            with transaction.atomic():
+                count = index.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"{label}: {count} objetos indexados em {index.table}."))
@@ -0,0 +1,58 @@
+import datetime
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seeding import SeedConfig, rebuild_derived, seed
+from Diet.models import Diet
+from MealLog.models import MealLog, PlannedMeal
+from MealPrep.models import MealPrep, MealPrepComponent
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera dados sintéticos no banco configurado (usuários, dietas, refeições planejadas, "
+        "anos de registros de refeição, marmitas e porções) a partir de uma semente fixa, "
+        "e recalcula as tabelas derivadas. Os mesmos parâmetros geram sempre os mesmos dados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--years', type=float, default=3)
+        parser.add_argument('--logs-per-day', type=int, default=5)
+        parser.add_argument('--preps-per-day', type=int, default=2, choices=(1, 2))
+        parser.add_argument('--components', type=int, default=40)
+        parser.add_argument('--diets-per-user', type=int, default=3)
+        parser.add_argument('--planned-per-diet', type=int, default=4)
+        parser.add_argument('--end', type=datetime.date.fromisoformat, default=SeedConfig.end,
+                            help="Último dia gerado (AAAA-MM-DD).")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--skip-derived', action='store_true',
+                            help="Não recalcula resumos, índices de busca e contagens mensais.")
+
+    def handle(self, *args, **options):
+        config = SeedConfig(
+            users=options['users'],
+            days=max(int(options['years'] * 365), 1),
+            logs_per_day=options['logs_per_day'],
+            preps_per_day=options['preps_per_day'],
+            components=options['components'],
+            diets_per_user=options['diets_per_user'],
+            planned_per_diet=options['planned_per_diet'],
+            end=options['end'],
+            seed=options['seed'],
+        )
+        if config.diets_per_user < 1 or config.users < 1:
+            raise CommandError("--users e --diets-per-user precisam ser positivos.")
+        if User.objects.filter(username__startswith=f"perf-{config.seed}-").exists():
+            raise CommandError(f"Já existem dados gerados com a semente {config.seed}; use outra --seed.")
+        started = time.perf_counter()
+        seed(config)
+        self.stdout.write(f"Dados gerados em {time.perf_counter() - started:.1f}s.")
+        if not options['skip_derived']:
+            started = time.perf_counter()
+            rebuild_derived(config)
+            self.stdout.write(f"Tabelas derivadas recalculadas em {time.perf_counter() - started:.1f}s.")
+        for model in (Diet, PlannedMeal, MealLog, MealPrep, MealPrepComponent):
+            self.stdout.write(f"  {model._meta.verbose_name_plural}: {model.objects.count()}")
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DateBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='Model')),
+                ('field', models.CharField(max_length=100, verbose_name='Campo')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Ano')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Mês')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+            ],
+            options={
+                'verbose_name': 'Contagem Mensal',
+                'verbose_name_plural': 'Contagens Mensais',
+                'constraints': [models.UniqueConstraint(fields=('model', 'field', 'year', 'month'), name='datebucket_unique_month')],
+            },
+        ),
+    ]
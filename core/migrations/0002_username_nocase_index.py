@@ -0,0 +1,19 @@
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # auth.User não é nosso: o índice do autocomplete por prefixo (core.autocomplete) vai em SQL.
+        migrations.RunSQL(
+            sql=['CREATE INDEX auth_user_username_nocase_idx ON auth_user (username COLLATE NOCASE)'],
+            reverse_sql=['DROP INDEX auth_user_username_nocase_idx'],
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class DateBucket(models.Model):
+    """
+    Quantidade de objetos por mês num campo de data de um model, mantida por
+    core.date_buckets. Alimenta o date_hierarchy do admin sem agregar a
+    tabela principal.
+    """
+    model = models.CharField(max_length=100, verbose_name='Model')
+    field = models.CharField(max_length=100, verbose_name='Campo')
+    year = models.PositiveSmallIntegerField(verbose_name='Ano')
+    month = models.PositiveSmallIntegerField(verbose_name='Mês')
+    count = models.IntegerField(default=0, verbose_name='Quantidade')
+
+    class Meta:
+        verbose_name = 'Contagem Mensal'
+        verbose_name_plural = 'Contagens Mensais'
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'field', 'year', 'month'], name='datebucket_unique_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.model}.{self.field} {self.year}-{self.month:02d}: {self.count}"
@@ -0,0 +1,155 @@
+"""
+Busca textual com tabelas FTS5 do SQLite.
+
+Cada model pesquisável tem uma tabela virtual FTS5 própria (criada na
+migração do app), cujo rowid é o pk do objeto e cujas colunas são os campos
+indexados. O tokenizer unicode61 com remove_diacritics ignora acentos, então
+"feijao" encontra "Feijão"; os resultados são ordenados por bm25.
+
+Os apps registram seus índices com register() no ready(); os sinais
+post_save/post_delete mantêm as tabelas em dia dentro da mesma transação.
+Gravações em lote (bulk_create, update) precisam chamar index.update_queryset()
+ou o comando rebuild_search_index.
+"""
+import re
+
+from django.contrib.admin.views.main import ORDER_VAR
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save, pre_save
+
+CHUNK_SIZE = 2000
+
+TOKEN_RE = re.compile(r'\w+')
+
+_registry = {}
+
+
+def match_query(term):
+    """Converte o texto digitado numa consulta FTS5: todas as palavras, por prefixo."""
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(term))
+
+
+class SearchIndex:
+    def __init__(self, model, table, fields, weights=None, related=None):
+        self.model = model
+        self.table = table
+        # coluna da tabela FTS -> caminho no model (aceita relações, ex.: 'user__username')
+        self.fields = dict(fields)
+        self.weights = weights or [1.0] * len(self.fields)
+        # model relacionado -> (lookup que leva dele aos objetos indexados, campos dele que são indexados)
+        self.related = related or {}
+
+    def update_queryset(self, queryset):
+        """(Re)indexa os objetos do queryset; retorna quantos foram gravados."""
+        columns = ', '.join(self.fields)
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 1))
+        sql = f'INSERT OR REPLACE INTO {self.table} (rowid, {columns}) VALUES ({placeholders})'
+        rows = queryset.order_by().values_list('pk', *self.fields.values()).iterator(chunk_size=CHUNK_SIZE)
+        count = 0
+        batch = []
+        with connection.cursor() as cursor:
+            for row in rows:
+                batch.append([value if value is not None else '' for value in row])
+                if len(batch) >= CHUNK_SIZE:
+                    cursor.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def delete(self, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [[pk] for pk in pks])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        count = self.update_queryset(self.model._default_manager.all())
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return count
+
+    def filter(self, queryset, term):
+        """Restringe o queryset aos objetos que casam com `term`, sem ordenar."""
+        query = match_query(term)
+        if not query:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [query]))
+
+    def search(self, queryset, term):
+        """Como filter(), anotando `search_rank` (bm25; menor é melhor) e ordenando por ele."""
+        query = match_query(term)
+        if not query:
+            return queryset.none()
+        model_table = connection.ops.quote_name(self.model._meta.db_table)
+        pk_column = connection.ops.quote_name(self.model._meta.pk.column)
+        weights = ', '.join(str(float(weight)) for weight in self.weights)
+        # O MATCH amplo roda uma vez, em filter(); o rank de cada resultado vem
+        # de um MATCH restrito ao rowid, que o FTS5 resolve sem varrer o índice.
+        rank = RawSQL(
+            f'SELECT bm25({self.table}, {weights}) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND {self.table}.rowid = {model_table}.{pk_column}',
+            [query],
+        )
+        return self.filter(queryset, term).annotate(search_rank=rank).order_by('search_rank', '-pk')
+
+    def _saved(self, sender, instance, **kwargs):
+        self.update_queryset(self.model._default_manager.filter(pk=instance.pk))
+
+    def _deleted(self, sender, instance, **kwargs):
+        self.delete([instance.pk])
+
+    def _related_pre_save(self, sender, instance, **kwargs):
+        _, watched = self.related[sender]
+        instance._search_old_values = sender._default_manager.filter(
+            pk=instance.pk
+        ).values_list(*watched).first() if instance.pk else None
+
+    def _related_saved(self, sender, instance, created, **kwargs):
+        lookup, watched = self.related[sender]
+        old_values = getattr(instance, '_search_old_values', None)
+        if created or old_values == tuple(getattr(instance, name) for name in watched):
+            return
+        self.update_queryset(self.model._default_manager.filter(**{lookup: instance}))
+
+
+def register(model, table, fields, weights=None, related=None):
+    """Registra o índice do model e conecta os sinais que o mantêm atualizado."""
+    index = SearchIndex(model, table, fields, weights, related)
+    _registry[model] = index
+    uid = f'search-index-{table}'
+    post_save.connect(index._saved, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(index._deleted, sender=model, weak=False, dispatch_uid=uid)
+    for related_model in index.related:
+        pre_save.connect(index._related_pre_save, sender=related_model, weak=False, dispatch_uid=f'{uid}-related')
+        post_save.connect(index._related_saved, sender=related_model, weak=False, dispatch_uid=f'{uid}-related')
+    return index
+
+
+def index_for(model):
+    return _registry.get(model)
+
+
+def registered_indexes():
+    return list(_registry.values())
+
+
+class FullTextSearchMixin:
+    """
+    Mixin de ModelAdmin: a caixa de busca usa o índice FTS5 do model em vez de
+    icontains sobre search_fields. Sem ordenação escolhida na lista, os
+    resultados vêm por relevância.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        index = index_for(self.model)
+        if index is None or not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        results = index.search(queryset, search_term)
+        if request.GET.get(ORDER_VAR):
+            # A ChangeList já ordenou pela coluna escolhida; o rank só desempata.
+            results = results.order_by(*queryset.query.order_by, 'search_rank')
+        return results, False
@@ -0,0 +1,180 @@
+"""
+Geração de dados sintéticos para benchmarks.
+
+Tudo é derivado de um random.Random(seed), então o mesmo conjunto de
+parâmetros gera sempre os mesmos dados. As linhas são gravadas com
+bulk_create, sem disparar sinais; chame rebuild_derived() depois se os
+resumos, índices de busca e contagens mensais forem necessários.
+"""
+import datetime
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from Diet.models import Diet
+from MealLog.adherence import refresh_weekly_adherence
+from MealLog.fields import mask_from_days
+from MealLog.models import MealLog, PlannedMeal
+from MealLog.rollups import rebuild_daily_nutrition
+from MealPrep.models import MealComponent, MealPrep, MealPrepComponent
+from .date_buckets import registered_buckets
+from .search import registered_indexes
+
+BATCH_SIZE = 2000
+
+COMPONENT_NAMES = {
+    MealComponent.ComponentType.PROTEIN: ['Frango grelhado', 'Bife de patinho', 'Tilápia assada', 'Ovos mexidos', 'Carne moída'],
+    MealComponent.ComponentType.CARBOHYDRATE: ['Arroz branco', 'Arroz integral', 'Batata-doce', 'Macarrão', 'Mandioca'],
+    MealComponent.ComponentType.VEGETABLE: ['Brócolis', 'Cenoura', 'Abobrinha', 'Feijão', 'Salada verde'],
+    MealComponent.ComponentType.SAUCE: ['Molho de tomate', 'Molho branco'],
+}
+
+PLANNED_MEALS = [
+    ('Café planejado', MealLog.MealType.BREAKFAST),
+    ('Ceia planejada', MealLog.MealType.SUPPER),
+    ('Lanche planejado', MealLog.MealType.AFTERNOON_SNACK),
+    ('Almoço planejado', MealLog.MealType.LUNCH),
+    ('Janta planejada', MealLog.MealType.DINNER),
+    ('Lanche da manhã planejado', MealLog.MealType.MORNING_SNACK),
+]
+
+MEAL_NAMES = ['Pão com ovo', 'Iogurte com granola', 'Fruta', 'Vitamina', 'Sanduíche natural', 'Tapioca', 'Pudim']
+
+
+@dataclass
+class SeedConfig:
+    users: int = 5
+    days: int = 365
+    logs_per_day: int = 4
+    preps_per_day: int = 2
+    components: int = 20
+    diets_per_user: int = 2
+    planned_per_diet: int = 2
+    end: datetime.date = datetime.date(2025, 12, 31)
+    seed: int = 42
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """Cria um banco de teste isolado (como o test runner) e o remove ao final."""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+def _bulk(model, rows):
+    return model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+def seed(config=None):
+    """Popula o banco com usuários, dietas, marmitas e registros de refeição."""
+    config = config or SeedConfig()
+    rng = random.Random(config.seed)
+    start = config.end - datetime.timedelta(days=config.days - 1)
+    days = [start + datetime.timedelta(days=offset) for offset in range(config.days)]
+
+    with transaction.atomic():
+        users = _bulk(User, [User(username=f'perf-{config.seed}-{i}') for i in range(config.users)])
+
+        # O período é dividido em diets_per_user dietas consecutivas; a última não tem fim.
+        length = max(config.days // config.diets_per_user, 1)
+        diets = []
+        for user in users:
+            for n in range(config.diets_per_user):
+                diet_start = start + datetime.timedelta(days=n * length)
+                last = n == config.diets_per_user - 1
+                diets.append(Diet(
+                    user=user,
+                    name='Dieta atual' if last else f'Dieta {n + 1}',
+                    start_date=diet_start,
+                    end_date=None if last else diet_start + datetime.timedelta(days=length - 1),
+                ))
+        diets = _bulk(Diet, diets)
+        _bulk(PlannedMeal, [
+            PlannedMeal(diet=diet, name=name, meal_type=meal_type, days_of_week=mask_from_days(rng.sample(range(7), 5)))
+            for diet in diets
+            for name, meal_type in PLANNED_MEALS[:config.planned_per_diet]
+        ])
+
+        catalog = [(kind, name) for kind, names in COMPONENT_NAMES.items() for name in names]
+        components = []
+        for i in range(config.components):
+            kind, name = catalog[i % len(catalog)]
+            components.append(MealComponent(
+                name=name if i < len(catalog) else f'{name} {i}',
+                component_type=kind,
+                calories_per_serving=rng.randint(1, 4),
+            ))
+        components = _bulk(MealComponent, components)
+
+        preps = _bulk(MealPrep, [
+            MealPrep(
+                name=f'Marmita {day:%d/%m}',
+                target_date=day,
+                meal_type=meal_type,
+                quantity=len(users),
+                is_prepared=day < config.end,
+                prepared_on=day - datetime.timedelta(days=1) if day < config.end else None,
+            )
+            for day in days
+            for meal_type in (MealPrep.MealType.LUNCH, MealPrep.MealType.DINNER)[:config.preps_per_day]
+        ])
+        through = MealPrep.intended_for.through
+        _bulk(through, [through(mealprep_id=prep.pk, user_id=user.pk) for prep in preps for user in users])
+        _bulk(MealPrepComponent, [
+            MealPrepComponent(meal_prep=prep, component=component, user=user, quantity=rng.randint(80, 250))
+            for prep in preps
+            for component in rng.sample(components, 3)
+            for user in users
+        ])
+
+        diet_for = {}
+        for diet in diets:
+            diet_for.setdefault(diet.user_id, []).append(diet)
+        logs = []
+        meal_types = list(MealLog.MealType)
+        for user in users:
+            for day in days:
+                diet = next(d for d in diet_for[user.pk] if d.start_date <= day and (d.end_date is None or d.end_date >= day))
+                for slot in range(config.logs_per_day):
+                    meal_type = meal_types[slot % len(meal_types)]
+                    consumed_at = timezone.make_aware(datetime.datetime.combine(
+                        day, datetime.time(7 + slot * 14 // max(config.logs_per_day, 1), rng.randint(0, 59))
+                    ))
+                    logs.append(MealLog(
+                        user=user,
+                        diet=diet,
+                        name=rng.choice(MEAL_NAMES),
+                        meal_type=meal_type,
+                        consumed_at=consumed_at,
+                        is_planned=rng.random() < 0.6,
+                        is_dessert=rng.random() < 0.1,
+                    ))
+                if len(logs) >= BATCH_SIZE * 5:
+                    _bulk(MealLog, logs)
+                    logs = []
+        _bulk(MealLog, logs)
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return users
+
+
+def rebuild_derived(config):
+    """Recalcula as tabelas mantidas por sinais, que o seed() não dispara."""
+    for buckets in registered_buckets():
+        buckets.rebuild()
+    with transaction.atomic():
+        for index in registered_indexes():
+            index.rebuild()
+    rebuild_daily_nutrition()
+    refresh_weekly_adherence(config.end - datetime.timedelta(days=config.days - 1), config.end)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
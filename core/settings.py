@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+from core.database import sqlite_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,12 +28,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'core',
     'Diet',
     'MealLog',
     'MealPrep',
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,12 +68,17 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# Perfis em core.database: "basic" (padrão, SQLite como o Django o configura) ou
+# "tuned" (WAL, PRAGMAs, conexões persistentes), escolhido com DB_PROFILE=tuned.
+# Com "tuned", DB_READ_REPLICA=1 cria o alias "replica", somente leitura, usado pelo ReadReplicaRouter.
+
+DATABASES = sqlite_databases(
+    BASE_DIR / 'db.sqlite3',
+    profile=os.environ.get('DB_PROFILE', 'basic'),
+    read_replica=os.environ.get('DB_READ_REPLICA') == '1',
+)
+
+DATABASE_ROUTERS = ['core.database.ReadReplicaRouter']
 
 
 # Password validation
@@ -114,3 +124,86 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Uploads acima deste tamanho vão para um arquivo temporário em vez da memória.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+
+# Caches. O painel diário (MealLog.dashboard) usa o alias "dashboard": memória local,
+# descartando os menos usados além de MAX_ENTRIES, ou arquivos com DASHBOARD_CACHE_DIR.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'dashboard': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dashboard',
+        'TIMEOUT': 24 * 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'production_sheet': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'production_sheet',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 500},
+    },
+}
+
+if os.environ.get('DASHBOARD_CACHE_DIR'):
+    CACHES['dashboard'].update({
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['DASHBOARD_CACHE_DIR'],
+    })
+
+# Com vários processos, a geração trocada por um precisa valer para todos: use arquivos.
+if os.environ.get('PRODUCTION_SHEET_CACHE_DIR'):
+    CACHES['production_sheet'].update({
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['PRODUCTION_SHEET_CACHE_DIR'],
+    })
+
+# Background tasks (core.background)
+
+BACKGROUND_WORKERS = 2
+
+BACKGROUND_TASKS_EAGER = False
+
+# Ingestão assíncrona de MealLog (MealLog.ingest): janela, em segundos, e tamanho máximo de cada lote.
+
+MEAL_LOG_INGEST_WINDOW = 0.05
+
+MEAL_LOG_INGEST_MAX_BATCH = 500
+
+# Arquivamento de MealLog (MealLog.archive): meses inteiros mais antigos que o horizonte, em dias,
+# vão para arquivos .jsonl.gz nesta pasta.
+
+MEAL_LOG_ARCHIVE_AFTER_DAYS = int(os.environ.get('MEAL_LOG_ARCHIVE_AFTER_DAYS', 730))
+
+MEAL_LOG_ARCHIVE_DIR = os.environ.get('MEAL_LOG_ARCHIVE_DIR', BASE_DIR / 'archive')
+
+# Instrumentação por requisição (core.instrumentation). Desligada, o middleware sai da cadeia.
+
+REQUEST_INSTRUMENTATION = os.environ.get('REQUEST_INSTRUMENTATION') == '1'
+
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+
+SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 100))
+
+DUPLICATE_QUERY_THRESHOLD = 5
+
+# cProfile opcional: fração das requisições perfiladas e pasta dos .prof das que passarem de SLOW_REQUEST_MS.
+
+REQUEST_PROFILE_DIR = os.environ.get('REQUEST_PROFILE_DIR')
+
+REQUEST_PROFILE_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILE_SAMPLE_RATE', 0.1))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.instrumentation': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
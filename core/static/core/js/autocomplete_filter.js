@@ -0,0 +1,19 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Escolher (ou limpar) um objeto no filtro recarrega a lista com o parâmetro, a partir da primeira página.
+    $(function() {
+        $('.autocomplete-filter select').on('change', function() {
+            const params = new URLSearchParams(window.location.search);
+            params.delete('p');
+            params.delete(this.name.replace(/__[^_]+__exact$/, '__isnull'));
+            if (this.value) {
+                params.set(this.name, this.value);
+            } else {
+                params.delete(this.name);
+            }
+            window.location.search = params.toString();
+        });
+    });
+}
@@ -0,0 +1,31 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Grava cada arquivo como <diretório>/<hash[:2]>/<sha256><extensão>.
+
+    O hash é calculado lendo o upload em pedaços (File.chunks), sem carregar o
+    arquivo inteiro em memória. Se o mesmo conteúdo já foi gravado, nada é
+    escrito e o nome existente é reaproveitado.
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        name = os.path.join(directory, digest[:2], f'{digest}{extension}')
+        if self.exists(name):
+            return name.replace('\\', '/')
+        return super().save(name, content, max_length)
+
+
+def content_addressed_storage():
+    return ContentAddressedStorage()
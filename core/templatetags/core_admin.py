@@ -0,0 +1,54 @@
+import datetime
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy, pagination
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+from core.date_buckets import buckets_for
+
+register = template.Library()
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def bucket_date_hierarchy(cl):
+    """
+    Como o date_hierarchy do admin, mas os anos e meses vêm de DateBucket.
+    Com ano e mês escolhidos (consulta já limitada ao mês) usa o padrão.
+    """
+    buckets = buckets_for(cl.model, cl.date_hierarchy)
+    year_field = f'{cl.date_hierarchy}__year'
+    month_field = f'{cl.date_hierarchy}__month'
+    year_lookup = cl.params.get(year_field)
+    if buckets is None or (year_lookup and cl.params.get(month_field)):
+        return date_hierarchy(cl)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f'{cl.date_hierarchy}__'])
+
+    if not year_lookup:
+        years = buckets.years()
+        if len(years) != 1:
+            return {
+                'show': True,
+                'back': None,
+                'choices': [{'link': link({year_field: str(year)}), 'title': str(year)} for year in years],
+            }
+        year_lookup = years[0]
+    return {
+        'show': True,
+        'back': {'link': link({}), 'title': _('All dates')},
+        'choices': [
+            {
+                'link': link({year_field: year_lookup, month_field: month}),
+                'title': capfirst(formats.date_format(datetime.date(int(year_lookup), month, 1), 'YEAR_MONTH_FORMAT')),
+            }
+            for month in buckets.months(int(year_lookup))
+        ],
+    }
+
+
+@register.inclusion_tag('admin/core/pagination.html')
+def capped_pagination(cl):
+    return pagination(cl)
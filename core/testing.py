@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Helpers para TestCases que garantem que as páginas do admin respeitam
+    um orçamento de queries, independentemente da quantidade de linhas.
+    """
+
+    def create_admin_user(self):
+        return User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), ctx
+
+    def assertQueryBudget(self, url, budget, grow):
+        """
+        Renderiza `url`, chama `grow()` para adicionar mais linhas e renderiza
+        de novo. Falha se alguma renderização passar de `budget` queries ou se
+        o número de queries crescer junto com os dados (N+1).
+        """
+        before, _ = self.count_queries(url)
+        grow()
+        after, ctx = self.count_queries(url)
+        queries = '\n'.join(q['sql'] for q in ctx.captured_queries)
+        self.assertLessEqual(
+            after, budget,
+            f"{url} executou {after} queries (orçamento: {budget}):\n{queries}"
+        )
+        self.assertEqual(
+            before, after,
+            f"{url} executou {before} queries antes e {after} depois de adicionar linhas:\n{queries}"
+        )
@@ -0,0 +1,333 @@
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.core.paginator import EmptyPage
+from django.db import OperationalError, connection, connections
+from django.db.utils import load_backend
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from MealLog.models import MealLog
+from MealLog.signals import meal_logs_created
+from Diet.models import Diet
+from MealPrep.models import MealComponent
+from .autocomplete import autocomplete_for, prefix_filter
+from .changelist import CappedCountPaginator
+from .database import ReadReplicaRouter, sqlite_databases
+from .date_buckets import buckets_for
+from .hot_queries import explain_hot_queries, plan_problems
+from .benchmarks import BenchmarkContext, benchmark_users, compare, run_suite
+from .instrumentation import RequestInstrumentationMiddleware, fingerprint
+from .search import index_for
+from .seeding import SeedConfig, rebuild_derived, seed
+
+
+class HotQueryPlanTests(TestCase):
+    def test_plan_problems(self):
+        self.assertEqual(plan_problems('3 0 0 SCAN MealLog_meallog USING INDEX meallog_consumed_idx'), [])
+        self.assertEqual(
+            plan_problems('3 0 0 SCAN MealLog_meallog\n10 0 0 USE TEMP B-TREE FOR ORDER BY'),
+            ['SCAN MealLog_meallog', 'USE TEMP B-TREE FOR ORDER BY']
+        )
+
+    def test_hot_queries_use_indexes(self):
+        config = SeedConfig(users=3, days=60, logs_per_day=3)
+        users = seed(config)
+        for name, (plan, problems) in explain_hot_queries(users[0], config.end).items():
+            with self.subTest(name):
+                self.assertEqual(problems, [], plan)
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    def connect(self, config):
+        config = connections.configure_settings({'default': config})['default']
+        wrapper = load_backend(config['ENGINE']).DatabaseWrapper(config, 'profile-test')
+        self.addCleanup(wrapper.close)
+        return wrapper.cursor()
+
+    def test_tuned_profile_applies_pragmas(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        databases = sqlite_databases(os.path.join(directory.name, 'db.sqlite3'), profile='tuned', read_replica=True)
+        self.assertEqual(databases['default']['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        cursor = self.connect(databases['default'])
+        self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(cursor.execute('PRAGMA busy_timeout').fetchone()[0], 20000)
+        self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)  # NORMAL
+        cursor.execute('CREATE TABLE t (id integer)')
+
+        replica = self.connect(databases['replica'])
+        self.assertEqual(replica.execute('SELECT count(*) FROM t').fetchone()[0], 0)
+        with self.assertRaises(OperationalError):
+            replica.execute('INSERT INTO t VALUES (1)')
+
+    def test_basic_profile_is_plain(self):
+        self.assertEqual(sqlite_databases('db.sqlite3', profile='basic'), {
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'db.sqlite3'},
+        })
+
+
+class ReadReplicaRouterTests(SimpleTestCase):
+    def test_reads_go_to_the_replica_outside_transactions(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_read(None), 'default')  # sem o alias "replica"
+        with mock.patch('core.database.settings', SimpleNamespace(DATABASES={'default': {}, 'replica': {}})):
+            self.assertEqual(router.db_for_read(None), 'replica')
+            with mock.patch.object(connections['default'], 'in_atomic_block', True):
+                self.assertEqual(router.db_for_read(None), 'default')
+        self.assertEqual(router.db_for_write(None), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'MealLog'))
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        self.beans = MealComponent.objects.create(name='Feijão tropeiro', component_type='VEGETABLE',
+                                                  description='Com bacon')
+        self.rice = MealComponent.objects.create(name='Arroz', component_type='CARBOHYDRATE',
+                                                 description='Acompanha feijão')
+
+    def search(self, model, term):
+        return list(index_for(model).search(model.objects.all(), term))
+
+    def test_accents_prefixes_and_ranking(self):
+        # Casar no nome pesa mais que na descrição.
+        self.assertEqual(self.search(MealComponent, 'feijao'), [self.beans, self.rice])
+        self.assertEqual(self.search(MealComponent, 'FEIJ trop'), [self.beans])
+        self.assertEqual(self.search(MealComponent, '"*'), [])
+
+    def test_signals_keep_the_index_in_sync(self):
+        self.beans.name = 'Feijoada'
+        self.beans.save()
+        self.assertEqual(self.search(MealComponent, 'tropeiro'), [])
+        self.rice.delete()
+        self.assertEqual(self.search(MealComponent, 'feijao'), [])
+
+        log = MealLog.objects.create(user=self.user, name='Pão de queijo', meal_type='OTHER')
+        self.assertEqual(self.search(MealLog, 'ana'), [log])
+        self.user.username = 'bia'
+        self.user.save()
+        self.assertEqual(self.search(MealLog, 'bia pao'), [log])
+
+    def test_rebuild_command_and_admin_search(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM mealcomponent_fts')
+        self.assertEqual(self.search(MealComponent, 'arroz'), [])
+        call_command('rebuild_search_index', '--model=MealPrep.mealcomponent', stdout=StringIO())
+        self.assertEqual(self.search(MealComponent, 'arroz'), [self.rice])
+
+        self.client.force_login(User.objects.create_superuser('admin'))
+        response = self.client.get('/admin/MealPrep/mealcomponent/', {'q': 'feijao'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.beans, self.rice])
+        response = self.client.get('/admin/MealPrep/mealcomponent/', {'q': 'feijao', 'o': '2'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.rice, self.beans])
+
+
+class DateBucketTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        self.buckets = buckets_for(MealLog, 'consumed_at')
+
+    def log(self, year, month, day=10):
+        return MealLog.objects.create(user=self.user, name='Lanche', meal_type='OTHER',
+                                      consumed_at=timezone.make_aware(datetime.datetime(year, month, day, 12)))
+
+    def months(self):
+        return {year: self.buckets.months(year) for year in self.buckets.years()}
+
+    def test_signals_keep_the_counts(self):
+        log = self.log(2024, 3)
+        self.log(2025, 1)
+        self.assertEqual(self.months(), {2024: [3], 2025: [1]})
+        log.consumed_at = timezone.make_aware(datetime.datetime(2025, 2, 1, 12))
+        log.save()
+        self.assertEqual(self.months(), {2025: [1, 2]})
+        log.delete()
+        self.assertEqual(self.months(), {2025: [1]})
+
+        logs = [MealLog(user=self.user, name='Lote', meal_type='OTHER',
+                        consumed_at=timezone.make_aware(datetime.datetime(2023, 7, day, 12))) for day in (1, 2)]
+        MealLog.objects.bulk_create(logs)
+        meal_logs_created.send(sender=MealLog, logs=logs)
+        self.assertEqual(self.months(), {2023: [7], 2025: [1]})
+
+    def test_rebuild_command(self):
+        self.log(2024, 3)
+        MealLog.objects.bulk_create([MealLog(user=self.user, name='Sem sinal', meal_type='OTHER',
+                                             consumed_at=timezone.make_aware(datetime.datetime(2022, 5, 1, 12)))])
+        call_command('rebuild_date_buckets', '--model=MealLog.meallog', stdout=StringIO())
+        self.assertEqual(self.months(), {2022: [5], 2024: [3]})
+
+    def test_admin_hierarchy_reads_the_buckets(self):
+        self.log(2024, 3)
+        self.log(2024, 5)
+        self.log(2025, 1)
+        self.client.force_login(User.objects.create_superuser('admin'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/admin/MealLog/meallog/')
+        self.assertContains(response, 'consumed_at__year=2024')
+        self.assertContains(response, 'consumed_at__year=2025')
+        # Nem MIN/MAX nem datas distintas sobre a tabela de registros.
+        self.assertFalse([
+            q['sql'] for q in ctx.captured_queries
+            if 'MealLog_meallog' in q['sql'] and ('MIN(' in q['sql'] or 'DISTINCT' in q['sql'])
+        ])
+
+        response = self.client.get('/admin/MealLog/meallog/', {'consumed_at__year': '2024'})
+        self.assertContains(response, 'consumed_at__month=5')
+        self.assertNotContains(response, 'consumed_at__month=1&')
+
+
+class CappedCountPaginatorTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('ana')
+        MealLog.objects.bulk_create(
+            MealLog(user=user, name=f'Registro {i}', meal_type='OTHER') for i in range(30)
+        )
+
+    def test_counts_up_to_the_limit(self):
+        paginator = CappedCountPaginator(MealLog.objects.order_by('pk'), 10)
+        paginator.count_limit = 50
+        self.assertEqual((paginator.count, paginator.num_pages, paginator.estimated), (30, 3, False))
+
+    def test_estimates_above_the_limit(self):
+        paginator = CappedCountPaginator(MealLog.objects.order_by('pk'), 10)
+        paginator.count_limit = 20
+        self.assertEqual((paginator.count, paginator.estimated), (30, True))  # maior pk, sem ANALYZE
+
+        filtered = CappedCountPaginator(MealLog.objects.filter(name__startswith='Registro'), 10)
+        filtered.count_limit = 20
+        self.assertEqual(filtered.count, 20)
+        self.assertTrue(filtered.estimated)
+        # Páginas além da estimativa não são erro.
+        self.assertEqual(len(filtered.page(3).object_list), 10)
+        self.assertEqual(len(filtered.page(4).object_list), 0)
+        with self.assertRaises(EmptyPage):
+            filtered.page(0)
+
+    def test_changelist_pages_beyond_a_filtered_estimate(self):
+        self.client.force_login(User.objects.create_superuser('admin'))
+        model_admin = admin.site._registry[MealLog]
+        with mock.patch.object(CappedCountPaginator, 'count_limit', 20), \
+                mock.patch.object(model_admin, 'list_per_page', 10):
+            response = self.client.get('/admin/MealLog/meallog/', {'meal_type__exact': 'OTHER', 'p': '3'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 10)
+
+
+@override_settings(REQUEST_INSTRUMENTATION=True, SLOW_REQUEST_MS=10 ** 6, SLOW_QUERY_MS=10 ** 6,
+                   DUPLICATE_QUERY_THRESHOLD=3, REQUEST_PROFILE_DIR=None)
+class RequestInstrumentationTests(TestCase):
+    def middleware(self, queries):
+        def view(request):
+            for pk in range(queries):
+                list(User.objects.filter(pk=pk))
+            return HttpResponse()
+        return RequestInstrumentationMiddleware(view)
+
+    def test_disabled_middleware_leaves_the_chain(self):
+        with self.settings(REQUEST_INSTRUMENTATION=False), self.assertRaises(MiddlewareNotUsed):
+            RequestInstrumentationMiddleware(lambda request: HttpResponse())
+
+    def test_server_timing_and_duplicate_queries(self):
+        self.assertEqual(fingerprint('SELECT 1 WHERE id IN (%s, %s, %s)'), 'SELECT 1 WHERE id IN (...)')
+        response = self.middleware(2)(RequestFactory().get('/'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="2 queries", app;dur=[\d.]+, total;dur=')
+
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            self.middleware(3)(RequestFactory().get('/lista/'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['event'], record['path'], record['queries']), ('duplicate_queries', '/lista/', 3))
+        self.assertEqual(list(record['duplicates'].values()), [3])
+
+    def test_slow_requests_are_logged_and_profiled(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(
+            SLOW_REQUEST_MS=0, SLOW_QUERY_MS=0, REQUEST_PROFILE_DIR=directory, REQUEST_PROFILE_SAMPLE_RATE=1,
+        ):
+            with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+                self.middleware(1)(RequestFactory().get('/'))
+            events = [json.loads(record.getMessage()) for record in logs.records]
+            self.assertEqual([event['event'] for event in events], ['slow_query', 'slow_request'])
+            self.assertTrue(os.path.exists(events[1]['profile']))
+            self.assertEqual(os.listdir(directory), [os.path.basename(events[1]['profile'])])
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_scenarios_run_against_seeded_data(self):
+        config = SeedConfig(users=2, days=20, logs_per_day=2, components=6)
+        seed(config)
+        rebuild_derived(config)
+        admin_user, user = benchmark_users()
+        self.assertTrue(admin_user.is_superuser)
+        self.assertTrue(user.username.startswith('perf-'))
+
+        results = run_suite(BenchmarkContext(admin_user, user), repeat=1)
+        self.assertIn('admin MealLog.MealLog', results)
+        self.assertIn('busca MealPrep.MealComponent', results)
+        self.assertGreater(results['painel diário']['queries'], 0)
+        self.assertTrue(all(result['p95_ms'] >= result['p50_ms'] for result in results.values()))
+
+    def test_compare_flags_slower_runs_and_extra_queries(self):
+        baseline = {'a': {'p50_ms': 10, 'queries': 3}, 'b': {'p50_ms': 10, 'queries': 3},
+                    'c': {'p50_ms': 10, 'queries': 3}}
+        results = {'a': {'p50_ms': 11, 'queries': 3}, 'b': {'p50_ms': 5, 'queries': 4},
+                   'c': {'p50_ms': 5, 'queries': 3}, 'd': {'p50_ms': 1, 'queries': 1}}
+        statuses = {name: status for name, status, detail in compare(results, baseline)}
+        self.assertEqual(statuses, {'a': 'igual', 'b': 'regressão', 'c': 'melhora', 'd': 'novo'})
+
+
+class PrefixAutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.client.force_login(self.admin)
+        self.users = [User.objects.create_user(name) for name in ('Bia', 'bruno', 'beatriz', 'carla')]
+
+    def autocomplete(self, term, model_name='meallog', field_name='user'):
+        response = self.client.get('/admin/autocomplete/', {
+            'term': term, 'app_label': 'MealLog', 'model_name': model_name, 'field_name': field_name,
+        })
+        return [result['text'] for result in response.json()['results']]
+
+    def test_prefix_filter_ignores_ascii_case(self):
+        self.assertEqual(
+            sorted(prefix_filter(User.objects.all(), 'username', 'B').values_list('username', flat=True)),
+            ['Bia', 'beatriz', 'bruno'],
+        )
+        self.assertEqual(list(prefix_filter(User.objects.all(), 'username', 'bz')), [])
+
+    def test_autocomplete_ranks_popular_choices_first(self):
+        self.assertEqual(self.autocomplete('b'), ['beatriz', 'Bia', 'bruno'])
+        Diet.objects.create(name='Dieta', user=self.users[2], start_date=datetime.date(2025, 1, 1))
+        for _ in range(2):
+            self.client.get('/admin/MealLog/meallog/', {'user__id__exact': self.users[1].pk})
+        self.client.get('/admin/MealLog/meallog/', {'user__id__exact': self.users[0].pk})
+
+        # O cache do prefixo só muda quando um usuário é gravado.
+        self.assertEqual(self.autocomplete('b'), ['beatriz', 'Bia', 'bruno'])
+        User.objects.create_user('bento')
+        self.assertEqual(self.autocomplete('b'), ['bruno', 'Bia', 'beatriz', 'bento'])
+        self.assertEqual(self.autocomplete('Di', 'plannedmeal', 'diet'), ['Dieta (beatriz)'])
+        # Sem nenhum nome com o prefixo, vale a busca normal (aqui, pelo usuário da dieta).
+        self.assertEqual(self.autocomplete('beat', 'plannedmeal', 'diet'), ['Dieta (beatriz)'])
+
+    def test_sidebar_filter_does_not_list_related_objects(self):
+        response = self.client.get('/admin/MealLog/meallog/')
+        self.assertContains(response, 'autocomplete_filter.js')
+        self.assertContains(response, 'data-field-name="user"')
+        self.assertNotContains(response, 'carla')
+        response = self.client.get('/admin/MealLog/meallog/', {'user__id__exact': self.users[3].pk})
+        self.assertContains(response, '<option value="%d" selected>carla</option>' % self.users[3].pk, html=True)
+        self.assertEqual(autocomplete_for(User).field, 'username')
@@ -8,6 +8,7 @@ from django.views.generic.base import RedirectView
 urlpatterns = [
     path('', RedirectView.as_view(url='/admin/', permanent=True), name='index_redirect'),
     path('admin/', admin.site.urls),
+    path('api/', include('MealLog.urls')),
 ]
 
 if settings.DEBUG: